@@ -0,0 +1,1007 @@
+import argparse
+import json
+import math
+import os
+import time
+import tracemalloc
+from types import SimpleNamespace
+import numpy as np
+import torch
+
+def percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000) if len(samples) else 0.0
+
+def report(name, samples, extra=""):
+    print(f"{name:<24} mean {np.mean(samples) * 1000:8.3f} ms  p50 {percentile_ms(samples, 50):8.3f} ms  "
+          f"p95 {percentile_ms(samples, 95):8.3f} ms{extra}")
+
+def load_scene(config_file):
+    with open(config_file, 'r') as f:
+        return json.load(f)
+
+def synthetic_frame(width=1920, height=1080, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+
+def bench_preprocess(args):
+    from ultralytics.engine.predictor import BasePredictor
+
+    config = load_scene(args.scene) if args.scene else {}
+    frame = synthetic_frame(args.width, args.height)
+    x1, y1, x2, y2 = config.get("target", [0, 0, args.width, args.height])
+    crop = frame[y1:y2, x1:x2]
+
+    predictor = BasePredictor(overrides={"imgsz": args.imgsz, "verbose": False})
+    predictor.model = SimpleNamespace(pt=True, stride=32, fp16=False)
+    predictor.device = torch.device("cpu")
+    predictor.imgsz = [args.imgsz, args.imgsz]
+
+    # mixed: 共享推理服务中全帧通道与ROI通道的批次交替到达，每种输入形状应各自复用融合预处理缓冲区
+    roi = crop if crop.shape != frame.shape else frame[:548, :968]
+    for case, batches in (("", [[crop]]), ("mixed ", [[frame], [roi]])):
+        for fused in (False, True):
+            predictor.args.fused_preprocess = fused
+            for i in range(5):
+                predictor.preprocess(batches[i % len(batches)])
+
+            samples, peaks = [], []
+            tracemalloc.start()
+            for i in range(args.iters):
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                t = time.perf_counter()
+                predictor.preprocess(batches[i % len(batches)])
+                samples.append(time.perf_counter() - t)
+                peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            tracemalloc.stop()
+            # tracemalloc只统计numpy/cv2分配，torch的float转换不在其中
+            report(case + ("fused" if fused else "letterbox"), samples,
+                   f"  peak alloc {np.mean(peaks) / 1e6:7.2f} MB/frame")
+
+def synthetic_detections(objects, frames, width=1920, height=1080, seed=0):
+    # 随机游走的目标，部分目标随机出现/消失，置信度覆盖高低两段阈值
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform([0, 0], [width, height], (objects, 2))
+    vel = rng.normal(0, 4, (objects, 2))
+    size = rng.uniform([20, 50], [60, 150], (objects, 2))
+    alive = rng.random(objects) < 0.7
+    sequence = []
+    for _ in range(frames):
+        pos = (pos + vel) % [width, height]
+        vel += rng.normal(0, .5, vel.shape)
+        alive ^= rng.random(objects) < 0.03
+        visible = alive & (rng.random(objects) > 0.1)
+        centers = pos[visible] + rng.normal(0, 2, (visible.sum(), 2))
+        half = size[visible] / 2
+        sequence.append(SimpleNamespace(
+            xyxy=np.concatenate([centers - half, centers + half], axis=1).astype(np.float32),
+            conf=rng.uniform(0.05, 1, len(centers)).astype(np.float32),
+            cls=np.zeros(len(centers), dtype=np.float32)))
+    return sequence
+
+def bench_postprocess(args):
+    from ultralytics.engine.results import Results
+
+    frame = synthetic_frame(args.width, args.height)
+    rng = np.random.default_rng(0)
+    offset = [211, 86, 211, 86]
+    for n in args.boxes:
+        xy = rng.uniform(0, [args.width - 60, args.height - 150], (n, 2))
+        # 跟踪器输出：xyxy, id, conf, cls, idx
+        tracks = np.concatenate([xy, xy + [60, 150], np.arange(1, n + 1)[:, None], rng.uniform(0.1, 1, (n, 1)),
+                                 np.zeros((n, 1)), np.arange(n)[:, None]], axis=1).astype(np.float32)
+        result = Results(frame, path="", names={0: "person"}, boxes=torch.from_numpy(tracks[:, [0, 1, 2, 3, 5, 6]]))
+        result = result[tracks[:, -1].astype(int)]
+        result.update(boxes=torch.as_tensor(tracks[:, :-1]))
+
+        def per_box():
+            ids, centers = [], []
+            for box in result.boxes:
+                x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
+                x1 += offset[0]
+                y1 += offset[1]
+                x2 += offset[2]
+                if box.is_track:
+                    ids.append(int(box.id.item()))
+                    centers.append([(x1 + x2) // 2, y1])
+            return ids, np.asarray(centers, dtype=np.int32)
+
+        def columnar():
+            table = result.boxes.table
+            boxes = table.xyxy.astype(np.int64) + offset
+            ids = table.id.astype(np.int64).tolist()
+            return ids, np.stack([(boxes[:, 0] + boxes[:, 2]) // 2, boxes[:, 1]], axis=1)
+
+        a, b = per_box(), columnar()
+        assert a[0] == b[0] and np.array_equal(a[1], b[1])
+        for name, fn in (("per-box", per_box), ("columnar", columnar)):
+            samples = []
+            for _ in range(args.iters):
+                t = time.perf_counter()
+                fn()
+                samples.append(time.perf_counter() - t)
+            report(f"{name} x{n}", samples)
+
+def bench_tracker(args):
+    from ultralytics.trackers.byte_tracker import draw_tracks
+    from ultralytics.trackers.track import TRACKER_MAP
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+    from ultralytics.utils.checks import check_yaml
+
+    frame = synthetic_frame(args.width, args.height)
+    sequence = synthetic_detections(args.objects, args.frames, args.width, args.height)
+    for name in args.trackers:
+        cfg = IterableSimpleNamespace(**yaml_load(check_yaml(f"{name}.yaml")))
+        cfg.sparse_association = args.sparse
+        # 调试叠加层关闭和开启时分别测试
+        for overlay in (None, draw_tracks):
+            tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=30)
+            tracker.overlay = overlay
+            samples = []
+            tracks = 0
+            for det in sequence:
+                t = time.perf_counter()
+                tracks = len(tracker.update(det, frame))
+                samples.append(time.perf_counter() - t)
+            report(f"{cfg.tracker_type} overlay {'on' if overlay else 'off'}", samples, f"  tracks {tracks}")
+
+def bench_concurrency(args):
+    from concurrent.futures import ThreadPoolExecutor
+    from ultralytics.trackers.track import TRACKER_MAP
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+    from ultralytics.utils.checks import check_yaml
+
+    frame = synthetic_frame(args.width, args.height)
+    cfg = IterableSimpleNamespace(**yaml_load(check_yaml(f"{args.tracker}.yaml")))
+    sequences = [synthetic_detections(args.objects, args.frames, args.width, args.height, seed=i)
+                 for i in range(args.trackers)]
+
+    def run(i):
+        # 每个通道独立的跟踪器，部分通道中途重置以模拟通道重启
+        tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=30)
+        outputs = []
+        for n, det in enumerate(sequences[i]):
+            if i % 4 == 0 and n == args.frames // 2:
+                tracker.reset()
+            outputs.append(tracker.update(det, frame))
+        return outputs
+
+    t = time.perf_counter()
+    expected = [run(i) for i in range(args.trackers)]
+    serial = time.perf_counter() - t
+    t = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.trackers) as executor:
+        results = list(executor.map(run, range(args.trackers)))
+    threaded = time.perf_counter() - t
+
+    # 并发运行的输出(含跟踪ID)必须与单独运行完全一致
+    mismatch = sum(not all(np.array_equal(a, b) for a, b in zip(x, y)) for x, y in zip(expected, results))
+    print(f"{cfg.tracker_type} x{args.trackers} serial {serial:.3f} s  threaded {threaded:.3f} s  "
+          f"mismatched trackers {mismatch}")
+    if mismatch:
+        raise SystemExit(1)
+
+def synthetic_video(frames, width=1920, height=1080, pan=0.0, objects=20, seed=0):
+    # 纹理背景按pan(像素/帧)水平平移，叠加移动的目标块和传感器噪声，返回帧、检测框和真实位移
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    margin = int(abs(pan) * frames) + 64
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width + margin, 3), dtype=np.uint8), (0, 0), 3)
+    background = cv2.normalize(background, None, 0, 255, cv2.NORM_MINMAX)
+    pos = rng.uniform([0, 0], [width - 80, height - 160], (objects, 2))
+    vel = rng.normal(0, 6, (objects, 2))
+    for n in range(frames):
+        shift = pan * n
+        M = np.float32([[1, 0, -shift - (margin if pan < 0 else 0)], [0, 1, 0]])
+        frame = cv2.warpAffine(background, M, (width, height), flags=cv2.INTER_LINEAR)
+        pos = np.clip(pos + vel, 0, [width - 80, height - 160])
+        boxes = np.concatenate([pos, pos + [80, 160]], axis=1)
+        for x1, y1, x2, y2 in boxes.astype(int):
+            frame[y1:y2, x1:x2] = (40, 80, 160)
+        frame = cv2.add(frame, rng.integers(0, 3, frame.shape, dtype=np.uint8))
+        yield frame, boxes, -pan
+
+def bench_gmc(args):
+    from ultralytics.trackers.utils.gmc import GMC
+
+    for pan in args.pan:
+        for method in args.methods:
+            gmc = GMC(method=method, downscale=args.downscale)
+            samples, error = [], 0.0
+            for frame, boxes, dx in synthetic_video(args.frames, args.width, args.height, pan):
+                t = time.perf_counter()
+                H = gmc.apply(frame, boxes)
+                samples.append(time.perf_counter() - t)
+                error += H[0, 2] - dx
+            # 首帧初始化不计入耗时；漂移为估计位移与真实位移累计之差
+            report(f"{method} pan {pan:g}", samples[1:], f"  drift {error:+.2f} px")
+
+def bench_pipeline(args):
+    # 同一视频分别顺序推理和流水线推理(解码、预处理、推理、后处理与跟踪各自线程)，对比吞吐并检查结果一致
+    import cv2
+    import tempfile
+    from ultralytics import YOLO
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = args.video
+        if not source:
+            source = os.path.join(tmp, "pipeline.avi")
+            writer = cv2.VideoWriter(source, cv2.VideoWriter_fourcc(*"MJPG"), 25, (args.width, args.height))
+            for frame, _, _ in synthetic_video(args.frames, args.width, args.height, objects=args.objects):
+                writer.write(frame)
+            writer.release()
+
+        model = YOLO(args.model)
+        model.predict(np.zeros((args.height, args.width, 3), dtype=np.uint8), imgsz=args.imgsz, device=args.device,
+                      verbose=False)  # 加载和预热模型不计入耗时
+        baseline = None
+        for workers in args.pipeline:
+            stream = model.track if args.tracker else model.predict
+            kwargs = {"tracker": f"{args.tracker}.yaml", "persist": True} if args.tracker else {}
+            outputs, speeds = [], []
+            t = time.perf_counter()
+            for result in stream(source=source, stream=True, imgsz=args.imgsz, conf=args.conf, device=args.device,
+                                 fused_preprocess=True, pipeline=workers, verbose=False, **kwargs):
+                outputs.append(result.boxes.data.cpu().numpy())
+                speeds.append(result.speed)
+            elapsed = time.perf_counter() - t
+            if model.predictor and hasattr(model.predictor, "trackers"):
+                del model.predictor.trackers  # 下一轮重新创建跟踪器
+            baseline = baseline or outputs
+            mismatch = sum(len(a) != len(b) or not np.array_equal(a, b) for a, b in zip(baseline, outputs))
+            stages = "  ".join(f"{k} {np.mean([x[k] for x in speeds]):6.2f} ms" for k in speeds[0]) if speeds else ""
+            print(f"pipeline {workers}  {len(outputs) / elapsed:7.2f} frames/s  {stages}  mismatched frames {mismatch}")
+
+# 冷启动子进程：与slave通道相同的导入、加载模型和首帧检测、跟踪、绊线计数，输出各阶段距进程启动的耗时
+STARTUP_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+args = json.loads(sys.argv[1])
+sys.path.insert(0, args["root"])
+import numpy as np
+import flow_count
+from tracker_info import TripwireCounter
+from ultralytics.trackers.track import TRACKER_MAP
+from ultralytics.utils import IterableSimpleNamespace, yaml_load
+from ultralytics.utils.checks import check_yaml
+from inference_service import shared_service
+t1 = time.perf_counter()
+service = shared_service(args["model"], args["device"], max_batch_size=1, max_wait_ms=0, model_cache=args["cache"])
+t2 = time.perf_counter()
+cfg = IterableSimpleNamespace(**yaml_load(check_yaml("bytetrack.yaml")))
+tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=25)
+counter = TripwireCounter([[[0, 240], [640, 240]]], 25)
+frame = np.full((480, 640, 3), 114, dtype=np.uint8)
+det = service.infer(frame, timeout=600).boxes.cpu().numpy()
+tracks = tracker.update(det, frame) if len(det) else np.zeros((0, 8))
+counter.update(tracks[:, 4].astype(int), (tracks[:, :2] + tracks[:, 2:4]) / 2, 0)
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "load": t2 - t1, "first": t3 - t2}))
+"""
+
+def bench_startup(args):
+    # 每次在新的Python进程中冷启动，分别测试不使用融合模型缓存、首次生成缓存和命中缓存时到首个计数帧的耗时
+    import subprocess
+    import sys
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model = args.model
+        if not model:
+            from copy import deepcopy
+            from ultralytics.nn.tasks import DetectionModel
+
+            # 随机权重的yolov8n，与官方权重文件结构相同(半精度未融合)，仅用于测试加载耗时
+            net = DetectionModel("yolov8n.yaml", verbose=False)
+            model = os.path.join(tmp, "yolov8n.pt")
+            torch.save({"model": deepcopy(net).half(), "train_args": {}, "date": None, "version": "8.1.0"}, model)
+        root = os.path.dirname(os.path.abspath(__file__))
+        runs = [("no cache", False)] + [("cache miss", True)] + [("cache hit", True)] * args.runs
+        for name, cache in runs:
+            child = {"root": root, "model": model, "device": args.device, "cache": cache}
+            t = time.perf_counter()
+            out = subprocess.run([sys.executable, "-c", STARTUP_CHILD, json.dumps(child)], capture_output=True,
+                                 text=True, cwd=root)
+            total = time.perf_counter() - t
+            if out.returncode:
+                print(out.stdout, out.stderr)
+                raise SystemExit(out.returncode)
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{name:<12} import {r['import']:6.2f} s  load model {r['load']:6.2f} s  "
+                  f"first counted frame {r['first']:6.2f} s  total {total:6.2f} s")
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(model)), "model_cache")
+        if not args.model or args.clean:
+            import shutil
+
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+def synthetic_predictions(nc, people, responses=10, imgsz=640, seed=0):
+    # 模拟拥挤场景的检测头输出(1, 4 + nc, anchors)：每个目标周围大量锚点高于低置信度阈值，其余锚点为低分背景
+    rng = np.random.default_rng(seed)
+    anchors = sum((imgsz // s) ** 2 for s in (8, 16, 32))
+    pred = np.zeros((4 + nc, anchors), dtype=np.float32)
+    pred[:2] = rng.uniform(0, imgsz, (2, anchors))
+    pred[2:4] = rng.uniform(4, 40, (2, anchors))
+    pred[4:] = rng.uniform(0, 0.12, (nc, anchors)) ** 2
+    centers = rng.uniform(0, imgsz, (people, 2))
+    sizes = rng.uniform([15, 40], [40, 100], (people, 2))
+    for k in range(people):
+        # 每个目标有responses个锚点响应，位置和大小带抖动，分数分布在低阈值上下
+        idx = rng.choice(anchors, responses, replace=False)
+        pred[:2, idx] = (centers[k][:, None] + rng.normal(0, 3, (2, responses)))
+        pred[2:4, idx] = sizes[k][:, None] * rng.uniform(0.9, 1.1, (2, responses))
+        pred[4, idx] = rng.uniform(0.05, 0.95, responses)
+        if nc > 1:
+            pred[5 + rng.integers(nc - 1), idx[:2]] = 0.97  # 少量锚点的最高分属于其他类别
+    return torch.from_numpy(pred[None])
+
+def bench_nms(args):
+    from ultralytics.utils import ops
+
+    for nc in args.nc:
+        pred = synthetic_predictions(nc, args.people, args.responses, args.imgsz)
+        generic = ops.non_max_suppression(pred.clone(), args.conf, 0.7, classes=0, fast_classes=False)[0]
+        fast = ops.non_max_suppression(pred.clone(), args.conf, 0.7, classes=0)[0]
+        same = generic.shape == fast.shape and torch.equal(generic, fast)
+        for name, fast_classes in (("generic", False), ("class-filtered", True)):
+            samples = []
+            for _ in range(args.iters):
+                # 通用路径会原地修改预测结果，每次传入副本，复制不计入耗时
+                x = pred.clone()
+                t = time.perf_counter()
+                ops.non_max_suppression(x, args.conf, 0.7, classes=0, fast_classes=fast_classes)
+                samples.append(time.perf_counter() - t)
+            report(f"{name} nc {nc}", samples, f"  boxes {len(fast)}  candidates "
+                   f"{int((pred[0, 4:].amax(0) > args.conf).sum())}  same {same}")
+
+def bench_kalman(args):
+    from ultralytics.trackers.utils.kalman_filter import KalmanFilterXYAH
+
+    kf = KalmanFilterXYAH()
+    rng = np.random.default_rng(0)
+    for n in args.tracks:
+        measurement = np.concatenate([rng.uniform(0, 1920, (n, 2)), rng.uniform(0.3, 0.8, (n, 1)),
+                                      rng.uniform(40, 200, (n, 1))], axis=1)
+        mean, covariance = kf.multi_predict(*kf.multi_initiate(measurement))
+        observed = measurement + rng.normal(0, 2, measurement.shape)
+
+        def per_track_update():
+            for i in range(n):
+                kf.update(mean[i], covariance[i], observed[i])
+
+        def per_track_project():
+            for i in range(n):
+                kf.project(mean[i], covariance[i])
+
+        def per_track_gating():
+            for i in range(n):
+                kf.gating_distance(mean[i], covariance[i], observed)
+
+        cases = (
+            ("update", per_track_update, lambda: kf.multi_update(mean, covariance, observed)),
+            ("project", per_track_project, lambda: kf.multi_project(mean, covariance)),
+            ("gating", per_track_gating, lambda: kf.multi_gating_distance(mean, covariance, observed)),
+        )
+        for name, single, batched in cases:
+            for label, fn in ((f"{name} x{n}", single), (f"multi_{name} x{n}", batched)):
+                samples = []
+                for _ in range(args.iters):
+                    t = time.perf_counter()
+                    fn()
+                    samples.append(time.perf_counter() - t)
+                report(label, samples)
+
+def bench_crossing(args):
+    from utils import crossing_directions, intersection_angle, polyline_segments
+
+    config = load_scene(args.scene) if args.scene else {}
+    lines = config.get("lines", [426, 0, 426, 152, 300, 190, 300, 328, 574, 418, 1037, 407, 1055, 217])
+    segments = polyline_segments(lines)
+    rng = np.random.default_rng(0)
+    prev_centers = rng.integers(0, 1280, (args.tracks, 2))
+    current_centers = prev_centers + rng.integers(-20, 21, (args.tracks, 2))
+
+    def scalar():
+        for prev, current in zip(prev_centers.tolist(), current_centers.tolist()):
+            for i in range(0, len(lines) - 2, 2):
+                x1, y1, x2, y2 = lines[i:i + 4]
+                intersection_angle(prev, current, [x1 + .0001, y1 + .0001], [x2 + .0001, y2 + .0001])
+
+    def vectorized():
+        crossing_directions(prev_centers, current_centers, segments)
+
+    for name, fn in (("scalar", scalar), ("vectorized", vectorized)):
+        samples = []
+        for _ in range(args.iters):
+            t = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - t)
+        report(name, samples)
+
+def bench_replay(args):
+    from detection_log import DetectionLog
+    from tracker_info import TripwireCounter
+    from ultralytics.trackers.track import TRACKER_MAP
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+    from ultralytics.utils.checks import check_yaml
+
+    log = DetectionLog(args.log)
+    meta = log.meta
+    cfg = IterableSimpleNamespace(**yaml_load(check_yaml(args.tracker or meta["tracker"])))
+    fps = meta["fps"]
+    # 记录中没有图像，跟踪器只用到空白帧的尺寸，依赖像素的GMC和ReID在回放中关闭
+    cfg.gmc_method = "none"
+    cfg.with_reid = False
+    frames = {}
+    samples = {"track": [], "count": [], "total": []}
+    counts = set()
+    elapsed = 0.0
+    for _ in range(args.repeat):
+        # 与FlowCount相同：每个通道一个跟踪器和绊线计数器
+        tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=fps)
+        counter = TripwireCounter(meta["lines"], fps)
+        in_count = out_count = 0
+        start = time.perf_counter()
+        for i in range(len(log)):
+            x, y, w, h = log.crop[i].tolist()
+            frame_index = int(log.frame[i])
+            det = log.detections(i)
+            frame = frames.get((h, w))
+            if frame is None:
+                frame = frames[(h, w)] = np.zeros((h, w, 3), dtype=np.uint8)
+
+            t0 = time.perf_counter()
+            tracks = tracker.update(det, frame) if len(det.conf) else ()
+            t1 = time.perf_counter()
+            if len(tracks):
+                # 与FlowCount.__detect相同：框坐标取整后加上检测区域偏移，中心点取框顶边中点
+                boxes = tracks[:, :4].astype(np.int64) + [x, y, x, y]
+                centers = np.stack([(boxes[:, 0] + boxes[:, 2]) // 2, boxes[:, 1]], axis=1)
+                counter.update(tracks[:, 4].astype(np.int64).tolist(), centers, frame_index)
+            n_in, n_out = counter.expire(frame_index)
+            in_count += n_in
+            out_count += n_out
+            t2 = time.perf_counter()
+            samples["track"].append(t1 - t0)
+            samples["count"].append(t2 - t1)
+            samples["total"].append(t2 - t0)
+        elapsed += time.perf_counter() - start
+        counts.add((in_count, out_count))
+
+    n_det = int(log.offset[-1])
+    print(f"{meta['name']} {len(log)} frames {n_det} detections  tracker {cfg.tracker_type}  "
+          f"{len(log) * args.repeat / elapsed:.1f} frames/s")
+    for name, stage in samples.items():
+        report(name, stage)
+    # 多次回放的计数必须一致
+    if len(counts) > 1:
+        print(f"replay counts differ between repeats: {sorted(counts)}")
+        raise SystemExit(1)
+    pending_in, pending_out = counter.tracks.pending()
+    print(f"in {in_count} out {out_count}  pending in {pending_in} out {pending_out}")
+    if args.expect and tuple(args.expect) != (in_count, out_count):
+        print(f"expected in {args.expect[0]} out {args.expect[1]}")
+        raise SystemExit(1)
+
+STAGES = ("decode", "preprocess", "inference", "nms", "track", "cross", "encode")
+
+def scene_people(config, frames, people, width, height, seed=0):
+    # 生成穿过绊线的行人轨迹：在绊线上随机取一点，沿法线方向(带随机偏角)匀速穿过，全程框都在检测区域内
+    rng = np.random.default_rng(seed)
+    x1, y1, x2, y2 = config.get("target") or [0, 0, width, height]
+    points = np.asarray(config["lines"], dtype=np.float64).reshape(-1, 2)
+    start, origin, velocity, size, duration = [], [], [], [], []
+    for _ in range(people * 100):
+        if len(start) == people:
+            break
+        k = rng.integers(len(points) - 1)
+        a, b = points[k], points[k + 1]
+        d = (b - a) / np.linalg.norm(b - a)
+        angle = rng.normal(0, 0.3)
+        normal = np.array([-d[1], d[0]]) * np.cos(angle) + d * np.sin(angle)
+        # 两个方向的人数不等，便于发现入/出计数颠倒
+        normal *= 1 if rng.random() < 0.6 else -1
+        cross = a + (b - a) * rng.uniform(0.1, 0.9)
+        before, after = rng.uniform(60, 220, 2)
+        w = rng.uniform(30, 60)
+        h = w * rng.uniform(2.2, 2.8)
+        # 轨迹点为框顶边中点，与FlowCount的计数中心点一致
+        ends = np.array([cross - normal * before, cross + normal * after])
+        if (ends[:, 0].min() - w / 2 < x1 or ends[:, 0].max() + w / 2 > x2 or
+                ends[:, 1].min() < y1 or ends[:, 1].max() + h > y2):
+            continue
+        speed = rng.uniform(1.5, 4)
+        n = int((before + after) / speed)
+        if n >= frames:
+            continue
+        start.append(rng.integers(0, frames - n))
+        origin.append(ends[0])
+        velocity.append(normal * speed)
+        size.append((w, h))
+        duration.append(n)
+    start = np.asarray(start, dtype=np.int64)
+    return SimpleNamespace(start=start, end=start + np.asarray(duration, dtype=np.int64),
+                           origin=np.asarray(origin).reshape(-1, 2), velocity=np.asarray(velocity).reshape(-1, 2),
+                           size=np.asarray(size).reshape(-1, 2))
+
+def scene_boxes(people, n):
+    # 第n帧可见行人的编号和框(原始帧坐标)
+    ids = np.nonzero((people.start <= n) & (n < people.end))[0]
+    top = people.origin[ids] + people.velocity[ids] * (n - people.start[ids])[:, None]
+    w, h = people.size[ids].T
+    return ids, np.stack([top[:, 0] - w / 2, top[:, 1], top[:, 0] + w / 2, top[:, 1] + h], axis=1)
+
+def scene_truth(config, people, frames, fps):
+    # 无噪声轨迹逐帧送入绊线计数，得到真实的入/出数量
+    from tracker_info import TripwireCounter
+
+    counter = TripwireCounter(config["lines"], fps)
+    truth = np.zeros(2, dtype=np.int64)
+    for n in range(frames):
+        ids, boxes = scene_boxes(people, n)
+        if len(ids):
+            centers = np.stack([(boxes[:, 0] + boxes[:, 2]) / 2, boxes[:, 1]], axis=1).astype(np.int64)
+            counter.update(ids.tolist(), centers, n + 1)
+        truth += counter.expire(n + 1)
+    truth += counter.expire(frames + math.ceil(counter.max_age) + 1)
+    return {"in": int(truth[0]), "out": int(truth[1])}
+
+def scene_video(path, people, frames, fps, width, height, seed=0):
+    # 将行人轨迹渲染为本地视频，使回归测试包含真实的解码耗时
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    background = cv2.GaussianBlur(rng.integers(0, 255, (height, width, 3), dtype=np.uint8), (0, 0), 3)
+    colors = rng.integers(0, 255, (len(people.start), 3)).tolist()
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    for n in range(frames):
+        frame = background.copy()
+        ids, boxes = scene_boxes(people, n)
+        for id, (x1, y1, x2, y2) in zip(ids.tolist(), boxes.astype(int).tolist()):
+            cv2.rectangle(frame, (x1, y1), (x2, y2), colors[id], -1)
+        writer.write(frame)
+    writer.release()
+
+def scene_detector(people, offset, crop_size, seed=0, miss=0.05, jitter=1.5, false_positives=0.3):
+    # 模拟检测器：漏检、坐标抖动、高低两段置信度和少量误检，框坐标相对检测区域
+    rng = np.random.default_rng(seed)
+    width, height = crop_size
+
+    def detect(crop, n):
+        _, boxes = scene_boxes(people, n)
+        boxes = boxes[rng.random(len(boxes)) >= miss] - [offset[0], offset[1], offset[0], offset[1]]
+        boxes += rng.normal(0, jitter, boxes.shape)
+        conf = np.where(rng.random(len(boxes)) < 0.1, rng.uniform(0.1, 0.5, len(boxes)),
+                        rng.uniform(0.5, 0.95, len(boxes)))
+        k = rng.poisson(false_positives)
+        if k:
+            xy = rng.uniform([0, 0], [width - 40, height - 100], (k, 2))
+            boxes = np.concatenate([boxes, np.concatenate([xy, xy + [40, 100]], axis=1)])
+            conf = np.concatenate([conf, rng.uniform(0.1, 0.4, k)])
+        boxes = boxes.astype(np.float32)
+        return SimpleNamespace(xyxy=boxes, conf=conf.astype(np.float32), cls=np.zeros(len(boxes), np.float32)), None
+    return detect
+
+def model_detector(model_path, device):
+    # 与InferenceService相同的推理参数，预处理、推理和后处理(NMS)耗时取自Results.speed
+    from ultralytics import YOLO
+
+    detector = YOLO(model_path)
+
+    def detect(crop, n):
+        result = detector.predict(crop, save=False, imgsz=640, conf=0.1, iou=0.7, verbose=False, classes=0,
+                                  fused_preprocess=True, device=device)[0]
+        return result.boxes.cpu().numpy(), result.speed
+    return detect
+
+def run_scene(config, source, detect, args):
+    # 与FlowCount相同的处理流程：抽帧解码、裁剪检测区域、检测、跟踪、绊线计数，并将结果帧编码到临时文件
+    import cv2
+    import psutil
+    import tempfile
+    from frame_pool import FramePool
+    from tracker_info import TripwireCounter
+    from ultralytics.trackers.track import TRACKER_MAP
+    from ultralytics.utils import IterableSimpleNamespace, yaml_load
+    from ultralytics.utils.checks import check_yaml
+
+    cap = cv2.VideoCapture(source)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    skip = config.get("frameSkip", 1) or 1
+    fps = cap.get(cv2.CAP_PROP_FPS) / skip
+    x1, y1, x2, y2 = config.get("target") or [0, 0, width, height]
+    cfg = IterableSimpleNamespace(**yaml_load(check_yaml(config.get("tracker", "bytetrack.yaml"))))
+    tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=fps)
+    counter = TripwireCounter(config["lines"], fps)
+    pool = FramePool(width, height, 2)
+    writer = None
+    if args.encode:
+        out_width = min(config.get("saveWidth", 640) or width, width) // 2 * 2
+        out_height = round(height * out_width / width / 2) * 2
+        resized = np.empty((out_height, out_width, 3), dtype=np.uint8)
+        output = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False).name
+        writer = cv2.VideoWriter(output, cv2.VideoWriter_fourcc(*"mp4v"), fps, (out_width, out_height))
+
+    process = psutil.Process()
+    peak_rss = process.memory_info().rss
+    samples = {stage: [] for stage in STAGES}
+    count = np.zeros(2, dtype=np.int64)
+    frame_index = 0
+    current_frame = 0
+    start = time.perf_counter()
+    t = start
+    while not args.frames or current_frame < args.frames:
+        if not cap.grab():
+            break
+        if current_frame % skip:
+            current_frame += 1
+            continue
+        frame = pool.retrieve(cap)
+        if frame is None:
+            break
+        crop = frame.image[y1:y2, x1:x2]
+        frame_index += 1
+        t0 = time.perf_counter()
+        # 解码耗时包含跳过帧的grab
+        samples["decode"].append(t0 - t)
+
+        det, speed = detect(crop, current_frame)
+        t1 = time.perf_counter()
+        if speed:
+            for stage, key in (("preprocess", "preprocess"), ("inference", "inference"), ("nms", "postprocess")):
+                samples[stage].append(speed[key] / 1000)
+
+        tracks = tracker.update(det, crop) if len(det.conf) else ()
+        t2 = time.perf_counter()
+        samples["track"].append(t2 - t1)
+
+        if len(tracks):
+            boxes = tracks[:, :4].astype(np.int64) + [x1, y1, x1, y1]
+            centers = np.stack([(boxes[:, 0] + boxes[:, 2]) // 2, boxes[:, 1]], axis=1)
+            counter.update(tracks[:, 4].astype(np.int64).tolist(), centers, frame_index)
+        count += counter.expire(frame_index)
+        t3 = time.perf_counter()
+        samples["cross"].append(t3 - t2)
+
+        if writer:
+            writer.write(cv2.resize(frame.image, (out_width, out_height), dst=resized, interpolation=cv2.INTER_AREA))
+        frame.release()
+        t = time.perf_counter()
+        samples["encode"].append(t - t3)
+        current_frame += 1
+        if frame_index % 10 == 0:
+            peak_rss = max(peak_rss, process.memory_info().rss)
+    elapsed = time.perf_counter() - start
+    cap.release()
+    if writer:
+        writer.release()
+        os.remove(output)
+    # 视频结束时仍在等待淘汰的目标一并结算
+    count += counter.expire(frame_index + math.ceil(counter.max_age) + 1)
+    peak_rss = max(peak_rss, process.memory_info().rss)
+    return {
+        "frames": frame_index,
+        "fps": frame_index / elapsed if elapsed else 0.0,
+        "count": {"in": int(count[0]), "out": int(count[1])},
+        "stages": {stage: {"mean_ms": float(np.mean(v) * 1000), "p50_ms": percentile_ms(v, 50),
+                           "p95_ms": percentile_ms(v, 95)} for stage, v in samples.items() if v},
+        "peak_rss_mb": peak_rss / 2 ** 20,
+    }
+
+def git_commit():
+    import subprocess
+
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def bench_scenes(args):
+    import glob
+    import tempfile
+
+    if args.video and not args.model:
+        raise SystemExit("本地视频需要同时指定--model")
+    detect_model = model_detector(args.model, args.device) if args.model else None
+    results = []
+    for scene in args.scenes or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scenes", "*.json"))):
+        config = load_scene(scene)
+        name = config.get("name", os.path.splitext(os.path.basename(scene))[0])
+        if args.video:
+            source, truth = args.video, {"in": args.truth[0], "out": args.truth[1]} if args.truth else None
+            detect = detect_model
+        else:
+            # 合成场景：按场景配置生成轨迹，渲染为视频后走完整流程，真实计数由无噪声轨迹得到
+            people = scene_people(config, args.frames, args.people, args.width, args.height, args.seed)
+            truth = scene_truth(config, people, args.frames, args.fps / (config.get("frameSkip", 1) or 1))
+            source = tempfile.NamedTemporaryFile(suffix=".avi", delete=False).name
+            scene_video(source, people, args.frames, args.fps, args.width, args.height, args.seed)
+            x1, y1, x2, y2 = config.get("target") or [0, 0, args.width, args.height]
+            detect = detect_model or scene_detector(people, (x1, y1), (x2 - x1, y2 - y1), args.seed)
+        try:
+            result = run_scene(config, source, detect, args)
+        finally:
+            if not args.video:
+                os.remove(source)
+        result = {"scene": name, "config": scene, "source": args.video or "synthetic", "truth": truth, **result}
+        if truth:
+            error = abs(result["count"]["in"] - truth["in"]) + abs(result["count"]["out"] - truth["out"])
+            result["accuracy"] = 1 - error / max(1, truth["in"] + truth["out"])
+        results.append(result)
+
+        counted = f"in {result['count']['in']} out {result['count']['out']}"
+        if truth:
+            counted += f" / truth in {truth['in']} out {truth['out']}  accuracy {result['accuracy']:.3f}"
+        print(f"{name}: {result['frames']} frames  {result['fps']:.1f} fps  peak rss {result['peak_rss_mb']:.0f} MB  {counted}")
+        for stage, stats in result["stages"].items():
+            print(f"  {stage:<22} mean {stats['mean_ms']:8.3f} ms  p50 {stats['p50_ms']:8.3f} ms  p95 {stats['p95_ms']:8.3f} ms")
+
+    report_data = {"commit": git_commit(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                   "args": {k: v for k, v in vars(args).items() if k != "func"}, "scenes": results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report_data, f, indent=4, ensure_ascii=False)
+    if args.compare:
+        compare_scenes(load_scene(args.compare), report_data)
+
+def compare_scenes(base, current):
+    # 与之前保存的结果逐场景对比计数和吞吐
+    previous = {r["scene"]: r for r in base["scenes"]}
+    print(f"对比 {base.get('commit')} -> {current.get('commit')}")
+    for r in current["scenes"]:
+        old = previous.get(r["scene"])
+        if old is None:
+            continue
+        line = f"  {r['scene']}: fps {old['fps']:.1f} -> {r['fps']:.1f} ({(r['fps'] / old['fps'] - 1) * 100:+.1f}%)" \
+            if old["fps"] else f"  {r['scene']}: fps {r['fps']:.1f}"
+        if r["count"] != old["count"]:
+            line += f"  counts {old['count']} -> {r['count']}"
+        if "accuracy" in r and "accuracy" in old:
+            line += f"  accuracy {old['accuracy']:.3f} -> {r['accuracy']:.3f}"
+        print(line)
+
+def bench_datalog(args):
+    # 本地模拟InfluxDB的/api/v2/write接口，检查批量写入、窗口聚合、故障溢出和恢复后重放
+    import tempfile
+    import threading
+    from collections import Counter
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+    from datalog import DataLog
+
+    state = {"mode": "ok", "requests": 0, "failed": 0, "max_lines": 0}
+    received = []  # 成功写入的行
+    lock = threading.Lock()
+
+    class FakeInflux(BaseHTTPRequestHandler):
+        def do_POST(self):
+            url = urlparse(self.path)
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+            mode = state["mode"]
+            if mode == "stall":
+                # 超过客户端超时不响应，请求视为未写入
+                time.sleep(args.timeout / 1000 * 2)
+                return
+            if mode == "error" or url.path != "/api/v2/write" or parse_qs(url.query).get("precision") != ["ns"]:
+                with lock:
+                    state["failed"] += 1
+                self.send_response(503 if mode == "error" else 400)
+                self.end_headers()
+                return
+            lines = [line for line in body.splitlines() if line]
+            with lock:
+                state["requests"] += 1
+                state["max_lines"] = max(state["max_lines"], len(lines))
+                received.extend(lines)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *a):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeInflux)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    spill_path = os.path.join(tempfile.mkdtemp(), "bench.spill.lp")
+    log = DataLog({"url": f"http://127.0.0.1:{server.server_port}", "token": "bench", "org": "bench",
+                   "bucket": "bench", "window": args.window, "batchSize": args.batch, "flushInterval": args.flush,
+                   "timeout": args.timeout, "spillPath": spill_path}, "bench")
+    log.start()
+
+    expected = Counter()
+    rng = np.random.default_rng(0)
+
+    def produce(seconds):
+        # 多个通道在多个窗口内随机计数
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            channel, direct = f"ch{rng.integers(args.channels)}", ("in", "out")[rng.integers(2)]
+            log.count(channel, direct)
+            expected[(channel, direct)] += 1
+            time.sleep(0.002)
+
+    def wait_for(condition, timeout):
+        end = time.monotonic() + timeout
+        while not condition() and time.monotonic() < end:
+            time.sleep(0.05)
+        return condition()
+
+    settle = args.window + args.flush + 1
+    produce(args.seconds)
+    ok_written = wait_for(lambda: len(received) and not log.counts and not log.pending, settle + args.seconds)
+    print(f"正常写入  {state['requests']} 次请求 {len(received)} 行")
+
+    spilled = {}
+    for mode in ("error", "stall"):
+        state["mode"] = mode
+        produce(args.seconds)
+        wait_for(lambda: not log.counts and not log.pending, settle + args.timeout / 1000 * 4)
+        spilled[mode] = log.spilled
+        print(f"故障({mode})  溢出 {log.spilled} 行到 {spill_path}")
+    with open(spill_path, "r", encoding="utf-8") as f:
+        spill_lines = [line for line in f.read().splitlines() if line]
+
+    state["mode"] = "ok"
+    produce(args.seconds)
+    replayed = wait_for(lambda: not os.path.exists(spill_path), settle + args.seconds)
+    log.close()
+    server.shutdown()
+    print(f"恢复后    {state['requests']} 次请求 {len(received)} 行  溢出文件已重放 {replayed}")
+
+    # 行协议：纳秒时间戳对齐到窗口起点，同一序列同一时间戳只写入一次，各(通道, 方向)合计与计数一致
+    window_ns = int(args.window * 1e9)
+    series, totals, bad = Counter(), Counter(), 0
+    for line in received:
+        head, field, timestamp = line.split(" ")
+        tags = dict(tag.split("=") for tag in head.split(",")[1:])
+        series[(head, timestamp)] += 1
+        totals[(tags["ch"], tags["direct"])] += int(field[len("count="):-1])
+        bad += not (head.startswith("flow,") and field.endswith("i") and len(timestamp) == 19
+                    and int(timestamp) % window_ns == 0)
+    duplicates = sum(n - 1 for n in series.values() if n > 1)
+    replay_counts = Counter(received)
+    replay_once = all(replay_counts[line] == 1 for line in spill_lines)
+    checks = {
+        "正常写入": bool(ok_written),
+        "行协议格式": bad == 0,
+        "批大小": 0 < state["max_lines"] <= args.batch,
+        "故障溢出": spilled["error"] > 0 and spilled["stall"] > spilled["error"],
+        "重放一次": bool(replayed) and replay_once,
+        "无重复窗口": duplicates == 0,
+        "聚合合计": totals == expected,
+    }
+    print(f"发送 {sum(expected.values())} 次计数  写入合计 {sum(totals.values())}  重复窗口 {duplicates}  "
+          f"格式错误 {bad}")
+    for name, passed in checks.items():
+        print(f"  {name:<8} {'OK' if passed else 'FAIL'}")
+    if not all(checks.values()):
+        raise SystemExit(1)
+
+def main():
+    parser = argparse.ArgumentParser(description="FlowCount性能基准测试。")
+    subparsers = parser.add_subparsers(dest="bench", required=True)
+
+    p = subparsers.add_parser("preprocess", help="对比LetterBox预处理与融合预处理的耗时和内存分配")
+    p.add_argument("--scene", help="场景配置文件，用于读取target区域")
+    p.add_argument("--width", type=int, default=1920)
+    p.add_argument("--height", type=int, default=1080)
+    p.add_argument("--imgsz", type=int, default=640)
+    p.add_argument("--iters", type=int, default=200)
+    p.set_defaults(func=bench_preprocess)
+
+    p = subparsers.add_parser("crossing", help="对比逐对与向量化绊线相交判断的耗时")
+    p.add_argument("--scene", help="场景配置文件，用于读取lines绊线")
+    p.add_argument("--tracks", type=int, default=80)
+    p.add_argument("--iters", type=int, default=100)
+    p.set_defaults(func=bench_crossing)
+
+    p = subparsers.add_parser("nms", help="对比通用NMS与按类别过滤的快速NMS在拥挤场景低置信度下的耗时")
+    p.add_argument("--nc", type=int, nargs="+", default=[1, 80], help="模型类别数")
+    p.add_argument("--people", type=int, default=150, help="场景中的人数")
+    p.add_argument("--responses", type=int, default=10, help="每人响应的锚点数")
+    p.add_argument("--imgsz", type=int, default=640)
+    p.add_argument("--conf", type=float, default=0.1)
+    p.add_argument("--iters", type=int, default=200)
+    p.set_defaults(func=bench_nms)
+
+    p = subparsers.add_parser("kalman", help="对比逐目标与批量卡尔曼更新、投影和门限距离的耗时")
+    p.add_argument("--tracks", type=int, nargs="+", default=[10, 100, 1000])
+    p.add_argument("--iters", type=int, default=20)
+    p.set_defaults(func=bench_kalman)
+
+    p = subparsers.add_parser("postprocess", help="对比逐框遍历Boxes与按列处理跟踪结果的耗时")
+    p.add_argument("--boxes", type=int, nargs="+", default=[10, 50, 200])
+    p.add_argument("--iters", type=int, default=200)
+    p.add_argument("--width", type=int, default=1920)
+    p.add_argument("--height", type=int, default=1080)
+    p.set_defaults(func=bench_postprocess)
+
+    p = subparsers.add_parser("tracker", help="对比不同跟踪器每帧的耗时")
+    p.add_argument("--trackers", nargs="+", default=["bytetrack", "vecbytetrack"], help="跟踪器配置名")
+    p.add_argument("--objects", type=int, default=300, help="场景中的目标数")
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--width", type=int, default=1920)
+    p.add_argument("--height", type=int, default=1080)
+    p.add_argument("--sparse", action="store_true", help="使用网格剪枝的稀疏关联")
+    p.set_defaults(func=bench_tracker)
+
+    p = subparsers.add_parser("concurrency", help="多个跟踪器并发运行，检查跟踪ID互不干扰")
+    p.add_argument("--tracker", default="bytetrack", help="跟踪器配置名")
+    p.add_argument("--trackers", type=int, default=32, help="并发的跟踪器数")
+    p.add_argument("--objects", type=int, default=50, help="每个场景中的目标数")
+    p.add_argument("--frames", type=int, default=200)
+    p.add_argument("--width", type=int, default=1920)
+    p.add_argument("--height", type=int, default=1080)
+    p.set_defaults(func=bench_concurrency)
+
+    p = subparsers.add_parser("gmc", help="对比不同全局运动补偿方法在静止和平移相机下的耗时与漂移")
+    p.add_argument("--methods", nargs="+", default=["sparseOptFlow", "persistentOptFlow"])
+    p.add_argument("--pan", type=float, nargs="+", default=[0, 0.3, 3], help="相机水平平移速度(像素/帧)")
+    p.add_argument("--downscale", type=int, default=2)
+    p.add_argument("--frames", type=int, default=100)
+    p.add_argument("--width", type=int, default=1920)
+    p.add_argument("--height", type=int, default=1080)
+    p.set_defaults(func=bench_gmc)
+
+    p = subparsers.add_parser("pipeline", help="对比顺序推理与流水线推理的吞吐，检查两者结果一致")
+    p.add_argument("--model", default="yolov8n.yaml", help="检测模型，默认随机权重的yolov8n，仅用于测速")
+    p.add_argument("--video", help="本地视频，不指定时生成合成视频")
+    p.add_argument("--pipeline", type=int, nargs="+", default=[0, 1, 2], help="预处理线程数，0为顺序推理")
+    p.add_argument("--tracker", default="bytetrack", help="跟踪器配置名，为空时只检测")
+    p.add_argument("--device", default="cpu")
+    p.add_argument("--imgsz", type=int, default=640)
+    p.add_argument("--conf", type=float, default=0.1)
+    p.add_argument("--objects", type=int, default=20, help="合成视频中的目标数")
+    p.add_argument("--frames", type=int, default=200)
+    p.add_argument("--width", type=int, default=1920)
+    p.add_argument("--height", type=int, default=1080)
+    p.set_defaults(func=bench_pipeline)
+
+    p = subparsers.add_parser("startup", help="在新进程中测试冷启动到首个计数帧的耗时，对比是否使用融合模型缓存")
+    p.add_argument("--model", help="检测模型.pt权重，默认生成随机权重的yolov8n")
+    p.add_argument("--device", default="cpu")
+    p.add_argument("--runs", type=int, default=2, help="命中缓存的测试次数")
+    p.add_argument("--clean", action="store_true", help="测试后删除--model生成的融合模型缓存")
+    p.set_defaults(func=bench_startup)
+
+    p = subparsers.add_parser("replay", help="回放检测记录，测试跟踪和绊线计数的速度与结果，无需检测器")
+    p.add_argument("log", help="FlowCount配置recordPath保存的检测记录")
+    p.add_argument("--tracker", help="跟踪器配置，默认使用记录时的配置")
+    p.add_argument("--repeat", type=int, default=1, help="重复回放次数")
+    p.add_argument("--expect", type=int, nargs=2, metavar=("IN", "OUT"), help="期望的入/出计数，不一致时返回非零")
+    p.set_defaults(func=bench_replay)
+
+    p = subparsers.add_parser("datalog", help="用本地模拟的InfluxDB检查批量写入、窗口聚合、故障溢出和恢复后重放")
+    p.add_argument("--channels", type=int, default=3)
+    p.add_argument("--seconds", type=float, default=1.5, help="每个阶段持续计数的秒数")
+    p.add_argument("--window", type=float, default=0.2, help="聚合窗口(秒)")
+    p.add_argument("--batch", type=int, default=20, help="每次写入的最大行数")
+    p.add_argument("--flush", type=float, default=0.5, help="最长刷新间隔(秒)")
+    p.add_argument("--timeout", type=int, default=500, help="写入超时(毫秒)")
+    p.set_defaults(func=bench_datalog)
+
+    p = subparsers.add_parser("scenes", help="按scenes场景配置测试计数准确率、端到端吞吐、分阶段耗时和内存峰值")
+    p.add_argument("scenes", nargs="*", help="场景配置文件，默认scenes目录下全部配置")
+    p.add_argument("--video", help="本地视频，不指定时按场景配置生成合成轨迹视频")
+    p.add_argument("--model", help="检测模型，不指定时合成场景使用模拟检测器")
+    p.add_argument("--device", default="cpu")
+    p.add_argument("--truth", type=int, nargs=2, metavar=("IN", "OUT"), help="本地视频的真实入/出数量")
+    p.add_argument("--frames", type=int, default=1500, help="源视频帧数，本地视频时为最多处理的帧数(0为全部)")
+    p.add_argument("--people", type=int, default=60, help="合成场景的行人数")
+    p.add_argument("--fps", type=float, default=25, help="合成视频帧率")
+    p.add_argument("--width", type=int, default=1280)
+    p.add_argument("--height", type=int, default=720)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--no-encode", dest="encode", action="store_false", help="不测试结果帧编码")
+    p.add_argument("--output", help="结果保存为JSON，用于不同版本间对比")
+    p.add_argument("--compare", help="与之前保存的JSON结果对比")
+    p.set_defaults(func=bench_scenes)
+
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
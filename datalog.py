@@ -1,14 +1,122 @@
-from influxdb_client import InfluxDBClient, Point, WritePrecision
-from influxdb_client.client.write_api import ASYNCHRONOUS
+import os
+import time
+from collections import defaultdict
+from threading import Condition, Thread
+from influxdb_client import InfluxDBClient, WritePrecision
+from influxdb_client.client.write_api import SYNCHRONOUS
 
-class DataLog:
-    def __init__(self, config):
+def escape_tag(value):
+    # 行协议中tag值需要转义逗号、等号和空格
+    return str(value).replace("\\", "\\\\").replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+
+class DataLog(Thread):
+    # 批量写入InfluxDB：按(通道, 方向)在时间窗口内聚合计数，按数量或时间批量刷新，写入失败时溢出到本地文件，恢复后重放
+    def __init__(self, config, name="flow"):
+        super().__init__(daemon=True)
         self.config = config
-        self.db_client = InfluxDBClient(url=config['url'], token=config['token'], org=config['org'])
-        self.db_write_api = self.db_client.write_api(write_options=ASYNCHRONOUS)
+        self.window_ns = int(config.get("window", 1) * 1e9)  # 聚合窗口(秒)
+        self.batch_size = config.get("batchSize", 500)  # 每次写入的最大行数
+        self.flush_interval = config.get("flushInterval", 5)  # 最长刷新间隔(秒)
+        self.max_pending = config.get("maxPending", 10000)  # 内存中待写入行数上限，超过后溢出到文件
+        self.spill_path = config.get("spillPath", f"{name}.spill.lp")
+        self.db_client = InfluxDBClient(url=config['url'], token=config['token'], org=config['org'],
+                                        timeout=config.get("timeout", 10000))
+        self.db_write_api = self.db_client.write_api(write_options=SYNCHRONOUS)
+
+        self.condition = Condition()
+        self.counts = defaultdict(int)  # (窗口起始时间, 通道, 方向) -> 计数
+        self.pending = []  # 待写入的行协议
+        self.sealed = 0  # 早于该时间的窗口已转为行协议
+        self.stop_flag = False
+        self.written = 0
+        self.spilled = 0
+
+    def count(self, channel, direct, n=1):
+        # 在锁内取时间，并把落入已转出窗口的计数(如系统时间回拨)并入当前窗口，同一窗口不会重复写入而被覆盖
+        with self.condition:
+            now = time.time_ns()
+            window = max(now - now % self.window_ns, self.sealed)
+            self.counts[(window, channel, direct)] += n
+
+    def run(self):
+        last_flush = time.monotonic()
+        while True:
+            with self.condition:
+                self.condition.wait(min(self.flush_interval, self.window_ns / 1e9))
+                stop = self.stop_flag
+                self.__seal(None if stop else time.time_ns())
+                # 数据库跟不上时，内存中的待写入行超过上限直接溢出到文件
+                overflow = []
+                if len(self.pending) > self.max_pending:
+                    overflow, self.pending = self.pending, []
+                due = stop or len(self.pending) >= self.batch_size or time.monotonic() - last_flush >= self.flush_interval
+                batch = []
+                if due:
+                    batch, self.pending = self.pending, []
+            if overflow:
+                print(f"DataLog.run: 待写入 {len(overflow)} 行超过上限，溢出到 {self.spill_path}")
+                self.__spill(overflow)
+            # 没有新数据时也定期尝试重放溢出文件
+            if batch or (due and os.path.exists(self.spill_path)):
+                self.__flush(batch)
+                last_flush = time.monotonic()
+            if stop:
+                break
+
+    def __seal(self, now):
+        # 已结束的窗口转为行协议，now为None时全部转出
+        closed = [key for key in self.counts if now is None or key[0] + self.window_ns <= now]
+        for key in sorted(closed):
+            window, channel, direct = key
+            n = self.counts.pop(key)
+            self.pending.append(f"flow,ch={escape_tag(channel)},direct={escape_tag(direct)} count={n}i {window}")
+        if now is not None:
+            self.sealed = max(self.sealed, now - now % self.window_ns)
+
+    def __write(self, lines):
+        for i in range(0, len(lines), self.batch_size):
+            self.db_write_api.write(bucket=self.config['bucket'], record=lines[i:i + self.batch_size],
+                                    write_precision=WritePrecision.NS)
+
+    def __flush(self, lines):
+        if not lines:
+            self.__replay()
+            return
+        try:
+            self.__write(lines)
+        except Exception as e:
+            print(f"DataLog.flush: 写入数据库失败，{len(lines)} 行溢出到 {self.spill_path}: {e}")
+            self.__spill(lines)
+            return
+        self.written += len(lines)
+        self.__replay()
+
+    def __spill(self, lines):
+        with open(self.spill_path, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        self.spilled += len(lines)
 
-    def push_data(self, data):
-        self.db_write_api.write(bucket=self.config['bucket'], record=data)
+    def __replay(self):
+        # 数据库恢复后按批重放溢出文件，失败时保留剩余部分
+        if not os.path.exists(self.spill_path):
+            return
+        with open(self.spill_path, 'r', encoding='utf-8') as f:
+            lines = [line for line in f.read().splitlines() if line]
+        for i in range(0, len(lines), self.batch_size):
+            try:
+                self.__write(lines[i:i + self.batch_size])
+            except Exception as e:
+                print(f"DataLog.replay: 重放溢出文件失败: {e}")
+                with open(self.spill_path, 'w', encoding='utf-8') as f:
+                    f.write("\n".join(lines[i:]) + "\n")
+                return
+            self.written += len(lines[i:i + self.batch_size])
+        os.remove(self.spill_path)
+        print(f"DataLog.replay: 已重放 {len(lines)} 行溢出数据")
 
     def close(self):
-        self.db_client.close()
\ No newline at end of file
+        with self.condition:
+            self.stop_flag = True
+            self.condition.notify()
+        self.join()
+        self.db_client.close()
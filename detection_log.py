@@ -0,0 +1,115 @@
+import glob
+import json
+import os
+from types import SimpleNamespace
+import numpy as np
+
+def chunk_path(path, index):
+    # 记录按帧数分块保存，path为x.npz时第i块保存为x.0000i.npz
+    root, ext = os.path.splitext(path)
+    return f"{root}.{index:05d}{ext or '.npz'}"
+
+def chunk_paths(path):
+    root, ext = os.path.splitext(path)
+    return sorted(glob.glob(f"{glob.escape(root)}.[0-9][0-9][0-9][0-9][0-9]{ext or '.npz'}"))
+
+class DetectionRecorder:
+    # 按列记录每帧检测结果(框、置信度、类别)和裁剪区域，每chunk_frames帧保存为一个npz分块，用于脱离检测器回放跟踪和计数
+    def __init__(self, path, meta, max_frames=0, chunk_frames=1500):
+        self.path = path
+        self.meta = meta  # 通道名、绊线、帧率、跟踪器配置等回放所需信息
+        self.max_frames = max_frames  # 最多记录的帧数，0表示不限制
+        self.chunk_frames = chunk_frames  # 每个分块的帧数，内存中最多保留一个分块
+        self.frames = 0
+        self.saved = 0  # 已保存到文件的帧数
+        # 进程重启后从已有分块之后继续编号，不覆盖之前的记录
+        chunks = chunk_paths(path)
+        self.chunk = int(chunks[-1].rsplit(".", 2)[-2]) + 1 if chunks else 0
+        self.columns = self.__empty()
+
+    @staticmethod
+    def __empty():
+        return {"frame": [], "time": [], "crop": [], "count": [], "xyxy": [], "conf": [], "cls": []}
+
+    @property
+    def full(self):
+        return self.max_frames and self.frames >= self.max_frames
+
+    def record(self, frame_index, timestamp, crop, det):
+        # crop为检测区域在原始帧中的(x, y, w, h)，det为cpu numpy的检测框
+        if self.full:
+            return
+        columns = self.columns
+        columns["frame"].append(frame_index)
+        columns["time"].append(timestamp)
+        columns["crop"].append(crop)
+        columns["count"].append(len(det))
+        if len(det):
+            columns["xyxy"].append(np.asarray(det.xyxy, dtype=np.float32).reshape(-1, 4))
+            columns["conf"].append(np.asarray(det.conf, dtype=np.float32))
+            columns["cls"].append(np.asarray(det.cls, dtype=np.int16))
+        self.frames += 1
+        if self.full:
+            print(f"DetectionRecorder.record: 已记录 {self.frames} 帧，停止记录 {self.path}")
+            self.flush()
+        elif self.frames - self.saved >= self.chunk_frames:
+            self.flush()
+
+    def flush(self):
+        # 未保存的帧写入新分块后清空，长时间运行内存不增长，进程被杀也只丢失当前分块
+        if self.frames == self.saved:
+            return
+        columns = self.columns
+        count = np.asarray(columns["count"], dtype=np.int64)
+        offset = np.zeros(len(count) + 1, dtype=np.int64)
+        np.cumsum(count, out=offset[1:])
+        path = chunk_path(self.path, self.chunk)
+        # 先写临时文件再替换，避免中途退出留下损坏的分块
+        tmp = f"{os.path.splitext(path)[0]}.tmp.npz"
+        np.savez_compressed(
+            tmp,
+            meta=np.array(json.dumps(self.meta, ensure_ascii=False)),
+            frame=np.asarray(columns["frame"], dtype=np.int64),
+            time=np.asarray(columns["time"], dtype=np.float64),
+            crop=np.asarray(columns["crop"], dtype=np.int32).reshape(-1, 4),
+            offset=offset,
+            xyxy=np.concatenate(columns["xyxy"]) if columns["xyxy"] else np.zeros((0, 4), dtype=np.float32),
+            conf=np.concatenate(columns["conf"]) if columns["conf"] else np.zeros(0, dtype=np.float32),
+            cls=np.concatenate(columns["cls"]) if columns["cls"] else np.zeros(0, dtype=np.int16))
+        os.replace(tmp, path)
+        print(f"DetectionRecorder.flush: 保存 {self.frames - self.saved} 帧 {int(offset[-1])} 个检测框到 {path}")
+        self.saved = self.frames
+        self.chunk += 1
+        self.columns = self.__empty()
+
+class DetectionLog:
+    # 读取DetectionRecorder保存的记录，path为单个npz文件或分块记录的recordPath，第i帧的检测框为xyxy[offset[i]:offset[i + 1]]
+    def __init__(self, path):
+        paths = [path] if os.path.isfile(path) else chunk_paths(path)
+        if not paths:
+            raise FileNotFoundError(f"DetectionLog: 找不到检测记录 {path}")
+        columns = {"frame": [], "time": [], "crop": [], "count": [], "xyxy": [], "conf": [], "cls": []}
+        for p in paths:
+            with np.load(p) as data:
+                self.meta = json.loads(str(data["meta"]))
+                columns["count"].append(np.diff(data["offset"]))
+                for key in ("frame", "time", "crop", "xyxy", "conf", "cls"):
+                    columns[key].append(data[key])
+        count = np.concatenate(columns["count"])
+        self.offset = np.zeros(len(count) + 1, dtype=np.int64)
+        np.cumsum(count, out=self.offset[1:])
+        self.frame = np.concatenate(columns["frame"])
+        self.time = np.concatenate(columns["time"])
+        self.crop = np.concatenate(columns["crop"])
+        self.xyxy = np.concatenate(columns["xyxy"])
+        self.conf = np.concatenate(columns["conf"])
+        self.cls = np.concatenate(columns["cls"]).astype(np.float32)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def detections(self, i):
+        # 返回跟踪器所需的Boxes字段视图，可直接传入跟踪器
+        start, end = self.offset[i], self.offset[i + 1]
+        return SimpleNamespace(xyxy=self.xyxy[start:end], conf=self.conf[start:end], cls=self.cls[start:end])
+
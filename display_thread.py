@@ -1,38 +1,49 @@
 import cv2
-import queue
-import time
-from threading import Thread
+from threading import Condition, Thread
 
 class DisplayThread(Thread):
-    def __init__(self, name, max_queue_size=10):
+    # 单槽邮箱：只保留最新一帧，新帧覆盖未显示的旧帧，push从不阻塞检测线程
+    def __init__(self, name, refresh_interval=0.05):
         super().__init__()
-        self.frame_queue = queue.Queue(maxsize=max_queue_size)
+        self.condition = Condition()
+        self.frame = None
         self.stop_flag = False
         self.name = name
+        self.refresh_interval = refresh_interval  # 无新帧时处理窗口事件的间隔(秒)
+        self.dropped = 0
 
     def run(self):
         while not self.stop_flag:
-            try:
-                frame = self.frame_queue.get_nowait()
-                cv2.imshow(self.name, frame)
-                if cv2.waitKey(1) & 0xFF == ord('q'):  # 按'q'退出
-                    self.stop_display()
-            except queue.Empty:
-                cv2.waitKey(1)  # 空队列时暂停显示
-                continue
+            with self.condition:
+                # 有新帧或停止时立即唤醒，否则超时后处理一次窗口事件
+                self.condition.wait_for(lambda: self.frame is not None or self.stop_flag, self.refresh_interval)
+                frame, self.frame = self.frame, None
+            if frame is not None:
+                cv2.imshow(self.name, frame.image)
+                frame.release()
+            if cv2.waitKey(1) & 0xFF == ord('q'):  # 按'q'退出
+                self.stop_flag = True
+        cv2.destroyWindow(self.name)
 
     def push(self, frame):
         if self.stop_flag:
             return False
-        try:
-            self.frame_queue.put(frame, block=True)  # 尝试将帧放入队列，如满则等待直到有空间
-        except queue.Full:
-            # 队列满时的处理逻辑可以根据需要添加，例如：跳过帧、记录日志等
-            pass
+        frame.retain()
+        with self.condition:
+            dropped, self.frame = self.frame, frame
+            self.condition.notify()
+        if dropped is not None:
+            self.dropped += 1
+            dropped.release()
         return True
 
     def stop(self):
-        self.stop_flag = True
-        cv2.destroyWindow(self.name)
-        time.sleep(0.1)
+        with self.condition:
+            self.stop_flag = True
+            self.condition.notify()
         self.join()
+        if self.frame is not None:
+            self.frame.release()
+            self.frame = None
+        if self.dropped:
+            print(f"DisplayThread.stop: 显示线程丢弃 {self.dropped} 帧 {self.name}")
@@ -1,18 +1,24 @@
 import json
 import cv2
-import datetime
 import time
-from datetime import datetime
-from ultralytics import YOLO
+import numpy as np
+import torch
+from ultralytics.trackers.byte_tracker import draw_tracks
+from ultralytics.trackers.track import TRACKER_MAP
+from ultralytics.utils import IterableSimpleNamespace, yaml_load
+from ultralytics.utils.checks import check_yaml
+from frame_reader import FrameReader
+from frame_pool import FramePool
 from display_thread import DisplayThread
 from save_thread import SaveThread
-from tracker_info import TrackerInfo
+from tracker_info import TripwireCounter
 from datalog import DataLog
-from utils import intersection_angle, color_palette
+from detection_log import DetectionRecorder
+from utils import color_palette
 
 
 class FlowCount:
-    def __init__(self, config_file):
+    def __init__(self, config_file, inference=None, heartbeat=None):
         self.config_file = config_file
         with open(config_file, 'r') as f:
             self.config = json.load(f)
@@ -24,37 +30,59 @@ class FlowCount:
         self.frame_skip = self.config["frameSkip"] if "frameSkip" in self.config else 1
         self.save_path = self.config["savePath"] if "savePath" in self.config else ""
         self.save_codec = self.config["saveCodec"] if "saveCodec" in self.config else "self"
+        self.save_width = self.config["saveWidth"] if "saveWidth" in self.config else 640
+        self.save_pix_fmt = self.config["savePixFmt"] if "savePixFmt" in self.config else "bgr24"
+        self.save_decimate = self.config["saveDecimate"] if "saveDecimate" in self.config else 1
         self.save_thread = None
         self.display_thread = None
         self.lines = self.config["lines"]
         self.show_window = self.config["showWindow"] if "showWindow" in self.config else False
         self.debug = self.config["debug"] if "debug" in self.config else False
         self.device = self.config["device"] if "device" in self.config else "cpu"
+        self.decode_thread = self.config["decodeThread"] if "decodeThread" in self.config else False
+        self.tracker_config = self.config["tracker"] if "tracker" in self.config else "bytetrack.yaml"
+        self.record_path = self.config["recordPath"] if "recordPath" in self.config else ""
+        self.record_frames = self.config["recordFrames"] if "recordFrames" in self.config else 0
+        self.record_chunk = self.config["recordChunk"] if "recordChunk" in self.config else 1500
+        self.recorder = None
         self.in_count = 0
         self.out_count = 0
         self.cross_render = 0
-        self.trackers = {}
+        self.counter = None
+        self.tracks = None
+        self.frame_index = 0
+        self.tracker = None
+        self.queue_size = 4
+        self.pool = None
+        self.inference = inference
+        self.heartbeat = heartbeat
         self.__load_model()
         self.__init_db()
         self.__init_debug_view()
     
     def __load_model(self):
-        print(f"FlowCount.load_model: 加载模型 {self.model_path}")
-        self.detector = YOLO(self.model_path)
+        # master模式下由外部传入共享推理服务，slave模式下取进程内按模型和设备共享的推理服务
+        if self.inference is None:
+            from inference_service import shared_service  # 只有slave模式需要加载检测模型，延迟导入加快worker进程启动
+
+            print(f"FlowCount.load_model: 加载模型 {self.model_path}")
+            self.inference = shared_service(self.model_path, self.device, max_batch_size=1, max_wait_ms=0)
 
     def __init_db(self):
         print(f"FlowCount.init_db: 初始化数据库")
-        self.db = DataLog(self.config["db"])
+        self.db = DataLog(self.config["db"], self.config["name"])
+        self.db.start()
 
     def __init_debug_view(self):
         print(f"FlowCount.init_debug_view: 初始化调试视图")
         if self.show_window:
-            self.display_thread = DisplayThread(self.config_file, max_queue_size=10)
+            self.display_thread = DisplayThread(self.config_file)
             self.display_thread.start()
         
     def run(self):
         print(f"FlowCount.run: 以配置文件 {self.config_file} 运行slave进程")
         while True:
+            self.__beat()
             self.__loop()
             time.sleep(3)
         if self.db:
@@ -64,7 +92,6 @@ class FlowCount:
 
     def __loop(self):
         cap = cv2.VideoCapture(self.source_url, cv2.CAP_FFMPEG)
-        current_frame = 0
 
         # 确定输出视频的分辨率和帧率
         self.frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
@@ -85,20 +112,53 @@ class FlowCount:
             self.save_thread = SaveThread(
                 self.save_path, self.write_fps,
                 self.frame_width, self.frame_height, 
-                self.save_codec, max_queue_size=10)
+                self.save_codec, max_queue_size=self.queue_size,
+                scale_width=self.save_width, pix_fmt=self.save_pix_fmt, decimate=self.save_decimate)
             self.save_thread.start()
 
+        if self.record_path and self.recorder is None:
+            # 记录检测结果及回放所需的场景信息，断流重连后继续追加到同一记录
+            self.recorder = DetectionRecorder(self.record_path, {
+                "name": self.config["name"], "source": self.source_url, "target": self.target_area,
+                "lines": self.lines, "fps": self.write_fps, "tracker": self.tracker_config,
+                "width": self.frame_width, "height": self.frame_height}, self.record_frames, self.record_chunk)
+
+        # 帧池槽位数覆盖解码中、待检测、检测中、显示邮箱以及推流队列中的帧，正常情况下无需临时分配
+        slots = 3 + (1 if self.display_thread else 0) + (self.queue_size if self.save_thread else 0)
+        self.pool = FramePool(self.frame_width, self.frame_height, slots)
+
+        if self.decode_thread:
+            self.__read_threaded(cap, sample_interval)
+        else:
+            self.__read(cap, sample_interval)
+
+        # 释放资源
+        cap.release()
+        if self.recorder:
+            self.recorder.flush()
+        if self.save_thread:
+            self.save_thread.stop()
+            self.save_thread = None
+        if self.pool.exhausted:
+            print(f"FlowCount.loop: 帧池耗尽 {self.pool.exhausted} 次 {self.source_url}")
+
+    def __read(self, cap, sample_interval):
+        current_frame = 0
         while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
+            self.__beat()
+            # 跳过的帧只grab不解码，仅采样帧retrieve
+            if not cap.grab():
                 break
 
             # 仅在符合帧间隔的帧上运行检测
             if current_frame % sample_interval == 0:
-                if not self.__detect(frame):
+                frame = self.pool.retrieve(cap)
+                if frame is None:
+                    break
+                ok = self.__process(frame)
+                frame.release()
+                if not ok:
                     break
-                self.__show(frame)
-                self.__save(frame)
 
             current_frame += 1
 
@@ -107,10 +167,30 @@ class FlowCount:
             # if self.debug:
                 # print(f"FlowCount.loop: 当前进度 {progress:.2f} s", end="\r")
 
-        # 释放资源
-        cap.release()
-        if self.save_thread:
-            self.save_thread.stop()
+    def __read_threaded(self, cap, sample_interval):
+        # 独立解码线程只保留最新采样帧，检测跟不上时丢弃旧帧避免直播流延迟累积
+        reader = FrameReader(cap, self.pool, sample_interval)
+        reader.start()
+        while True:
+            self.__beat()
+            frame = reader.read()
+            if frame is None:
+                break
+            ok = self.__process(frame)
+            frame.release()
+            if not ok:
+                break
+        reader.stop()
+        if reader.dropped:
+            print(f"FlowCount.loop: 解码线程丢弃 {reader.dropped} 帧 {self.source_url}")
+
+    def __process(self, frame):
+        # 调试信息直接绘制在帧池内存上，显示和推流线程各自持有引用，用完归还
+        if not self.__detect(frame.image):
+            return False
+        self.__show(frame)
+        self.__save(frame)
+        return True
 
     def __detect(self, frame):
         target_frame = frame
@@ -118,144 +198,57 @@ class FlowCount:
             x1, y1, x2, y2 = self.target_area
             target_frame = frame[y1:y2, x1:x2]
         
-        # 首先为所有跟踪器的计数器增加1
-        for tracker in self.trackers.values():
-            tracker.frame_count += 1
-            
-        results = self.detector.track(
-            target_frame, 
-            save=False, 
-            imgsz=640, 
-            conf=0.1, 
-            iou=0.7,
-            verbose=False,
-            show_labels=False, 
-            show_conf=False, 
-            show_boxes=False, 
-            classes=0, 
-            tracker="bytetrack.yaml", 
-            persist=True, 
-            frame_rate=self.write_fps, device=self.device)
-        
+        # 帧序号递增，目标未更新的帧数即为当前帧序号与最后出现帧序号之差
+        self.frame_index += 1
+
+        result = self.__track(self.inference.infer(target_frame), target_frame)
+
         if self.target_area and self.debug:
             cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 1)
 
-        for box in results[0].boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-            if self.target_area:
-                x1 += self.target_area[0]
-                y1 += self.target_area[1]
-                x2 += self.target_area[0]
-                y2 += self.target_area[1]
-            center = [(x1 + x2) // 2, y1]
-
-            if box.is_track:
-                box.test = True
-                id = box.id.item()
-                # 根据ID取余颜色表长度获取颜色
-                color = color_palette[int(id) % len(color_palette)]
-                if self.debug:
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        # 跟踪结果按列整体处理，不再逐框创建Boxes对象
+        table = result.boxes.table
+        boxes = table.xyxy.astype(np.int64)
+        if self.target_area:
+            boxes += [self.target_area[0], self.target_area[1], self.target_area[0], self.target_area[1]]
+        ids = table.id.astype(np.int64).tolist() if result.boxes.is_track else []
+        centers = np.stack([(boxes[:, 0] + boxes[:, 2]) // 2, boxes[:, 1]], axis=1)
 
-                tracker = self.trackers.get(id)
-                if tracker is None:
-                    tracker = TrackerInfo()
-                    self.trackers[id] = tracker
-                    
-                # 重置对应目标的帧计数器
-                tracker.frame_count = 0
-
-                # 检查history最后一个点和center是否与绊线相交
-                if len(tracker.history) > 0 : # and not tracker.counted:
-                    last_center = tracker.history[-1]
-
-                    if self.debug:
-                        start_point = center
-                        # 绘制历史轨迹
-                        for i in range(len(tracker.history) - 1, 0, -1):
-                            end_point = tracker.history[i]
-                            # 使用获取的颜色绘制线条
-                            cv2.line(frame, start_point, end_point, color, 2)
-                            start_point = tracker.history[i]
-
-                    # 判断是否移动
-                    if last_center != center:
-                        for i in range(0, len(self.lines) - 2, 2):
-                            line = self.lines[i:i + 4]
-                            x1, y1, x2, y2 = line
-                            # 计算移动向量和绊线向量的夹角
-                            # fix bug: 导致夹角计算错误，因此在计算时加上一个很小的偏移量，避免轨迹点与绊线重合情况下可能连续两次碰撞，用例：
-                            # angle_degrees, intersected = intersection_angle([654, 97], [650, 97], [650, 0], [650, 100])
-                            # angle_degrees, intersected = intersection_angle([650, 97], [649, 97], [650, 0], [650, 100])
-                            angle_degrees, intersected = intersection_angle(last_center, center, [x1 + .0001, y1 + .0001], [x2 + .0001, y2 + .0001])
-
-                            if intersected:
-                                self.cross_render = self.write_fps
-                                if angle_degrees < 180:
-                                    if tracker.out_ready:
-                                        # 如果已经碰触出绊线，重置出绊线候选
-                                        tracker.out_ready = False
-                                    else:
-                                        # 碰触入绊线，进入出绊线候选
-                                        tracker.in_ready = True
-                                else:
-                                    if tracker.in_ready:
-                                        # 如果已经碰触入绊线，重置入绊线候选
-                                        tracker.in_ready = False
-                                    else:
-                                        # 碰触出绊线，进入入绊线候选
-                                        tracker.out_ready = True
-                                #bugfix 去掉break，一次碰撞触发多个绊线都需要处理
-                                #break
-
-                # 保持历史记录长度最多为1秒
-                if len(self.trackers[id].history) >= self.write_fps:
-                    self.trackers[id].history.pop(0)  # 移除最早的中心点
-                self.trackers[id].history.append(center)
-            else:
-                # print("not track")
-                if self.debug:
+        if self.debug:
+            for id, (x1, y1, x2, y2) in zip(ids or [None] * len(boxes), boxes.tolist()):
+                if id is None:
                     cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 0, 0), 1)
-                pass
+                else:
+                    # 根据ID取余颜色表长度获取颜色
+                    color = color_palette[id % len(color_palette)]
+                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+
+        if ids:
+            if self.debug:
+                for id, center in zip(ids, centers.tolist()):
+                    slot = self.tracks.index.get(id)
+                    if slot is None:
+                        continue
+                    color = color_palette[id % len(color_palette)]
+                    start_point = center
+                    # 绘制历史轨迹
+                    for end_point in self.tracks.trail(slot)[:0:-1].tolist():
+                        cv2.line(frame, start_point, end_point, color, 2)
+                        start_point = end_point
+
+            # 更新历史中心点并判断与绊线相交
+            _, crossings = self.counter.update(ids, centers, self.frame_index)
+            if crossings:
+                self.cross_render = self.write_fps
 
         # 删除4秒未更新的跟踪器
-        to_delete = [id for id, tracker in self.trackers.items() if tracker.frame_count > self.write_fps * 4]
-        for id in to_delete:
-            tracker = self.trackers[id]
-            if tracker:
-                if tracker.in_ready:
-                    tracker.in_ready = False
-                    self.in_count += 1
-                    self.db.push_data([
-                            {
-                                "measurement": "flow",
-                                "fields": {
-                                    "count": 1,
-                                },
-                                "tags": {
-                                    "ch": self.config["name"],
-                                    "direct": "in",
-                                },
-                                "time": datetime.utcnow().isoformat()
-                            }
-                        ])
-                if tracker.out_ready:
-                    tracker.out_ready = False
-                    self.out_count += 1
-                    self.db.push_data([
-                            {
-                                "measurement": "flow",
-                                "fields": {
-                                    "count": 1,
-                                },
-                                "tags": {
-                                    "ch": self.config["name"],
-                                    "direct": "out",
-                                },
-                                "time": datetime.utcnow().isoformat()
-                            }
-                        ])
-            del self.trackers[id]
+        n_in, n_out = self.counter.expire(self.frame_index)
+        if n_in:
+            self.in_count += n_in
+            self.db.count(self.config["name"], "in", n_in)
+        if n_out:
+            self.out_count += n_out
+            self.db.count(self.config["name"], "out", n_out)
 
         if self.debug:
             show_text = True
@@ -271,15 +264,8 @@ class FlowCount:
                     show_text = False
                     cv2.putText(frame, f'In: {self.in_count}, Out: {self.out_count}', (x1, y1 - 10), cv2.FONT_HERSHEY_PLAIN, 1, color, 1)
         
-            pending_in = 0
-            pending_out = 0
-            
-            for tracker in self.trackers.values():
-                if tracker.in_ready:
-                    pending_in += 1
-                if tracker.out_ready:
-                    pending_out += 1
-    
+            pending_in, pending_out = self.tracks.pending()
+
             # 在黑色矩形背景上绘制合并后的文字
             text_in = f'In:{self.in_count}' + (f'+{pending_in}' if pending_in > 0 else '')
             text_out = f'Out:{self.out_count}' + (f'+{pending_out}' if pending_out > 0 else '')
@@ -290,6 +276,36 @@ class FlowCount:
 
         return True
 
+    def __beat(self):
+        # supervisor模式下上报心跳，用于检测工作进程是否卡死
+        if self.heartbeat:
+            self.heartbeat()
+
+    def __track(self, result, img):
+        # 每个通道独立维护自己的跟踪器状态
+        if self.tracker is None:
+            cfg = IterableSimpleNamespace(**yaml_load(check_yaml(self.tracker_config)))
+            self.tracker = TRACKER_MAP[cfg.tracker_type](args=cfg, frame_rate=self.write_fps)
+            # 跟踪框只在调试输出中绘制
+            if self.debug:
+                self.tracker.overlay = draw_tracks
+            self.counter = TripwireCounter(self.lines, self.write_fps)
+            self.tracks = self.counter.tracks
+
+        det = result.boxes.cpu().numpy()
+        if self.recorder:
+            x, y = self.target_area[:2] if self.target_area else (0, 0)
+            self.recorder.record(self.frame_index, time.time(), (x, y, img.shape[1], img.shape[0]), det)
+        if len(det) == 0:
+            return result
+        tracks = self.tracker.update(det, img)
+        if len(tracks) == 0:
+            return result
+        idx = tracks[:, -1].astype(int)
+        result = result[idx]
+        result.update(boxes=torch.as_tensor(tracks[:, :-1]))
+        return result
+
     def __show(self, frame):
         if self.display_thread:
             return self.display_thread.push(frame)
@@ -0,0 +1,65 @@
+import numpy as np
+from threading import Lock
+
+class PooledFrame:
+    # 帧池中的一个槽位，image直接引用帧池内存，引用计数归零后回到帧池
+    def __init__(self, pool, image, pooled=True):
+        self.pool = pool
+        self.image = image
+        self.pooled = pooled
+        self.refs = 0
+
+    def retain(self):
+        self.pool.retain(self)
+        return self
+
+    def release(self):
+        self.pool.release(self)
+
+class FramePool:
+    # 预分配的帧环形缓冲：解码直接写入槽位，检测、显示和推流线程共享同一块内存，按引用计数回收
+    def __init__(self, width, height, slots):
+        self.shape = (height, width, 3)
+        self.buffer = np.zeros((slots,) + self.shape, dtype=np.uint8)
+        self.free = [PooledFrame(self, self.buffer[i]) for i in range(slots - 1, -1, -1)]
+        self.lock = Lock()
+        self.exhausted = 0
+
+    def acquire(self):
+        # 取出一个空闲槽位，引用计数为1；消费者未及时归还导致帧池耗尽时临时分配，检测线程从不等待
+        with self.lock:
+            if self.free:
+                frame = self.free.pop()
+            else:
+                self.exhausted += 1
+                frame = PooledFrame(self, np.empty(self.shape, dtype=np.uint8), pooled=False)
+            frame.refs = 1
+            return frame
+
+    def wrap(self, image):
+        # 分辨率与帧池不一致的帧不入池，仅套用相同的引用计数接口
+        frame = PooledFrame(self, image, pooled=False)
+        frame.refs = 1
+        return frame
+
+    def retain(self, frame):
+        with self.lock:
+            frame.refs += 1
+
+    def release(self, frame):
+        with self.lock:
+            frame.refs -= 1
+            if frame.refs == 0 and frame.pooled:
+                self.free.append(frame)
+
+    def retrieve(self, cap):
+        # 将已grab的帧解码到空闲槽位，失败返回None
+        frame = self.acquire()
+        ret, image = cap.retrieve(frame.image)
+        if not ret:
+            frame.release()
+            return None
+        if not np.shares_memory(image, frame.image):
+            frame.release()
+            return self.wrap(image)
+        return frame
@@ -0,0 +1,50 @@
+from threading import Condition, Thread
+
+class FrameReader(Thread):
+    # 解码线程：跳过的帧只grab不解码，采样帧retrieve后只保留最新一帧，检测慢时丢弃旧帧而不累积延迟
+    def __init__(self, cap, pool, sample_interval=1):
+        super().__init__(daemon=True)
+        self.cap = cap
+        self.pool = pool
+        self.sample_interval = sample_interval
+        self.condition = Condition()
+        self.frame = None
+        self.finished = False
+        self.stop_flag = False
+        self.dropped = 0
+
+    def run(self):
+        current_frame = 0
+        while not self.stop_flag and self.cap.isOpened():
+            if not self.cap.grab():
+                break
+            if current_frame % self.sample_interval == 0:
+                frame = self.pool.retrieve(self.cap)
+                if frame is None:
+                    break
+                with self.condition:
+                    dropped, self.frame = self.frame, frame
+                    self.condition.notify()
+                # 未被取走的旧帧直接归还帧池
+                if dropped is not None:
+                    self.dropped += 1
+                    dropped.release()
+            current_frame += 1
+
+        with self.condition:
+            self.finished = True
+            self.condition.notify()
+
+    def read(self, timeout=None):
+        # 返回最新的采样帧，调用方负责release，流结束时返回None
+        with self.condition:
+            self.condition.wait_for(lambda: self.frame is not None or self.finished, timeout)
+            frame, self.frame = self.frame, None
+            return frame
+
+    def stop(self):
+        self.stop_flag = True
+        self.join()
+        if self.frame is not None:
+            self.frame.release()
+            self.frame = None
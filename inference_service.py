@@ -0,0 +1,144 @@
+import os
+import queue
+import time
+from threading import Event, Lock, Thread
+import numpy as np
+from model_cache import load_detector
+
+
+class InferenceRequest:
+    def __init__(self, frame, callback=None):
+        self.frame = frame
+        self.callback = callback
+        self.result = None
+        self.error = None
+        self.done = Event()
+
+    def finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.done.set()
+        if self.callback:
+            self.callback(self)
+
+    def wait(self, timeout=None):
+        if not self.done.wait(timeout):
+            raise TimeoutError("InferenceRequest.wait: 等待推理结果超时")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+# 多通道共享的推理服务，将各通道提交的帧动态合批后一次前向推理
+class InferenceService(Thread):
+    def __init__(self, model_path, device="cpu", imgsz=640, conf=0.1, iou=0.7, classes=0,
+                 max_batch_size=8, max_wait_ms=10, max_queue_size=64, persistent_io=1,
+                 model_cache=True):
+        super().__init__(daemon=True)
+        self.model_path = model_path
+        self.device = device
+        self.imgsz = imgsz
+        self.conf = conf
+        self.iou = iou
+        self.classes = classes
+        self.max_batch_size = max(1, max_batch_size)
+        # ONNX/OpenVINO模型在CPU上复用绑定的输入输出缓冲区，单线程前向且结果在下一批前已完成后处理，1个即可
+        self.persistent_io = persistent_io
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self.request_queue = queue.Queue(maxsize=max_queue_size)
+        self.stop_flag = False
+        self.batch_count = 0
+        self.frame_count = 0
+        print(f"InferenceService: 加载模型 {self.model_path} 设备 {self.device}")
+        self.detector = load_detector(self.model_path, self.device, use_cache=model_cache)
+
+    def submit(self, frame, callback=None):
+        request = InferenceRequest(frame, callback)
+        self.request_queue.put(request, block=True)
+        return request
+
+    def infer(self, frame, timeout=None):
+        return self.submit(frame).wait(timeout)
+
+    def run(self):
+        self.__warmup()
+        while not self.stop_flag:
+            batch = self.__collect()
+            if batch:
+                self.__forward(batch)
+
+    def __collect(self):
+        try:
+            first = self.request_queue.get(block=True, timeout=0.1)
+        except queue.Empty:
+            return []
+
+        # 在最大等待时间内尽量凑满一个批次
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self.request_queue.get(block=True, timeout=remaining))
+                else:
+                    batch.append(self.request_queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def __predict(self, frames):
+        return self.detector.predict(
+            frames,
+            save=False,
+            imgsz=self.imgsz,
+            conf=self.conf,
+            iou=self.iou,
+            verbose=False,
+            classes=self.classes,
+            fused_preprocess=True,
+            persistent_io=self.persistent_io,
+            device=self.device)
+
+    def __warmup(self):
+        # 启动后先用空白帧完成预测器初始化和首次前向，与通道打开视频源等初始化并行，首帧不再等待
+        t = time.perf_counter()
+        try:
+            self.__predict([np.zeros((self.imgsz, self.imgsz, 3), dtype=np.uint8)])
+        except Exception as e:
+            print(f"InferenceService: 预热失败: {e}")
+            return
+        print(f"InferenceService: 预热完成 耗时 {time.perf_counter() - t:.2f}s")
+
+    def __forward(self, batch):
+        try:
+            results = self.__predict([request.frame for request in batch])
+        except Exception as e:
+            print(f"InferenceService: 推理发生异常: {e}")
+            for request in batch:
+                request.finish(error=e)
+            return
+
+        self.batch_count += 1
+        self.frame_count += len(batch)
+        for request, result in zip(batch, results):
+            request.finish(result)
+
+    def stop(self):
+        self.stop_flag = True
+        self.join()
+
+
+_services = {}
+_services_lock = Lock()
+
+
+def shared_service(model_path, device="cpu", **kwargs):
+    # 进程内相同模型和设备只加载一次模型，所有通道共享同一个已启动的推理服务
+    key = (os.path.abspath(model_path) if os.path.isfile(model_path) else model_path, str(device))
+    with _services_lock:
+        service = _services.get(key)
+        if service is None or not service.is_alive():
+            service = _services[key] = InferenceService(model_path, device, **kwargs)
+            service.start()
+        return service
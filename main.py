@@ -1,54 +1,84 @@
 import argparse
+import json
 import threading
-import time
 import sys
 from pathlib import Path
 from flow_count import FlowCount
+from inference_service import shared_service
+from supervisor import Supervisor
 
-def slave_main(config_file):
+def slave_main(config_file, inference=None):
     print(f"以配置文件 {config_file} 运行slave线程")
-    flow_count = FlowCount(config_file)
+    flow_count = FlowCount(config_file, inference)
     flow_count.run()
 
-def start_slave_thread(config_file):
-    return threading.Thread(target=slave_main, args=(config_file,))
+def start_slave_thread(config_file, inference=None):
+    return threading.Thread(target=slave_main, args=(config_file, inference))
 
-def master_main(config_dir):
+def inference_key(config_file):
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    return config.get("model", ""), config.get("device", "cpu")
+
+def start_inference_services(keys, max_batch_size, max_wait_ms):
+    # 相同模型和设备的通道共享一个推理服务
+    services = {}
+    for key in set(keys):
+        services[key] = shared_service(key[0], key[1], max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    return services
+
+def master_main(config_dir, max_batch_size=8, max_wait_ms=10):
     # 获取配置目录下所有JSON配置文件
     config_files = [str(f) for f in Path(config_dir).glob('*.json')]
+    keys = {config_file: inference_key(config_file) for config_file in config_files}
+    services = start_inference_services(keys.values(), max_batch_size, max_wait_ms)
     slaves = {}
 
     # 为每个配置文件启动一个slave线程
     for config_file in config_files:
-        t = start_slave_thread(config_file)
+        t = start_slave_thread(config_file, services[keys[config_file]])
         t.start()
         slaves[t.ident] = (t, config_file)
-        time.sleep(5)
 
     print("running ...")
     for t, _ in slaves.values():
         t.join()
+    for service in services.values():
+        service.stop()
+
+def supervisor_main(config_dir, max_batch_size=8, max_wait_ms=10, hang_timeout=60):
+    # 每个通道运行在独立进程中，由共享推理进程统一推理
+    config_files = [str(f) for f in Path(config_dir).glob('*.json')]
+    Supervisor(config_files, max_batch_size, max_wait_ms, hang_timeout).run()
 
 
 def main():
     parser = argparse.ArgumentParser(description="启动master或slave线程。")
-    parser.add_argument("--mode", choices=["master", "slave"], default="master", help="运行模式")
-    parser.add_argument("--config", help="对于slave模式，需要指定配置文件路径；对于master模式，需要指定配置文件目录路径。")
+    parser.add_argument("--mode", choices=["master", "slave", "supervisor"], default="master", help="运行模式")
+    parser.add_argument("--config", help="对于slave模式，需要指定配置文件路径；对于master和supervisor模式，需要指定配置文件目录路径。")
+    parser.add_argument("--max-batch", type=int, default=8, help="master和supervisor模式下共享推理服务的最大批大小")
+    parser.add_argument("--max-wait-ms", type=float, default=10, help="master和supervisor模式下凑批的最长等待时间(毫秒)")
+    parser.add_argument("--hang-timeout", type=float, default=60, help="supervisor模式下工作进程无心跳多少秒后重启")
     args = parser.parse_args()
 
     if args.mode == "master":
         if not args.config or not Path(args.config).is_dir():
             print("错误：Master模式需要指定包含配置文件的目录路径。")
             sys.exit(1)
-        master_main(args.config)
+        master_main(args.config, args.max_batch, args.max_wait_ms)
     elif args.mode == "slave":
         if not args.config or not Path(args.config).is_file():
             print("错误：Slave模式需要指定配置文件路径。")
             sys.exit(1)
         slave_main(args.config)
+    elif args.mode == "supervisor":
+        if not args.config or not Path(args.config).is_dir():
+            print("错误：Supervisor模式需要指定包含配置文件的目录路径。")
+            sys.exit(1)
+        supervisor_main(args.config, args.max_batch, args.max_wait_ms, args.hang_timeout)
     else:
         print("错误：无效的模式或配置。")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
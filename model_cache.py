@@ -0,0 +1,62 @@
+import hashlib
+import os
+import time
+
+# 融合后的检测模型缓存：首次加载.pt权重时将Conv+BN融合后的float模型序列化保存，
+# 之后以权重内容哈希和设备为键直接读取，跳过半精度转换和融合
+
+
+def weights_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def artifact_path(model_path, device, cache_dir=None):
+    import torch
+    from ultralytics import __version__
+
+    # torch和ultralytics版本也参与键值，升级后序列化格式或模块定义变化时自动重新生成
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(model_path)), "model_cache")
+    key = f"{weights_hash(model_path)}:{device}:{torch.__version__}:{__version__}"
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    return os.path.join(cache_dir, f"{name}-{hashlib.sha256(key.encode()).hexdigest()[:16]}.pt")
+
+
+def save_artifact(detector, path):
+    import torch
+
+    detector.model.fuse(verbose=False)
+    ckpt = detector.ckpt or {}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # 先写临时文件再替换，多个进程同时生成时不会读到不完整的缓存
+    tmp = f"{path}.{os.getpid()}.tmp"
+    torch.save({"model": detector.model, "train_args": ckpt.get("train_args", {}), "version": ckpt.get("version"),
+                "date": ckpt.get("date")}, tmp)
+    os.replace(tmp, path)
+
+
+def load_detector(model_path, device="cpu", cache_dir=None, use_cache=True):
+    from ultralytics import YOLO
+
+    # 只缓存本地.pt权重，导出格式(onnx、openvino等)本身已是推理用的模型
+    if not use_cache or not model_path.endswith(".pt") or not os.path.isfile(model_path):
+        return YOLO(model_path)
+    t = time.perf_counter()
+    path = artifact_path(model_path, device, cache_dir)
+    if os.path.isfile(path):
+        try:
+            detector = YOLO(path)
+            print(f"load_detector: 读取融合模型缓存 {path} 耗时 {time.perf_counter() - t:.2f}s")
+            return detector
+        except Exception as e:
+            print(f"load_detector: 读取融合模型缓存 {path} 失败，重新生成: {e}")
+    detector = YOLO(model_path)
+    try:
+        save_artifact(detector, path)
+        print(f"load_detector: 生成融合模型缓存 {path} 耗时 {time.perf_counter() - t:.2f}s")
+    except Exception as e:
+        print(f"load_detector: 保存融合模型缓存 {path} 失败: {e}")
+    return detector
@@ -1,25 +1,50 @@
+import cv2
+import numpy as np
 import queue
 import subprocess
 import time
 from threading import Thread
 
 class SaveThread(Thread):
-    def __init__(self, path, fps, width, height, codec, ffmpegVerbose=False, max_queue_size=10):
+    def __init__(self, path, fps, width, height, codec, ffmpegVerbose=False, max_queue_size=10,
+                 scale_width=640, pix_fmt="bgr24", decimate=1):
         super().__init__()
         self.frame_queue = queue.Queue(maxsize=max_queue_size)
         self.stop_flag = False
         self.path = path
-        self.fps = fps
+        self.decimate = max(1, int(decimate))
+        self.fps = fps / self.decimate
         self.width = width
         self.height = height
         self.current_frame = 0
         self.ffmpegVerbose = ffmpegVerbose
 
+        # 在进程内缩放到推流分辨率后再写入管道，宽度为0时保持原始分辨率，高度按比例取偶数
+        if scale_width and scale_width < width:
+            self.out_width = scale_width // 2 * 2
+            self.out_height = max(2, round(height * scale_width / width / 2) * 2)
+        else:
+            self.out_width = width
+            self.out_height = height
+        self.pix_fmt = pix_fmt
+        if self.pix_fmt == "yuv420p":
+            # yuv420p要求宽高为偶数，同样在进程内完成，ffmpeg收到的数据量仅为bgr24的一半
+            self.out_width = self.out_width // 2 * 2
+            self.out_height = self.out_height // 2 * 2
+        else:
+            self.pix_fmt = "bgr24"
+        self.resized = None
+        if (self.out_width, self.out_height) != (width, height):
+            self.resized = np.empty((self.out_height, self.out_width, 3), dtype=np.uint8)
+        self.converted = None
+        if self.pix_fmt == "yuv420p":
+            self.converted = np.empty((self.out_height * 3 // 2, self.out_width), dtype=np.uint8)
+
         if codec == "intel":
             self.codec = 'h264_qsv'
         elif codec == "amd":
             self.codec = 'h264_amf'
-        elif self.codec == "nvidia":
+        elif codec == "nvidia":
             self.codec = 'h264_nvenc'
         else:
             self.codec = 'libx264'
@@ -29,11 +54,10 @@ class SaveThread(Thread):
                         '-y',
                         '-f', 'rawvideo',
                         '-vcodec', 'rawvideo',
-                        '-pix_fmt', 'bgr24',
-                        '-s', '{}x{}'.format(self.width, self.height),
+                        '-pix_fmt', self.pix_fmt,
+                        '-s', '{}x{}'.format(self.out_width, self.out_height),
                         '-r', str(self.fps),
                         '-i', '-',
-                        '-vf', 'scale=640:-1',  # 设置宽度为640，高度自适应
                         '-b:v', '1M',  # 设置视频比特率为1Mbps
                         '-c:v', self.codec,
                         '-preset', 'fast',  # 选择适合的预设
@@ -104,29 +128,55 @@ class SaveThread(Thread):
             while not self.stop_flag:
                 try:
                     frame = self.frame_queue.get(block=True, timeout=0.01)
-                    # 将帧写入到FFmpeg进程的标准输入
-                    process.stdin.write(frame.tobytes())
                 except queue.Empty:
                     time.sleep(0.01)
                     continue
+                try:
+                    # 通过memoryview直接将缓冲区写入FFmpeg进程的标准输入，不再复制整帧
+                    process.stdin.write(memoryview(self.__convert(frame)).cast('B'))
                 except Exception as e:
                     print(f"推流进程 {self.path} 发生异常: {e}")
                     # FFmpeg进程已关闭，重新启动新的进程
                     break
+                finally:
+                    frame.release()
 
             process.stdin.close()
             process.terminate()
             process.wait()
             print(f"推流进程已退出 {self.path}")
-            self.frame_queue.queue.clear()
+            self.__clear()
+
+    def __convert(self, frame):
+        # 缩放和颜色空间转换都写入复用的缓冲区，不缩放也不转换时直接使用帧池内存
+        image = frame.image
+        if self.resized is not None:
+            image = cv2.resize(image, (self.out_width, self.out_height), dst=self.resized, interpolation=cv2.INTER_AREA)
+        if self.converted is not None:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2YUV_I420, dst=self.converted)
+        return image
+
+    def __clear(self):
+        # 丢弃队列中未写入的帧并归还帧池
+        while True:
+            try:
+                self.frame_queue.get_nowait().release()
+            except queue.Empty:
+                break
 
     def push(self, frame):
         if self.stop_flag:
             return False
+        # 按抽帧间隔丢弃帧，不进入队列
+        skip = self.current_frame % self.decimate
+        self.current_frame += 1
+        if skip:
+            return True
         try:
-            self.frame_queue.put_nowait(frame)  # 尝试将帧放入队列，不等待
+            self.frame_queue.put_nowait(frame.retain())  # 尝试将帧放入队列，不等待
         except queue.Full:
-            # 队列满时的处理逻辑可以根据需要添加，例如：跳过帧、记录日志等
+            # 队列满时跳过该帧，归还引用
+            frame.release()
             return False
         return True
 
@@ -0,0 +1,283 @@
+import json
+import multiprocessing as mp
+import queue
+import time
+from collections import Counter
+from multiprocessing import shared_memory
+from threading import Lock
+import numpy as np
+
+# 未配置target时先按1080p预留共享内存，工作进程遇到更大的帧时上报实际大小，由Supervisor重建
+DEFAULT_FRAME_BYTES = 1920 * 1080 * 3
+
+
+class SharedFrameRing:
+    # 每个通道一块共享内存，划分为若干槽位，帧数据直接写入槽位，进程间只传递槽位索引
+    def __init__(self, name=None, slot_bytes=DEFAULT_FRAME_BYTES, slots=2, create=False):
+        self.slot_bytes = slot_bytes
+        self.slots = slots
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=slot_bytes * slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+
+    def view(self, slot, shape):
+        return np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=slot * self.slot_bytes)
+
+    def write(self, slot, frame):
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"SharedFrameRing.write: 帧大小 {frame.nbytes} 超出槽位容量 {self.slot_bytes}")
+        view = self.view(slot, frame.shape)
+        view[...] = frame
+        return view
+
+    def close(self, unlink=False):
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class RemoteInference:
+    # 工作进程侧的推理代理，与InferenceService.infer接口一致
+    def __init__(self, channel, ring_name, slot_bytes, slots, names, request_queue, result_queue, timeout=30,
+                 frame_bytes=None):
+        self.channel = channel
+        self.ring = SharedFrameRing(ring_name, slot_bytes, slots)
+        self.frame_bytes = frame_bytes
+        self.names = names
+        self.request_queue = request_queue
+        self.result_queue = result_queue
+        self.timeout = timeout
+        # 以启动时间作为序号起点，避免重启后与上一个进程遗留的结果序号冲突
+        self.seq = time.time_ns()
+
+    def infer(self, frame, timeout=None):
+        from ultralytics.engine.results import Results
+        import torch
+
+        if frame.nbytes > self.ring.slot_bytes:
+            # 上报实际帧大小后退出，Supervisor按该大小重建共享内存再重启，避免每帧写入失败反复重启
+            if self.frame_bytes is not None:
+                self.frame_bytes.value = frame.nbytes
+            raise SystemExit(f"RemoteInference.infer: 通道 {self.channel} 帧大小 {frame.nbytes} "
+                             f"超出槽位容量 {self.ring.slot_bytes}，请求重建共享内存")
+        self.seq += 1
+        slot = self.seq % self.ring.slots
+        self.ring.write(slot, frame)
+        self.request_queue.put((self.channel, self.seq, self.ring.name, self.ring.slot_bytes, slot, frame.shape))
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"RemoteInference.infer: 通道 {self.channel} 等待推理结果超时")
+            try:
+                seq, boxes = self.result_queue.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            # 丢弃超时请求的过期结果
+            if seq != self.seq:
+                continue
+            if boxes is None:
+                raise RuntimeError(f"RemoteInference.infer: 通道 {self.channel} 推理失败")
+            # 跟踪器和调试绘制仍作用在原始帧上，共享内存槽位只用于推理
+            return Results(frame, path="", names=self.names, boxes=torch.from_numpy(boxes))
+
+
+def inference_main(model_path, device, request_queue, result_queues, ready_queue, max_batch_size, max_wait_ms):
+    from inference_service import InferenceService
+
+    service = InferenceService(model_path, device, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    service.start()
+    ready_queue.put(service.detector.names)
+    rings = {}  # 通道 -> 共享内存
+    stale = []  # 已被Supervisor替换、等待关闭的共享内存
+    pending = Counter()  # 共享内存名 -> 未完成的推理请求数
+    lock = Lock()
+
+    def reply(channel, seq, ring_name):
+        def callback(request):
+            boxes = None if request.error else request.result.boxes.data.cpu().numpy()
+            with lock:
+                pending[ring_name] -= 1
+            result_queues[channel].put((seq, boxes))
+        return callback
+
+    def idle(ring):
+        with lock:
+            return pending[ring.name] <= 0
+
+    while True:
+        channel, seq, ring_name, slot_bytes, slot, shape = request_queue.get()
+        ring = rings.get(channel)
+        if ring is None or ring.name != ring_name:
+            # 通道的共享内存被重建后关闭旧的映射，旧槽位上的请求全部推理完成后再关闭
+            if ring is not None:
+                stale.append(ring)
+            ring = rings[channel] = SharedFrameRing(ring_name, slot_bytes)
+        for old in [old for old in stale if idle(old)]:
+            old.close()
+            stale.remove(old)
+            with lock:
+                del pending[old.name]
+        with lock:
+            pending[ring.name] += 1
+        service.submit(ring.view(slot, shape), reply(channel, seq, ring.name))
+
+
+def worker_main(config_file, channel, ring_name, slot_bytes, slots, names, request_queue, result_queue, heartbeat,
+                frame_bytes):
+    from flow_count import FlowCount
+
+    print(f"以配置文件 {config_file} 运行worker进程")
+    inference = RemoteInference(channel, ring_name, slot_bytes, slots, names, request_queue, result_queue,
+                                frame_bytes=frame_bytes)
+
+    def beat():
+        heartbeat.value = time.time()
+
+    flow_count = FlowCount(config_file, inference, beat)
+    flow_count.run()
+
+
+class Worker:
+    def __init__(self, config_file, channel, ring, result_queue):
+        self.config_file = config_file
+        self.channel = channel
+        self.ring = ring
+        self.result_queue = result_queue
+        self.heartbeat = mp.Value('d', 0.0)
+        self.frame_bytes = mp.Value('q', 0)  # 工作进程上报的实际帧大小
+        self.process = None
+        self.restarts = 0
+
+
+class InferenceWorker:
+    def __init__(self, model_path, device, channels):
+        self.model_path = model_path
+        self.device = device
+        self.channels = channels
+        self.request_queue = mp.Queue()
+        self.process = None
+        self.names = None
+        self.restarts = 0
+
+
+def frame_bytes(config_file):
+    with open(config_file, 'r') as f:
+        config = json.load(f)
+    if "target" in config:
+        x1, y1, x2, y2 = config["target"]
+        return (x2 - x1) * (y2 - y1) * 3
+    return DEFAULT_FRAME_BYTES
+
+
+class Supervisor:
+    def __init__(self, config_files, max_batch_size=8, max_wait_ms=10, hang_timeout=60, check_interval=1):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.hang_timeout = hang_timeout
+        self.check_interval = check_interval
+        self.workers = []
+        self.inference_workers = {}
+
+        for channel, config_file in enumerate(config_files):
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+            key = (config.get("model", ""), config.get("device", "cpu"))
+            if key not in self.inference_workers:
+                self.inference_workers[key] = InferenceWorker(key[0], key[1], [])
+            ring = SharedFrameRing(slot_bytes=frame_bytes(config_file), create=True)
+            worker = Worker(config_file, channel, ring, mp.Queue())
+            self.inference_workers[key].channels.append(worker)
+            self.workers.append((worker, self.inference_workers[key]))
+
+    def __start_inference(self, inference_worker):
+        # 结果队列按通道编号索引
+        result_queues = {worker.channel: worker.result_queue for worker in inference_worker.channels}
+        ready_queue = mp.Queue()
+        inference_worker.process = mp.Process(
+            target=inference_main,
+            args=(inference_worker.model_path, inference_worker.device, inference_worker.request_queue,
+                  result_queues, ready_queue, self.max_batch_size, self.max_wait_ms),
+            daemon=True)
+        inference_worker.process.start()
+        while True:
+            try:
+                inference_worker.names = ready_queue.get(timeout=1)
+                break
+            except queue.Empty:
+                if not inference_worker.process.is_alive():
+                    raise RuntimeError(f"Supervisor: 推理进程启动失败 {inference_worker.model_path}")
+        print(f"Supervisor: 推理进程已启动 {inference_worker.model_path} pid={inference_worker.process.pid}")
+
+    def __start_worker(self, worker, inference_worker):
+        worker.heartbeat.value = time.time()
+        worker.process = mp.Process(
+            target=worker_main,
+            args=(worker.config_file, worker.channel, worker.ring.name, worker.ring.slot_bytes, worker.ring.slots,
+                  inference_worker.names, inference_worker.request_queue, worker.result_queue, worker.heartbeat,
+                  worker.frame_bytes),
+            daemon=True)
+        worker.process.start()
+        print(f"Supervisor: 工作进程已启动 {worker.config_file} pid={worker.process.pid}")
+
+    def __resize_ring(self, worker):
+        # 推理进程按名称打开共享内存，新建的共享内存名称不同，无需通知推理进程
+        slot_bytes = worker.frame_bytes.value
+        print(f"Supervisor: 通道 {worker.config_file} 帧大小 {slot_bytes} 超出共享内存槽位 {worker.ring.slot_bytes}，"
+              f"重建共享内存后重启")
+        worker.ring.close(unlink=True)
+        worker.ring = SharedFrameRing(slot_bytes=slot_bytes, slots=worker.ring.slots, create=True)
+
+    def __stop_process(self, process):
+        process.terminate()
+        process.join(5)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def run(self):
+        for inference_worker in self.inference_workers.values():
+            self.__start_inference(inference_worker)
+        for worker, inference_worker in self.workers:
+            self.__start_worker(worker, inference_worker)
+
+        print("running ...")
+        try:
+            while True:
+                time.sleep(self.check_interval)
+                self.__check()
+        finally:
+            self.stop()
+
+    def __check(self):
+        for inference_worker in self.inference_workers.values():
+            if not inference_worker.process.is_alive():
+                inference_worker.restarts += 1
+                print(f"Supervisor: 推理进程异常退出，重启 {inference_worker.model_path}")
+                self.__start_inference(inference_worker)
+
+        now = time.time()
+        for worker, inference_worker in self.workers:
+            if not worker.process.is_alive():
+                if worker.frame_bytes.value > worker.ring.slot_bytes:
+                    self.__resize_ring(worker)
+                else:
+                    print(f"Supervisor: 工作进程异常退出 {worker.config_file} exitcode={worker.process.exitcode}，重启")
+            elif now - worker.heartbeat.value > self.hang_timeout:
+                print(f"Supervisor: 工作进程 {worker.config_file} 超过 {self.hang_timeout} 秒无心跳，重启")
+                self.__stop_process(worker.process)
+            else:
+                continue
+            worker.restarts += 1
+            self.__start_worker(worker, inference_worker)
+
+    def stop(self):
+        for worker, _ in self.workers:
+            if worker.process and worker.process.is_alive():
+                self.__stop_process(worker.process)
+            worker.ring.close(unlink=True)
+        for inference_worker in self.inference_workers.values():
+            if inference_worker.process and inference_worker.process.is_alive():
+                self.__stop_process(inference_worker.process)
@@ -1,6 +1,137 @@
-class TrackerInfo:
-    def __init__(self):
-        self.history = []  # 存储历史中心点
-        self.frame_count = 0  # 自上次更新以来的帧计数器
-        self.in_ready = False # 入绊线候选
-        self.out_ready = False # 出绊线候选
\ No newline at end of file
+import math
+import numpy as np
+from utils import crossing_directions, polyline_segments
+
+class TrackTable:
+    # 以数组列存储所有目标状态，目标ID通过索引映射到槽位，老化和淘汰均为向量化操作
+    def __init__(self, history_size, capacity=64):
+        self.history_size = max(1, int(history_size))
+        self.index = {}  # 目标ID -> 槽位
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        self.last_seen = np.zeros(capacity, dtype=np.int64)  # 最后一次被跟踪到的帧序号
+        self.in_ready = np.zeros(capacity, dtype=bool)  # 入绊线候选
+        self.out_ready = np.zeros(capacity, dtype=bool)  # 出绊线候选
+        self.history = np.zeros((capacity, self.history_size, 2), dtype=np.int32)  # 历史中心点环形缓冲
+        self.history_len = np.zeros(capacity, dtype=np.int32)
+        self.history_pos = np.zeros(capacity, dtype=np.int32)  # 下一个写入位置
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __grow(self):
+        capacity = len(self.ids)
+        self.ids = np.concatenate([self.ids, np.full(capacity, -1, dtype=np.int64)])
+        self.last_seen = np.concatenate([self.last_seen, np.zeros_like(self.last_seen)])
+        self.in_ready = np.concatenate([self.in_ready, np.zeros_like(self.in_ready)])
+        self.out_ready = np.concatenate([self.out_ready, np.zeros_like(self.out_ready)])
+        self.history = np.concatenate([self.history, np.zeros_like(self.history)])
+        self.history_len = np.concatenate([self.history_len, np.zeros_like(self.history_len)])
+        self.history_pos = np.concatenate([self.history_pos, np.zeros_like(self.history_pos)])
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def acquire(self, ids, frame_index):
+        # 返回每个ID对应的槽位，新ID分配空闲槽位，并刷新最后出现帧序号
+        slots = np.empty(len(ids), dtype=np.int64)
+        for i, id in enumerate(ids):
+            slot = self.index.get(id)
+            if slot is None:
+                if not self.free:
+                    self.__grow()
+                slot = self.free.pop()
+                self.index[id] = slot
+                self.ids[slot] = id
+                self.in_ready[slot] = False
+                self.out_ready[slot] = False
+                self.history_len[slot] = 0
+                self.history_pos[slot] = 0
+            slots[i] = slot
+        self.last_seen[slots] = frame_index
+        return slots
+
+    def last_centers(self, slots):
+        # 返回各槽位最近一个历史中心点，以及是否存在历史
+        pos = (self.history_pos[slots] - 1) % self.history_size
+        return self.history[slots, pos], self.history_len[slots] > 0
+
+    def trail(self, slot):
+        # 按时间顺序返回单个槽位的历史中心点，用于调试绘制
+        n = self.history_len[slot]
+        order = (self.history_pos[slot] - n + np.arange(n)) % self.history_size
+        return self.history[slot, order]
+
+    def push(self, slots, centers):
+        # 保持历史记录长度最多为history_size，写满后覆盖最早的中心点
+        self.history[slots, self.history_pos[slots]] = centers
+        self.history_pos[slots] = (self.history_pos[slots] + 1) % self.history_size
+        self.history_len[slots] = np.minimum(self.history_len[slots] + 1, self.history_size)
+
+    def expire(self, frame_index, max_age):
+        # 淘汰超过max_age帧未更新的目标，返回被淘汰槽位的入/出候选标记
+        slots = np.nonzero((self.ids >= 0) & (frame_index - self.last_seen > max_age))[0]
+        in_ready = self.in_ready[slots].copy()
+        out_ready = self.out_ready[slots].copy()
+        for slot in slots.tolist():
+            del self.index[int(self.ids[slot])]
+            self.free.append(slot)
+        self.ids[slots] = -1
+        self.in_ready[slots] = False
+        self.out_ready[slots] = False
+        return in_ready, out_ready
+
+    def pending(self):
+        active = self.ids >= 0
+        return int(np.count_nonzero(self.in_ready & active)), int(np.count_nonzero(self.out_ready & active))
+
+class TripwireCounter:
+    # 绊线计数：按目标中心点的移动轨迹判断与绊线的相交方向，目标淘汰时结算入/出计数
+    def __init__(self, lines, fps):
+        self.segments = polyline_segments(lines)
+        # 历史记录长度最多为1秒，4秒未更新的目标淘汰
+        self.tracks = TrackTable(math.ceil(fps))
+        self.max_age = fps * 4
+
+    def update(self, ids, centers, frame_index):
+        # 刷新目标中心点并处理绊线相交，返回各目标槽位和本帧相交次数
+        centers = np.asarray(centers, dtype=np.int32)
+        # 刷新对应目标的最后出现帧序号，新目标分配槽位
+        slots = self.tracks.acquire(ids, frame_index)
+        # 检查history最后一个点和center是否与绊线相交
+        last_centers, has_history = self.tracks.last_centers(slots)
+        # 判断是否移动
+        moving = has_history & np.any(last_centers != centers, axis=1)
+        crossings = self.cross(slots[moving], last_centers[moving], centers[moving])
+        self.tracks.push(slots, centers)
+        return slots, crossings
+
+    def cross(self, slots, prev_centers, current_centers):
+        if len(slots) == 0:
+            return 0
+        # 所有移动目标与所有绊线段一次性计算相交情况
+        crossed, direction = crossing_directions(prev_centers, current_centers, self.segments)
+
+        # 按目标、绊线段顺序依次处理，一次移动触发多段绊线都需要处理
+        in_ready, out_ready = self.tracks.in_ready, self.tracks.out_ready
+        rows, cols = np.nonzero(crossed)
+        for i, j in zip(rows, cols):
+            slot = slots[i]
+            if direction[i, j] > 0:
+                if out_ready[slot]:
+                    # 如果已经碰触出绊线，重置出绊线候选
+                    out_ready[slot] = False
+                else:
+                    # 碰触入绊线，进入出绊线候选
+                    in_ready[slot] = True
+            else:
+                if in_ready[slot]:
+                    # 如果已经碰触入绊线，重置入绊线候选
+                    in_ready[slot] = False
+                else:
+                    # 碰触出绊线，进入入绊线候选
+                    out_ready[slot] = True
+        return len(rows)
+
+    def expire(self, frame_index):
+        # 淘汰超时未更新的目标，返回本帧结算的入/出计数
+        in_ready, out_ready = self.tracks.expire(frame_index, self.max_age)
+        return int(np.count_nonzero(in_ready)), int(np.count_nonzero(out_ready))
@@ -2,12 +2,35 @@
 
 __version__ = "8.1.0"
 
-from ultralytics.data.explorer.explorer import Explorer
-from ultralytics.models import RTDETR, SAM, YOLO
-from ultralytics.models.fastsam import FastSAM
-from ultralytics.models.nas import NAS
-from ultralytics.utils import SETTINGS as settings
-from ultralytics.utils.checks import check_yolo as checks
-from ultralytics.utils.downloads import download
+import importlib
+
+# Public objects are imported on first access, so that importing a submodule, e.g. ultralytics.trackers, does not load
+# every model and the Explorer (pandas, LanceDB) as well
+_LAZY = {
+    "YOLO": ("ultralytics.models", "YOLO"),
+    "RTDETR": ("ultralytics.models", "RTDETR"),
+    "SAM": ("ultralytics.models", "SAM"),
+    "FastSAM": ("ultralytics.models.fastsam", "FastSAM"),
+    "NAS": ("ultralytics.models.nas", "NAS"),
+    "Explorer": ("ultralytics.data.explorer.explorer", "Explorer"),
+    "settings": ("ultralytics.utils", "SETTINGS"),
+    "checks": ("ultralytics.utils.checks", "check_yolo"),
+    "download": ("ultralytics.utils.downloads", "download"),
+}
+
+
+def __getattr__(name):
+    """Import public objects such as `YOLO` on first access."""
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module, attr = _LAZY[name]
+    value = globals()[name] = getattr(importlib.import_module(module), attr)
+    return value
+
+
+def __dir__():
+    """Include the lazily imported public objects."""
+    return sorted(set(globals()) | set(__all__))
+
 
 __all__ = "__version__", "YOLO", "NAS", "SAM", "FastSAM", "RTDETR", "checks", "download", "settings", "Explorer"
@@ -133,6 +133,8 @@ CFG_INT_KEYS = (
     "workspace",
     "nbs",
     "save_period",
+    "persistent_io",
+    "pipeline",
 )
 CFG_BOOL_KEYS = (
     "save",
@@ -169,6 +171,7 @@ CFG_BOOL_KEYS = (
     "nms",
     "profile",
     "multi_scale",
+    "fused_preprocess",
 )
 
 
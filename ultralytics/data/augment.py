@@ -2,6 +2,7 @@
 
 import math
 import random
+from collections import deque
 from copy import deepcopy
 
 import cv2
@@ -751,6 +752,77 @@ class LetterBox:
         return labels
 
 
+class FusedLetterBox:
+    """
+    Letterbox, BGR to RGB, HWC to BCHW and 0-1 normalization fused into reusable buffers for fixed-shape inputs.
+
+    Produces the same geometry as `LetterBox(new_shape, auto=auto, stride=stride)` so that `ops.scale_boxes` maps
+    predictions back unchanged. The letterbox geometry is computed once and the padded canvas is filled once, so each
+    image costs one `cv2.resize` straight into the canvas interior, one `cv2.split` into RGB planes and one multiply into
+    the float input tensor, without any per-frame allocation. Input images may be non-contiguous views, e.g. an ROI
+    slice of a larger frame, and are never copied.
+
+    Attributes:
+        shape (tuple): Source image shape (h, w, c) the buffers were built for.
+        new_shape (tuple): Letterboxed output shape (h, w).
+        buffer (torch.Tensor | None): Input tensor written by the next call, allocated when None.
+        free (deque): Buffers handed back by consumers that took `buffer` downstream, reused before allocating.
+    """
+
+    def __init__(self, shape, new_shape=(640, 640), auto=False, stride=32, pin_memory=False):
+        """Precompute the letterbox geometry and buffers for images of `shape` letterboxed to `new_shape`."""
+        if isinstance(new_shape, int):
+            new_shape = (new_shape, new_shape)
+        self.shape = tuple(shape)
+        self.pin_memory = pin_memory
+        h, w = shape[:2]
+
+        # Same rounding as LetterBox so ops.scale_boxes() inverts it exactly
+        r = min(new_shape[0] / h, new_shape[1] / w)
+        self.new_unpad = int(round(w * r)), int(round(h * r))
+        dw, dh = new_shape[1] - self.new_unpad[0], new_shape[0] - self.new_unpad[1]
+        if auto:  # minimum rectangle
+            dw, dh = np.mod(dw, stride), np.mod(dh, stride)
+        dw /= 2
+        dh /= 2
+        top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+        left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+        self.new_shape = (self.new_unpad[1] + top + bottom, self.new_unpad[0] + left + right)
+
+        self.img = np.full((*self.new_shape, 3), 114, dtype=np.uint8)  # border is written once
+        self.interior = self.img[top : top + self.new_unpad[1], left : left + self.new_unpad[0]]
+        self.planes = np.empty((3, *self.new_shape), dtype=np.uint8)
+        self.rgb = [self.planes[2], self.planes[1], self.planes[0]]  # cv2.split() targets, BGR to RGB
+        self.buffer = None
+        self.free = deque()
+        self.scale = np.float32(1 / 255)
+
+    def __call__(self, ims):
+        """
+        Letterbox and normalize a list of images into the shared input tensor.
+
+        Args:
+            ims (List(np.ndarray)): [(h, w, 3) x N] BGR images of `self.shape`.
+
+        Returns:
+            (torch.Tensor): (N, 3, h, w) float32 RGB tensor in 0.0 - 1.0, a view of a buffer reused by the next call.
+        """
+        n = len(ims)
+        if self.buffer is None and self.free:
+            self.buffer = self.free.popleft()
+        if self.buffer is None or len(self.buffer) < n:
+            self.buffer = torch.empty((n, 3, *self.new_shape), dtype=torch.float32, pin_memory=self.pin_memory)
+        out = self.buffer.numpy()
+        for i, im in enumerate(ims):
+            if im.shape[:2] == self.interior.shape[:2]:
+                np.copyto(self.interior, im)
+            else:
+                cv2.resize(im, self.new_unpad, dst=self.interior, interpolation=cv2.INTER_LINEAR)
+            cv2.split(self.img, self.rgb)
+            np.multiply(self.planes, self.scale, out=out[i])  # uint8 to float32, 0 - 255 to 0.0 - 1.0
+        return self.buffer[:n]
+
+
 class CopyPaste:
     """
     Implements the Copy-Paste augmentation as described in the paper https://arxiv.org/abs/2012.07177. This class is
@@ -29,7 +29,10 @@ Usage - formats:
 """
 import platform
 import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
+from types import SimpleNamespace
 
 import cv2
 import numpy as np
@@ -37,7 +40,7 @@ import torch
 
 from ultralytics.cfg import get_cfg, get_save_dir
 from ultralytics.data import load_inference_source
-from ultralytics.data.augment import LetterBox, classify_transforms
+from ultralytics.data.augment import FusedLetterBox, LetterBox, classify_transforms
 from ultralytics.nn.autobackend import AutoBackend
 from ultralytics.utils import DEFAULT_CFG, LOGGER, MACOS, WINDOWS, callbacks, colorstr, ops
 from ultralytics.utils.checks import check_imgsz, check_imshow
@@ -56,6 +59,69 @@ Example:
         probs = r.probs  # Class probabilities for classification outputs
 """
 
+FUSED_LETTERBOX_CACHE = 8  # FusedLetterBox instances kept per thread, one per (input shape, imgsz)
+
+
+class PipelineQueue:
+    """
+    Bounded queue between pipeline stages that hands items out in frame order.
+
+    Items are put with their frame sequence number by any number of producer threads and taken in sequence order by any
+    number of consumer threads, so frames processed out of order by parallel workers are reassembled before the next
+    stage. A producer blocks while the queue is full unless it holds the next frame to be taken, which keeps parallel
+    workers from deadlocking on a queue filled with later frames.
+
+    Attributes:
+        maxsize (int): Maximum number of queued items.
+        items (dict): Queued items by sequence number.
+        next (int): Sequence number of the next item to hand out.
+        count (int | None): Total number of items in the stream, None until the stream ends.
+        closed (bool): Whether the queue was closed, releasing all waiting threads.
+    """
+
+    def __init__(self, maxsize=2):
+        """Initialize an empty queue holding at most `maxsize` items."""
+        self.maxsize = max(1, maxsize)
+        self.items = {}
+        self.next = 0
+        self.count = None
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def put(self, seq, item):
+        """Queue `item` as frame `seq`, returning False if the queue was closed."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.closed or len(self.items) < self.maxsize or seq == self.next)
+            if self.closed:
+                return False
+            self.items[seq] = item
+            self.cond.notify_all()
+            return True
+
+    def get(self):
+        """Return the next (seq, item) in frame order, or None at the end of the stream or once closed."""
+        with self.cond:
+            self.cond.wait_for(lambda: self.closed or self.next in self.items or self.next == self.count)
+            if self.closed or self.next not in self.items:
+                return None
+            seq = self.next
+            self.next += 1
+            self.cond.notify_all()
+            return seq, self.items.pop(seq)
+
+    def finish(self, count):
+        """Mark the end of the stream after `count` items."""
+        with self.cond:
+            self.count = count
+            self.cond.notify_all()
+
+    def close(self):
+        """Drop queued items and release all waiting threads."""
+        with self.cond:
+            self.closed = True
+            self.items.clear()
+            self.cond.notify_all()
+
 
 class BasePredictor:
     """
@@ -108,6 +174,7 @@ class BasePredictor:
         self.callbacks = _callbacks or callbacks.get_default_callbacks()
         self.txt_path = None
         self._lock = threading.Lock()  # for automatic thread-safe inference
+        self._local = threading.local()  # per-thread preprocessing buffers, e.g. FusedLetterBox
         callbacks.add_integration_callbacks(self)
 
     def preprocess(self, im):
@@ -118,6 +185,12 @@ class BasePredictor:
             im (torch.Tensor | List(np.ndarray)): BCHW for tensor, [(HWC) x B] for list.
         """
         not_tensor = not isinstance(im, torch.Tensor)
+        if not_tensor and self.args.fused_preprocess and all(x.shape == im[0].shape for x in im):
+            if getattr(self.model, "infer_requests", None) is not None:
+                # Persistent I/O requests read the fused NumPy buffer directly, skipping the torch round trip
+                return self.fused_pre_transform(im).numpy()
+            im = self.fused_pre_transform(im).to(self.device, non_blocking=True)
+            return im.half() if self.model.fp16 else im
         if not_tensor:
             im = np.stack(self.pre_transform(im))
             im = im[..., ::-1].transpose((0, 3, 1, 2))  # BGR to RGB, BHWC to BCHW, (n, 3, h, w)
@@ -153,6 +226,51 @@ class BasePredictor:
         letterbox = LetterBox(self.imgsz, auto=same_shapes and self.model.pt, stride=self.model.stride)
         return [letterbox(image=x) for x in im]
 
+    def fused_pre_transform(self, im):
+        """
+        Letterbox and normalize same-shape images in one pass into a reusable input buffer.
+
+        Args:
+            im (List(np.ndarray)): [(h, w, 3) x N] BGR images sharing one shape.
+
+        Returns:
+            (torch.Tensor): (N, 3, h, w) float32 RGB tensor in 0.0 - 1.0.
+        """
+        return self.fused_letterbox(im[0].shape)(im)
+
+    def fused_letterbox(self, shape):
+        """
+        Return this thread's FusedLetterBox for images of `shape`, building it on first use.
+
+        Letterboxes are cached per (shape, imgsz) with least-recently-used eviction, so that batches of full frames and
+        ROI crops from different channels, e.g. in a shared inference service, each keep their own buffers.
+
+        Args:
+            shape (tuple): Source image shape (h, w, c).
+
+        Returns:
+            (FusedLetterBox): The letterbox, also kept as `self._local.fused_letterbox` until the next lookup.
+        """
+        cache = getattr(self._local, "fused_letterboxes", None)
+        if cache is None:
+            cache = self._local.fused_letterboxes = OrderedDict()
+        key = (tuple(shape), tuple(self.imgsz))
+        letterbox = cache.get(key)
+        if letterbox is None:
+            letterbox = cache[key] = FusedLetterBox(
+                shape,
+                self.imgsz,
+                auto=self.model.pt,
+                stride=self.model.stride,
+                pin_memory=self.device.type == "cuda",
+            )
+            if len(cache) > FUSED_LETTERBOX_CACHE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        self._local.fused_letterbox = letterbox
+        return letterbox
+
     def write_results(self, idx, results, batch):
         """Write inference results to a file or directory."""
         p, im, _ = batch
@@ -269,54 +387,57 @@ class BasePredictor:
                 ops.Profile(device=self.device),
             )
             self.run_callbacks("on_predict_start")
-            for batch in self.dataset:
-                self.run_callbacks("on_predict_batch_start")
-                self.batch = batch
-                path, im0s, vid_cap, s = batch
-
-                # Preprocess
-                with profilers[0]:
-                    im = self.preprocess(im0s)
-
-                # Inference
-                with profilers[1]:
-                    preds = self.inference(im, *args, **kwargs)
-                    if self.args.embed:
-                        yield from [preds] if isinstance(preds, torch.Tensor) else preds  # yield embedding tensors
-                        continue
-
-                # Postprocess
-                with profilers[2]:
-                    self.results = self.postprocess(preds, im, im0s)
-
-                self.run_callbacks("on_predict_postprocess_end")
-                # Visualize, save, write results
-                n = len(im0s)
-                for i in range(n):
-                    self.seen += 1
-                    self.results[i].speed = {
-                        "preprocess": profilers[0].dt * 1e3 / n,
-                        "inference": profilers[1].dt * 1e3 / n,
-                        "postprocess": profilers[2].dt * 1e3 / n,
-                    }
-                    p, im0 = path[i], None if self.source_type.tensor else im0s[i].copy()
-                    p = Path(p)
-
-                    if self.args.verbose or self.args.save or self.args.save_txt or self.args.show:
-                        s += self.write_results(i, self.results, (p, im, im0))
-                    if self.args.save or self.args.save_txt:
-                        self.results[i].save_dir = self.save_dir.__str__()
-                    if self.args.show and self.plotted_img is not None:
-                        self.show(p)
-                    if self.args.save and self.plotted_img is not None:
-                        self.save_preds(vid_cap, i, str(self.save_dir / p.name))
-
-                self.run_callbacks("on_predict_batch_end")
-                yield from self.results
-
-                # Print time (inference-only)
-                if self.args.verbose:
-                    LOGGER.info(f"{s}{profilers[1].dt * 1E3:.1f}ms")
+            if self.pipelined():
+                im = yield from self.pipeline_inference(profilers, *args, **kwargs)
+            else:
+                for batch in self.dataset:
+                    self.run_callbacks("on_predict_batch_start")
+                    self.batch = batch
+                    path, im0s, vid_cap, s = batch
+
+                    # Preprocess
+                    with profilers[0]:
+                        im = self.preprocess(im0s)
+
+                    # Inference
+                    with profilers[1]:
+                        preds = self.inference(im, *args, **kwargs)
+                        if self.args.embed:
+                            yield from [preds] if isinstance(preds, torch.Tensor) else preds  # yield embedding tensors
+                            continue
+
+                    # Postprocess
+                    with profilers[2]:
+                        self.results = self.postprocess(preds, im, im0s)
+
+                    self.run_callbacks("on_predict_postprocess_end")
+                    # Visualize, save, write results
+                    n = len(im0s)
+                    for i in range(n):
+                        self.seen += 1
+                        self.results[i].speed = {
+                            "preprocess": profilers[0].dt * 1e3 / n,
+                            "inference": profilers[1].dt * 1e3 / n,
+                            "postprocess": profilers[2].dt * 1e3 / n,
+                        }
+                        p, im0 = path[i], None if self.source_type.tensor else im0s[i].copy()
+                        p = Path(p)
+
+                        if self.args.verbose or self.args.save or self.args.save_txt or self.args.show:
+                            s += self.write_results(i, self.results, (p, im, im0))
+                        if self.args.save or self.args.save_txt:
+                            self.results[i].save_dir = self.save_dir.__str__()
+                        if self.args.show and self.plotted_img is not None:
+                            self.show(p)
+                        if self.args.save and self.plotted_img is not None:
+                            self.save_preds(vid_cap, i, str(self.save_dir / p.name))
+
+                    self.run_callbacks("on_predict_batch_end")
+                    yield from self.results
+
+                    # Print time (inference-only)
+                    if self.args.verbose:
+                        LOGGER.info(f"{s}{profilers[1].dt * 1E3:.1f}ms")
 
         # Release assets
         if isinstance(self.vid_writer[-1], cv2.VideoWriter):
@@ -336,6 +457,170 @@ class BasePredictor:
 
         self.run_callbacks("on_predict_end")
 
+    def pipelined(self):
+        """Return whether stream inference runs as a pipeline, which does not support saving, showing or embedding."""
+        if not self.args.pipeline:
+            return False
+        unsupported = [k for k in ("save", "save_txt", "save_crop", "show", "visualize", "embed") if self.args.get(k)]
+        if unsupported:
+            LOGGER.warning(f"WARNING ⚠️ pipeline is not supported with {unsupported}, running sequentially instead")
+            return False
+        return True
+
+    def pipeline_inference(self, profilers, *args, **kwargs):
+        """
+        Run stream inference as a pipeline of stage threads connected by bounded, frame-ordered queues.
+
+        Decoding, preprocessing (`pipeline` threads), inference and postprocessing with the `on_predict_batch_start`,
+        `on_predict_postprocess_end` and `on_predict_batch_end` callbacks, e.g. tracking, each run in their own threads,
+        so that throughput approaches the slowest stage instead of the sum of all stages. Every queue hands batches out
+        in frame order, so callbacks see, and the generator yields, batches in the same order as sequential inference.
+
+        Args:
+            profilers (tuple): Preprocess, inference and postprocess profilers accumulating the stage times.
+
+        Yields:
+            (Results): Results in frame order.
+
+        Returns:
+            (torch.Tensor): The last preprocessed batch.
+        """
+        workers = max(1, int(self.args.pipeline))
+        persistent_io = getattr(self.model, "infer_requests", None) is not None
+        # decoded, preprocessed, inferred, postprocessed, plus submitted for asynchronous persistent I/O requests
+        queues = [PipelineQueue(workers + 1) for _ in range(5 if persistent_io else 4)]
+
+        def decode():
+            """Read batches from the dataset, the only stage touching it."""
+            n, source = 0, iter(self.dataset)
+            try:
+                while True:
+                    with ops.Profile() as dt:
+                        batch = next(source, None)
+                    if batch is None or not queues[0].put(n, SimpleNamespace(batch=batch, dt={"decode": dt.dt})):
+                        break
+                    n += 1
+            except Exception as e:
+                queues[0].put(n, e)
+                n += 1
+            for q in queues:
+                q.finish(n)
+
+        def preprocess(x):
+            """Preprocess one batch into a fused input buffer no batch still in flight is using."""
+            x.im = self.preprocess(x.batch[1])
+            letterbox = getattr(self._local, "fused_letterbox", None)
+            if letterbox is not None and letterbox.buffer is not None:
+                # The buffer travels downstream with the batch and is handed back to the letterbox once consumed, so
+                # the next batch takes a released buffer or allocates one; the ring settles at the batches in flight
+                x.release = (letterbox.free, letterbox.buffer)
+                letterbox.buffer = None
+
+        def inference(x):
+            """Run inference."""
+            x.preds = self.inference(x.im, *args, **kwargs)
+
+        def submit(x):
+            """Start an asynchronous persistent I/O request on a copy of the input, so that its buffer can be reused."""
+            x.request = self.model.submit(x.im)
+            if hasattr(x, "release"):
+                free, buffer = x.release
+                free.append(buffer)  # the request holds its own copy, later stages only read the shape
+                del x.release
+
+        def wait(x):
+            """Wait for the request started by `submit`, counting the wait as inference time."""
+            with ops.Profile(device=self.device) as dt:
+                x.preds = self.model.wait(x.request)
+            x.dt["inference"] += dt.dt
+
+        def postprocess(x):
+            """Postprocess and run the per-batch callbacks, the only stage touching `self.batch` and `self.results`."""
+            self.run_callbacks("on_predict_batch_start")
+            self.batch = x.batch
+            with ops.Profile(device=self.device) as dt:
+                self.results = self.postprocess(x.preds, x.im, x.batch[1])
+            x.dt["postprocess"] = dt.dt
+            with ops.Profile(device=self.device) as dt:
+                self.run_callbacks("on_predict_postprocess_end")
+            x.dt["track"] = dt.dt
+            x.results = self.results
+            self.run_callbacks("on_predict_batch_end")
+
+        @smart_inference_mode()
+        def stage(name, fn, source, sink):
+            """Apply `fn` to batches from `source` in order and pass them, or the first error, to `sink`."""
+            while True:
+                item = source.get()
+                if item is None:
+                    return
+                n, x = item
+                if not isinstance(x, Exception):
+                    try:
+                        with ops.Profile(device=self.device) as dt:
+                            fn(x)
+                        x.dt.setdefault(name, dt.dt)
+                    except Exception as e:
+                        x = e
+                if not sink.put(n, x):
+                    return
+
+        stages = [("preprocess", preprocess, *queues[:2])] * workers
+        if persistent_io:
+            # Up to `persistent_io` requests run in the background while the next batches are preprocessed
+            stages += [("inference", submit, *queues[1:3]), ("wait", wait, *queues[2:4])]
+        else:
+            stages.append(("inference", inference, *queues[1:3]))
+        stages.append(("postprocess", postprocess, *queues[-2:]))
+        threads = [threading.Thread(target=decode, name="decode", daemon=True)]
+        threads += [threading.Thread(target=stage, args=x, name=x[0], daemon=True) for x in stages]
+        totals = dict.fromkeys(("decode", "preprocess", "inference", "postprocess", "track"), 0.0)
+        im, t0 = None, time.time()
+        for t in threads:
+            t.start()
+        try:
+            while True:
+                item = queues[-1].get()
+                if item is None:
+                    break
+                x = item[1]
+                if isinstance(x, Exception):
+                    raise x
+                path, im0s, _, s = x.batch
+                im, n = x.im, len(im0s)
+                for k in totals:
+                    totals[k] += x.dt[k]
+                for p, k in zip(profilers, ("preprocess", "inference", "postprocess")):
+                    p.dt = x.dt[k]
+                    p.t += p.dt
+                for i in range(n):
+                    self.seen += 1
+                    x.results[i].speed = {k: x.dt[k] * 1e3 / n for k in ("preprocess", "inference", "postprocess")}
+                    if self.args.verbose:
+                        s += self.write_results(i, x.results, (Path(path[i]), im, None))
+                yield from x.results
+                if hasattr(x, "release"):
+                    free, buffer = x.release
+                    free.append(buffer)  # the batch is consumed, its input buffer can be reused
+
+                # Print time (inference-only)
+                if self.args.verbose:
+                    LOGGER.info(f"{s}{x.dt['inference'] * 1E3:.1f}ms")
+        finally:
+            for q in queues:
+                q.close()
+            # decode may be blocked reading a stalled stream, so do not wait for it; the threads are daemons
+            for t in threads[1:]:
+                t.join(timeout=5)
+
+        if self.args.verbose and self.seen:
+            t = tuple(v / self.seen * 1e3 for v in totals.values())  # stage times per image
+            LOGGER.info(
+                f"Pipeline: %.1fms decode, %.1fms preprocess, %.1fms inference, %.1fms postprocess, %.1fms track per "
+                f"image, {self.seen / (time.time() - t0):.1f} images/s" % t
+            )
+        return im
+
     def setup_model(self, model, verbose=True):
         """Initialize YOLO model with given parameters and set it to evaluation mode."""
         self.model = AutoBackend(
@@ -346,6 +631,7 @@ class BasePredictor:
             fp16=self.args.half,
             fuse=True,
             verbose=verbose,
+            persistent_io=self.args.persistent_io,
         )
 
         self.device = self.model.device  # update device
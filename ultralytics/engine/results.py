@@ -1,6 +1,6 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 """
-Ultralytics Results, Boxes and Masks classes for handling inference results.
+Ultralytics Results, Boxes, BoxTable and Masks classes for handling inference results.
 
 Usage: See https://docs.ultralytics.com/modes/predict/
 """
@@ -12,7 +12,6 @@ from pathlib import Path
 import numpy as np
 import torch
 
-from ultralytics.data.augment import LetterBox
 from ultralytics.utils import LOGGER, SimpleClass, ops
 from ultralytics.utils.plotting import Annotator, colors, save_one_box
 from ultralytics.utils.torch_utils import smart_inference_mode
@@ -235,6 +234,8 @@ class Results(SimpleClass):
         # Plot Segment results
         if pred_masks and show_masks:
             if im_gpu is None:
+                from ultralytics.data.augment import LetterBox  # scope for faster 'import ultralytics'
+
                 img = LetterBox(pred_masks.shape[1:])(image=annotator.result())
                 im_gpu = (
                     torch.as_tensor(img, dtype=torch.float16, device=pred_masks.data.device)
@@ -391,6 +392,7 @@ class Boxes(BaseTensor):
         xywh (torch.Tensor | numpy.ndarray): The boxes in xywh format.
         xyxyn (torch.Tensor | numpy.ndarray): The boxes in xyxy format normalized by original image size.
         xywhn (torch.Tensor | numpy.ndarray): The boxes in xywh format normalized by original image size.
+        table (BoxTable): Columnar (N, 7) NumPy view of the boxes with named column accessors.
         data (torch.Tensor): The raw bboxes tensor (alias for `boxes`).
 
     Methods:
@@ -430,6 +432,19 @@ class Boxes(BaseTensor):
         """Return the track IDs of the boxes (if available)."""
         return self.data[:, -3] if self.is_track else None
 
+    @property
+    def table(self):
+        """
+        Return the boxes as a columnar BoxTable of (x1, y1, x2, y2, id, conf, cls) rows.
+
+        Tracked CPU boxes are returned without a copy, so the table of tracker results set through `Results.update()`
+        shares memory with the tracker output. Untracked boxes get an id column of -1.
+        """
+        data = self.data.cpu().numpy() if isinstance(self.data, torch.Tensor) else self.data
+        if not self.is_track:
+            data = np.insert(data, 4, -1, axis=1)
+        return BoxTable(data)
+
     @property
     @lru_cache(maxsize=2)  # maxsize 1 should suffice
     def xywh(self):
@@ -455,6 +470,81 @@ class Boxes(BaseTensor):
         return xywh
 
 
+class BoxTable:
+    """
+    Columnar NumPy view of detection boxes for vectorized post-processing.
+
+    Rows are (x1, y1, x2, y2, id, conf, cls). Column accessors are views of the underlying (N, 7) array, so consumers
+    can work on all boxes with array operations instead of iterating `Boxes` and creating one object per box.
+
+    Attributes:
+        data (np.ndarray): The (N, 7) array of boxes.
+        xyxy (np.ndarray): The (N, 4) boxes in xyxy format.
+        x1, y1, x2, y2 (np.ndarray): The box coordinates.
+        id (np.ndarray): The track IDs of the boxes, -1 for untracked boxes.
+        conf (np.ndarray): The confidence values of the boxes.
+        cls (np.ndarray): The class values of the boxes.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        """Initialize the table with an (N, 7) array."""
+        self.data = data
+
+    def __len__(self):
+        """Return the number of boxes."""
+        return len(self.data)
+
+    def __getitem__(self, idx):
+        """Return a BoxTable with the specified rows."""
+        return BoxTable(self.data[idx])
+
+    def __array__(self, dtype=None, copy=None):
+        """Return the underlying (N, 7) array."""
+        return self.data if dtype is None else self.data.astype(dtype, copy=False)
+
+    @property
+    def xyxy(self):
+        """Return the boxes in xyxy format."""
+        return self.data[:, :4]
+
+    @property
+    def x1(self):
+        """Return the left box coordinates."""
+        return self.data[:, 0]
+
+    @property
+    def y1(self):
+        """Return the top box coordinates."""
+        return self.data[:, 1]
+
+    @property
+    def x2(self):
+        """Return the right box coordinates."""
+        return self.data[:, 2]
+
+    @property
+    def y2(self):
+        """Return the bottom box coordinates."""
+        return self.data[:, 3]
+
+    @property
+    def id(self):
+        """Return the track IDs of the boxes, -1 for untracked boxes."""
+        return self.data[:, 4]
+
+    @property
+    def conf(self):
+        """Return the confidence values of the boxes."""
+        return self.data[:, 5]
+
+    @property
+    def cls(self):
+        """Return the class values of the boxes."""
+        return self.data[:, 6]
+
+
 class Masks(BaseTensor):
     """
     A class for storing and manipulating detection masks.
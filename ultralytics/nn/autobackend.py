@@ -4,8 +4,10 @@ import ast
 import contextlib
 import json
 import platform
+import threading
 import zipfile
 from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import cv2
@@ -50,6 +52,201 @@ def default_class_names(data=None):
     return {i: f"class{i}" for i in range(999)}  # return default if above errors
 
 
+class OrtRequest:
+    """
+    ONNX Runtime inference request with input and output buffers bound once through an `IOBinding`.
+
+    Outputs are preallocated NumPy arrays, one set per input shape, that ONNX Runtime writes into on every run, so
+    dynamically batched inputs switch between cached buffers. The input is bound to the caller's array and rebound
+    only when its memory changes, so a producer that reuses one buffer, e.g. `FusedLetterBox`, is read in place
+    without any copy.
+    """
+
+    def __init__(self, session, executor):
+        """Create an IOBinding on `session`, running asynchronous requests on `executor`."""
+        import onnxruntime
+
+        self.ortvalue = onnxruntime.OrtValue
+        self.session = session
+        self.executor = executor
+        self.binding = session.io_binding()
+        self.input_name = session.get_inputs()[0].name
+        self.output_names = [x.name for x in session.get_outputs()]
+        self.input = None  # array currently bound as input
+        self.owned = None  # request-owned input buffer for asynchronous runs
+        self.outputs = None
+        self.shapes = {}  # input shape -> output buffers
+        self.future = None
+
+    def bind(self, im):
+        """Bind `im` as the input, rebinding the outputs when the input shape changes."""
+        if self.input is not None and self.input.shape == im.shape and self.input.ctypes.data == im.ctypes.data:
+            return
+        reshape = self.input is None or self.input.shape != im.shape
+        self.input = im  # keep the bound memory alive
+        self.binding.bind_ortvalue_input(self.input_name, self.ortvalue.ortvalue_from_numpy(im))
+        if reshape:
+            self.outputs = self.shapes.get(im.shape)
+            if self.outputs is None:
+                # Let ONNX Runtime allocate the outputs once to learn their shapes, then keep them as persistent buffers
+                for name in self.output_names:
+                    self.binding.bind_output(name, "cpu")
+                self.session.run_with_iobinding(self.binding)
+                self.outputs = self.shapes[im.shape] = self.binding.copy_outputs_to_cpu()
+            for name, y in zip(self.output_names, self.outputs):
+                self.binding.bind_output(name, "cpu", 0, y.dtype, list(y.shape), y.ctypes.data)
+
+    def run(self):
+        """Run the bound input in the calling thread and return the output buffers."""
+        self.session.run_with_iobinding(self.binding)
+        return self.outputs
+
+    def start(self):
+        """Start running the bound input in the background."""
+        self.future = self.executor.submit(self.session.run_with_iobinding, self.binding)
+
+    def wait(self):
+        """Wait for the running request and return its output buffers."""
+        if self.future is not None:
+            self.future.result()
+            self.future = None
+        return self.outputs
+
+
+class OVRequest:
+    """
+    OpenVINO inference request reused across frames.
+
+    The input tensor shares memory with the caller's array and is recreated only when that memory changes. Outputs are
+    returned as views of the request's own output tensors, which OpenVINO allocates once and reuses.
+    """
+
+    def __init__(self, compiled_model):
+        """Create an infer request on `compiled_model`."""
+        from openvino.runtime import Tensor  # noqa
+
+        self.tensor = Tensor
+        self.request = compiled_model.create_infer_request()
+        self.input = None
+        self.owned = None
+        self.running = False
+
+    def bind(self, im):
+        """Bind `im` as the shared-memory input tensor."""
+        if self.input is not None and self.input.shape == im.shape and self.input.ctypes.data == im.ctypes.data:
+            return
+        self.input = im
+        self.request.set_input_tensor(self.tensor(im, shared_memory=True))
+
+    def run(self):
+        """Run the bound input in the calling thread and return views of the output tensors."""
+        self.request.infer()
+        return [x.data for x in self.request.output_tensors]
+
+    def start(self):
+        """Start asynchronous inference on the bound input."""
+        self.request.start_async()
+        self.running = True
+
+    def wait(self):
+        """Wait for the running request and return views of its output tensors."""
+        if self.running:
+            self.request.wait()
+            self.running = False
+        return [x.data for x in self.request.output_tensors]
+
+
+class InferRequestPool:
+    """
+    Pool of persistent ONNX Runtime or OpenVINO inference requests used by AutoBackend with `persistent_io`.
+
+    Each request keeps its input and output buffers bound to the runtime, so a forward pass allocates nothing and the
+    outputs come back as views of the bound buffers. Requests are used round-robin: a synchronous call reads its input
+    in place and its outputs stay valid until the same request is used again, i.e. for the next `size - 1` calls, so
+    several channels or pipeline stages can each hold their own results. `submit()` copies the input into a
+    request-owned buffer and runs it in the background, keeping up to `size` inferences in flight.
+
+    Attributes:
+        size (int): Number of requests in the pool.
+        requests (list): The OrtRequest or OVRequest objects.
+
+    Methods:
+        __call__(im): Runs a synchronous inference and returns the output buffers.
+        submit(im): Starts an asynchronous inference on a copy of `im` and returns its request index.
+        wait(i, copy): Waits for a submitted request and returns its output buffers.
+    """
+
+    def __init__(self, session=None, compiled_model=None, size=1):
+        """
+        Initialize the pool for an ONNX Runtime session or an OpenVINO compiled model.
+
+        Args:
+            session (onnxruntime.InferenceSession, optional): ONNX Runtime session to bind.
+            compiled_model (openvino.runtime.CompiledModel, optional): OpenVINO compiled model to create requests on.
+            size (int): Number of requests.
+        """
+        self.size = max(1, int(size))
+        if session is not None:
+            self.executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="ort")
+            self.requests = [OrtRequest(session, self.executor) for _ in range(self.size)]
+        else:
+            self.executor = None
+            self.requests = [OVRequest(compiled_model) for _ in range(self.size)]
+        self.locks = [threading.Lock() for _ in range(self.size)]
+        self.lock = threading.Lock()
+        self.index = 0
+
+    def _acquire(self):
+        """Take the next request round-robin, waiting until no other call is using it."""
+        with self.lock:
+            i = self.index
+            self.index = (i + 1) % self.size
+        self.locks[i].acquire()
+        return i
+
+    def __call__(self, im):
+        """Run inference on `im` in place and return the output buffers of the request."""
+        i = self._acquire()
+        try:
+            request = self.requests[i]
+            request.wait()
+            request.bind(np.ascontiguousarray(im))
+            return request.run()
+        finally:
+            self.locks[i].release()
+
+    def submit(self, im):
+        """Copy `im` into a request-owned buffer, start inference in the background and return the request index."""
+        i = self._acquire()
+        request = self.requests[i]
+        try:
+            request.wait()
+            if request.owned is None or request.owned.shape != im.shape or request.owned.dtype != im.dtype:
+                request.owned = np.empty(im.shape, dtype=im.dtype)
+            np.copyto(request.owned, im)
+            request.bind(request.owned)
+            request.start()
+        except Exception:
+            self.locks[i].release()
+            raise
+        return i
+
+    def wait(self, i, copy=False):
+        """
+        Wait for the request returned by `submit()` and return its output buffers.
+
+        Args:
+            i (int): Request index returned by `submit()`.
+            copy (bool): Return copies taken before the request is released, for callers that keep the outputs while
+                further requests are submitted.
+        """
+        try:
+            y = self.requests[i].wait()
+            return [x.copy() for x in y] if copy else y
+        finally:
+            self.locks[i].release()
+
+
 class AutoBackend(nn.Module):
     """
     Handles dynamic backend selection for running inference using Ultralytics YOLO models.
@@ -88,6 +285,7 @@ class AutoBackend(nn.Module):
         fp16=False,
         fuse=True,
         verbose=True,
+        persistent_io=0,
     ):
         """
         Initialize the AutoBackend for inference.
@@ -100,6 +298,8 @@ class AutoBackend(nn.Module):
             fp16 (bool): Enable half-precision inference. Supported only on specific backends. Defaults to False.
             fuse (bool): Fuse Conv2D + BatchNorm layers for optimization. Defaults to True.
             verbose (bool): Enable verbose logging. Defaults to True.
+            persistent_io (int): Number of persistent inference requests for ONNX Runtime and OpenVINO models on CPU,
+                with input/output buffers bound once and reused across frames. 0 disables. Defaults to 0.
         """
         super().__init__()
         w = str(weights[0] if isinstance(weights, list) else weights)
@@ -123,7 +323,7 @@ class AutoBackend(nn.Module):
         fp16 &= pt or jit or onnx or xml or engine or nn_module or triton  # FP16
         nhwc = coreml or saved_model or pb or tflite or edgetpu  # BHWC formats (vs torch BCWH)
         stride = 32  # default stride
-        model, metadata = None, None
+        model, metadata, infer_requests = None, None, None
 
         # Set device
         cuda = torch.cuda.is_available() and device.type != "cpu"  # use CUDA
@@ -177,6 +377,8 @@ class AutoBackend(nn.Module):
             providers = ["CUDAExecutionProvider", "CPUExecutionProvider"] if cuda else ["CPUExecutionProvider"]
             session = onnxruntime.InferenceSession(w, providers=providers)
             output_names = [x.name for x in session.get_outputs()]
+            if persistent_io and not cuda:
+                infer_requests = InferRequestPool(session=session, size=persistent_io)
             metadata = session.get_modelmeta().custom_metadata_map  # metadata
         elif xml:  # OpenVINO
             LOGGER.info(f"Loading {w} for OpenVINO inference...")
@@ -194,6 +396,8 @@ class AutoBackend(nn.Module):
             if batch_dim.is_static:
                 batch_size = batch_dim.get_length()
             ov_compiled_model = core.compile_model(ov_model, device_name="AUTO")  # AUTO selects best available device
+            if persistent_io:
+                infer_requests = InferRequestPool(compiled_model=ov_compiled_model, size=persistent_io)
             metadata = w.parent / "metadata.yaml"
         elif engine:  # TensorRT
             LOGGER.info(f"Loading {w} for TensorRT inference...")
@@ -366,7 +570,8 @@ class AutoBackend(nn.Module):
         Runs inference on the YOLOv8 MultiBackend model.
 
         Args:
-            im (torch.Tensor): The image tensor to perform inference on.
+            im (torch.Tensor | np.ndarray): The image tensor to perform inference on. ONNX Runtime and OpenVINO models
+                also accept a BCHW NumPy array, which skips the torch round trip.
             augment (bool): whether to perform data augmentation during inference, defaults to False
             visualize (bool): whether to visualize the output predictions, defaults to False
             embed (list, optional): A list of feature vectors/embeddings to return.
@@ -375,6 +580,12 @@ class AutoBackend(nn.Module):
             (tuple): Tuple containing the raw output tensor, and processed output for visualization (if visualize=True)
         """
         b, ch, h, w = im.shape  # batch, channel, height, width
+        if self.infer_requests is not None:
+            # Persistent I/O: CPU tensors are read in place and the outputs are views of buffers reused by later calls
+            y = [torch.from_numpy(x) for x in self.infer_requests(self._request_input(im))]
+            return y[0] if len(y) == 1 else y
+        if isinstance(im, np.ndarray):
+            im = torch.from_numpy(im)
         if self.fp16 and im.dtype != torch.float16:
             im = im.half()  # to FP16
         if self.nhwc:
@@ -490,6 +701,37 @@ class AutoBackend(nn.Module):
         else:
             return self.from_numpy(y)
 
+    def _request_input(self, im):
+        """Convert `im` to the NumPy array read by the persistent I/O requests, without copying FP32 CPU inputs."""
+        if isinstance(im, torch.Tensor):
+            return (im.half() if self.fp16 and im.dtype != torch.float16 else im).cpu().numpy()
+        return im.astype(np.float16) if self.fp16 and im.dtype != np.float16 else im
+
+    def submit(self, im):
+        """
+        Start asynchronous persistent I/O inference on a copy of `im`, so that the caller may reuse `im` right away.
+
+        Args:
+            im (torch.Tensor | np.ndarray): BCHW input batch.
+
+        Returns:
+            (int): Request index to pass to `wait()`.
+        """
+        return self.infer_requests.submit(self._request_input(im))
+
+    def wait(self, i):
+        """
+        Wait for a request started by `submit()`.
+
+        Args:
+            i (int): Request index returned by `submit()`.
+
+        Returns:
+            (torch.Tensor | List(torch.Tensor)): Raw outputs, copied so they stay valid while later requests run.
+        """
+        y = [torch.from_numpy(x) for x in self.infer_requests.wait(i, copy=True)]
+        return y[0] if len(y) == 1 else y
+
     def from_numpy(self, x):
         """
         Convert a numpy array to a tensor.
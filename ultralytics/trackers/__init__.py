@@ -3,5 +3,6 @@
 from .bot_sort import BOTSORT
 from .byte_tracker import BYTETracker
 from .track import register_tracker
+from .vec_byte_tracker import VecBYTETracker
 
-__all__ = "register_tracker", "BOTSORT", "BYTETracker"  # allow simpler import
+__all__ = "register_tracker", "BOTSORT", "BYTETracker", "VecBYTETracker"  # allow simpler import
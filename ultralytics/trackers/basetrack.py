@@ -1,7 +1,7 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 # This module defines the base classes and structures for object tracking in YOLO.
 
-from collections import OrderedDict
+from collections import OrderedDict, deque
 
 import numpy as np
 
@@ -23,13 +23,109 @@ class TrackState:
     Removed = 3
 
 
+class TrackIdCounter:
+    """
+    Track ID counter owned by a single tracker instance.
+
+    Each tracker allocates IDs from its own counter, so trackers running concurrently in threads or processes share no
+    mutable state and resetting one tracker does not affect the IDs of the others.
+
+    Attributes:
+        count (int): The last allocated track ID, 0 if none has been allocated yet.
+
+    Methods:
+        next: Allocates `n` consecutive IDs and returns the first one.
+        reset: Restarts the counter so the next ID is 1.
+    """
+
+    def __init__(self):
+        """Initializes the counter with no IDs allocated."""
+        self.count = 0
+
+    def next(self, n=1):
+        """Allocate `n` consecutive track IDs and return the first one."""
+        first = self.count + 1
+        self.count += n
+        return first
+
+    def reset(self):
+        """Reset the counter so the next allocated ID is 1."""
+        self.count = 0
+
+
+class TrackRegistry:
+    """
+    Bookkeeping of the tracked, lost and removed tracks of a tracker.
+
+    Tracked and lost tracks live in dicts keyed by track ID, which keep insertion order like the lists they replace, so
+    every state transition is O(1). Lost tracks are also filed in an expiry wheel under the frame at which they exceed
+    `max_time_lost`, so expiring them only visits the tracks that are due. Removed tracks are kept in a bounded history.
+
+    Attributes:
+        tracked (dict): Tracked tracks, including unconfirmed ones, by track ID.
+        lost (dict): Lost tracks by track ID.
+        removed (deque): The most recently removed tracks, at most `max_removed`.
+        max_time_lost (int): Frames a track stays lost before it is removed.
+        wheel (dict): Lost tracks by the frame at which they expire. Entries of tracks that were found again before
+            are stale and skipped when their frame comes.
+
+    Methods:
+        add: Adds a new, matched or refound track to the tracked tracks.
+        mark_lost: Moves a track from the tracked to the lost tracks.
+        mark_removed: Removes a track and adds it to the removed history.
+        discard: Drops a track from the tracked and lost tracks without changing its state.
+        expire: Removes the lost tracks that have been lost for more than `max_time_lost` frames.
+    """
+
+    def __init__(self, max_time_lost, max_removed=1000):
+        """Initializes an empty registry."""
+        self.tracked = {}
+        self.lost = {}
+        self.removed = deque(maxlen=max_removed)
+        self.max_time_lost = max_time_lost
+        self.wheel = {}
+
+    def add(self, track):
+        """Add a new, matched or refound track to the tracked tracks, taking it out of the lost tracks."""
+        self.lost.pop(track.track_id, None)
+        self.tracked.setdefault(track.track_id, track)
+
+    def mark_lost(self, track, frame_id):
+        """Mark a track as lost in frame `frame_id` and schedule its expiry."""
+        track.mark_lost()
+        self.tracked.pop(track.track_id, None)
+        self.lost[track.track_id] = track
+        expiry = max(track.end_frame + self.max_time_lost, frame_id) + 1
+        self.wheel.setdefault(expiry, []).append(track)
+
+    def mark_removed(self, track):
+        """Mark a track as removed and add it to the removed history."""
+        track.mark_removed()
+        self.discard(track)
+        self.removed.append(track)
+
+    def discard(self, track):
+        """Drop a track from the tracked and lost tracks without changing its state."""
+        self.tracked.pop(track.track_id, None)
+        self.lost.pop(track.track_id, None)
+
+    def expire(self, frame_id):
+        """Remove and return the lost tracks due in frame `frame_id`; must be called once for every frame."""
+        expired = []
+        for track in self.wheel.pop(frame_id, ()):
+            if self.lost.get(track.track_id) is track and frame_id - track.end_frame > self.max_time_lost:
+                self.mark_removed(track)
+                expired.append(track)
+        return expired
+
+
 class BaseTrack:
     """
     Base class for object tracking, providing foundational attributes and methods.
 
     Attributes:
-        _count (int): Class-level counter for unique track IDs.
-        track_id (int): Unique identifier for the track.
+        track_ids (TrackIdCounter): ID counter of the tracker that owns the track, set on activation.
+        track_id (int): Unique identifier for the track within its tracker.
         is_activated (bool): Flag indicating whether the track is currently active.
         state (TrackState): Current state of the track.
         history (OrderedDict): Ordered history of the track's states.
@@ -43,19 +139,17 @@ class BaseTrack:
 
     Methods:
         end_frame: Returns the ID of the last frame where the object was tracked.
-        next_id: Increments and returns the next global track ID.
+        next_id: Returns the next track ID from the owning tracker's counter.
         activate: Abstract method to activate the track.
         predict: Abstract method to predict the next state of the track.
         update: Abstract method to update the track with new data.
         mark_lost: Marks the track as lost.
         mark_removed: Marks the track as removed.
-        reset_id: Resets the global track ID counter.
     """
 
-    _count = 0
-
     def __init__(self):
         """Initializes a new track with unique ID and foundational tracking attributes."""
+        self.track_ids = None
         self.track_id = 0
         self.is_activated = False
         self.state = TrackState.New
@@ -73,11 +167,9 @@ class BaseTrack:
         """Return the last frame ID of the track."""
         return self.frame_id
 
-    @staticmethod
-    def next_id():
-        """Increment and return the global track ID counter."""
-        BaseTrack._count += 1
-        return BaseTrack._count
+    def next_id(self):
+        """Return the next track ID from the owning tracker's counter."""
+        return self.track_ids.next()
 
     def activate(self, *args):
         """Abstract method to activate the track with provided arguments."""
@@ -98,8 +190,3 @@ class BaseTrack:
     def mark_removed(self):
         """Mark the track as removed."""
         self.state = TrackState.Removed
-
-    @staticmethod
-    def reset_id():
-        """Reset the global track ID counter."""
-        BaseTrack._count = 0
@@ -1,6 +1,6 @@
 # Ultralytics YOLO 🚀, AGPL-3.0 license
 
-from collections import deque
+from collections import OrderedDict, deque
 
 import numpy as np
 
@@ -9,6 +9,7 @@ from .byte_tracker import BYTETracker, STrack
 from .utils import matching
 from .utils.gmc import GMC
 from .utils.kalman_filter import KalmanFilterXYWH
+from .utils.reid import ReID
 
 
 class BOTrack(STrack):
@@ -19,7 +20,7 @@ class BOTrack(STrack):
         shared_kalman (KalmanFilterXYWH): A shared Kalman filter for all instances of BOTrack.
         smooth_feat (np.ndarray): Smoothed feature vector.
         curr_feat (np.ndarray): Current feature vector.
-        features (deque): A deque to store feature vectors with a maximum length defined by `feat_history`.
+        features (deque): Ring of recent feature vectors with a maximum length defined by `feat_history`.
         alpha (float): Smoothing factor for the exponential moving average of features.
         mean (np.ndarray): The mean state of the Kalman filter.
         covariance (np.ndarray): The covariance matrix of the Kalman filter.
@@ -28,9 +29,11 @@ class BOTrack(STrack):
         update_features(feat): Update features vector and smooth it using exponential moving average.
         predict(): Predicts the mean and covariance using Kalman filter.
         re_activate(new_track, frame_id, new_id): Reactivates a track with updated features and optionally new ID.
+        re_identify(new_track, frame_id): Restores a lost or removed track at a detection matched by appearance.
         update(new_track, frame_id): Update the YOLOv8 instance with new track and frame ID.
         tlwh: Property that gets the current position in tlwh format `(top left x, top left y, width, height)`.
         multi_predict(stracks): Predicts the mean and covariance of multiple object tracks using shared Kalman filter.
+        multi_update(stracks, detections, frame_id): Updates matched tracks and their features in one batch.
         convert_coords(tlwh): Converts tlwh bounding box coordinates to xywh format.
         tlwh_to_xywh(tlwh): Convert bounding box to xywh format `(center x, center y, width, height)`.
 
@@ -48,10 +51,10 @@ class BOTrack(STrack):
 
         self.smooth_feat = None
         self.curr_feat = None
-        if feat is not None:
-            self.update_features(feat)
         self.features = deque([], maxlen=feat_history)
         self.alpha = 0.9
+        if feat is not None:
+            self.update_features(feat)
 
     def update_features(self, feat):
         """Update features vector and smooth it using exponential moving average."""
@@ -79,6 +82,19 @@ class BOTrack(STrack):
             self.update_features(new_track.curr_feat)
         super().re_activate(new_track, frame_id, new_id)
 
+    def re_identify(self, new_track, frame_id):
+        """Restores a lost or removed track at a detection matched by appearance, restarting its Kalman state there."""
+        if new_track.curr_feat is not None:
+            self.update_features(new_track.curr_feat)
+        self.mean, self.covariance = self.kalman_filter.initiate(self.convert_coords(new_track.tlwh))
+        self.tracklet_len = 0
+        self.state = TrackState.Tracked
+        self.is_activated = True
+        self.frame_id = frame_id
+        self.score = new_track.score
+        self.cls = new_track.cls
+        self.idx = new_track.idx
+
     def update(self, new_track, frame_id):
         """Update the YOLOv8 instance with new track and frame ID."""
         if new_track.curr_feat is not None:
@@ -110,6 +126,14 @@ class BOTrack(STrack):
             stracks[i].mean = mean
             stracks[i].covariance = cov
 
+    @staticmethod
+    def multi_update(stracks, detections, frame_id):
+        """Updates features of matched tracks, then corrects all of them with one batched Kalman filter step."""
+        for st, det in zip(stracks, detections):
+            if det.curr_feat is not None:
+                st.update_features(det.curr_feat)
+        STrack.multi_update(stracks, detections, frame_id)
+
     def convert_coords(self, tlwh):
         """Converts Top-Left-Width-Height bounding box coordinates to X-Y-Width-Height format."""
         return self.tlwh_to_xywh(tlwh)
@@ -129,15 +153,27 @@ class BOTSORT(BYTETracker):
     Attributes:
         proximity_thresh (float): Threshold for spatial proximity (IoU) between tracks and detections.
         appearance_thresh (float): Threshold for appearance similarity (ReID embeddings) between tracks and detections.
-        encoder (object): Object to handle ReID embeddings, set to None if ReID is not enabled.
+        encoder (ReID): Object to handle ReID embeddings, set to None if ReID is not enabled.
+        gallery (OrderedDict): Recently lost identities by track ID, oldest first, for re-identification.
+        gallery_size (int): Maximum number of identities kept in `gallery`.
+        gallery_ttl (int): Frames a lost identity stays in `gallery`.
+        reid_thresh (float): Appearance distance below which a new-track candidate restores a lost identity; stricter
+            than `appearance_thresh` as there is no IoU gating.
         gmc (GMC): An instance of the GMC algorithm for data association.
         args (object): Parsed command-line arguments containing tracking parameters.
 
     Methods:
         get_kalmanfilter(): Returns an instance of KalmanFilterXYWH for object tracking.
         init_track(dets, scores, cls, img): Initialize track with detections, scores, and classes.
+        update(results, img): Updates the tracker, then the gallery of lost identities.
+        embed(detections): Computes ReID features of the detections that have none yet, in one batch.
         get_dists(tracks, detections): Get distances between tracks and detections using IoU and (optionally) ReID.
+        associate(tracks, detections, thresh, fuse): Match tracks to detections, dense when ReID costs are fused.
         multi_predict(tracks): Predict and track multiple objects with YOLOv8 model.
+        multi_update(tracks, detections): Update matched tracks and their ReID features in one batch.
+        reidentify(detections): Restore lost identities that new-track candidates match by appearance.
+        gallery_distance(tracks, detections): Smallest appearance distance between feature rings and detections.
+        update_gallery(): Adds newly lost tracks to the gallery and drops found, stale or excess ones.
 
     Usage:
         bot_sort = BOTSORT(args, frame_rate)
@@ -146,6 +182,8 @@ class BOTSORT(BYTETracker):
 
     Note:
         The class is designed to work with the YOLOv8 object detection model and supports ReID only if enabled via args.
+        Embeddings are only computed for ambiguous detections, close to several tracks or to a track close to several
+        detections, and for unmatched detections that are about to start new tracks.
     """
 
     def __init__(self, args, frame_rate=30):
@@ -155,24 +193,52 @@ class BOTSORT(BYTETracker):
         self.proximity_thresh = args.proximity_thresh
         self.appearance_thresh = args.appearance_thresh
 
+        self.encoder = None
         if args.with_reid:
-            # Haven't supported BoT-SORT(reid) yet
-            self.encoder = None
-        self.gmc = GMC(method=args.gmc_method)
+            self.encoder = ReID(getattr(args, "reid_model", "hist"), imgsz=getattr(args, "reid_imgsz", (256, 128)))
+        self.gallery = OrderedDict()
+        self.gallery_size = getattr(args, "reid_gallery", 100)
+        self.reid_thresh = getattr(args, "reid_thresh", 0.15)
+        self.gallery_ttl = int(frame_rate / 30.0 * getattr(args, "reid_ttl", 300))
+        self.img = None
+        self.boxes = None
+        self.gmc = GMC(
+            method=args.gmc_method,
+            downscale=getattr(args, "gmc_downscale", 2),
+            roi=getattr(args, "gmc_roi", None),
+            static_thresh=getattr(args, "gmc_static_thresh", 1.0),
+            max_keypoints=getattr(args, "gmc_keypoints", 300),
+        )
 
     def get_kalmanfilter(self):
         """Returns an instance of KalmanFilterXYWH for object tracking."""
         return KalmanFilterXYWH()
 
+    def update(self, results, img=None):
+        """Updates the tracker, keeping the frame and boxes at hand for on-demand embeddings, then the gallery."""
+        self.img, self.boxes = img, results.xyxy
+        try:
+            tracks = super().update(results, img)
+        finally:
+            self.img, self.boxes = None, None
+        if self.encoder is not None:
+            self.update_gallery()
+        return tracks
+
     def init_track(self, dets, scores, cls, img=None):
-        """Initialize track with detections, scores, and classes."""
+        """Initialize track with detections, scores, and classes; ReID features are computed later when needed."""
         if len(dets) == 0:
             return []
-        if self.args.with_reid and self.encoder is not None:
-            features_keep = self.encoder.inference(img, dets)
-            return [BOTrack(xyxy, s, c, f) for (xyxy, s, c, f) in zip(dets, scores, cls, features_keep)]  # detections
-        else:
-            return [BOTrack(xyxy, s, c) for (xyxy, s, c) in zip(dets, scores, cls)]  # detections
+        return [BOTrack(xyxy, s, c) for (xyxy, s, c) in zip(dets, scores, cls)]  # detections
+
+    def embed(self, detections):
+        """Compute ReID features of the detections that have none yet, in one batch, from their original boxes."""
+        detections = [det for det in detections if det.curr_feat is None]
+        if self.encoder is None or self.img is None or not detections:
+            return
+        features = self.encoder(self.img, self.boxes[[int(det.idx) for det in detections]])
+        for det, feat in zip(detections, features):
+            det.update_features(feat)
 
     def get_dists(self, tracks, detections):
         """Get distances between tracks and detections using IoU and (optionally) ReID embeddings."""
@@ -183,18 +249,86 @@ class BOTSORT(BYTETracker):
         # if not self.args.mot20:
         dists = matching.fuse_score(dists, detections)
 
-        if self.args.with_reid and self.encoder is not None:
-            emb_dists = matching.embedding_distance(tracks, detections) / 2.0
+        if self.args.with_reid and self.encoder is not None and dists.size:
+            # Appearance only matters where IoU leaves a choice, so only ambiguous detections are embedded
+            close = ~dists_mask
+            ambiguous = (close.sum(0) > 1) | close[close.sum(1) > 1].any(0)
+            self.embed([detections[i] for i in np.nonzero(ambiguous)[0]])
+            rows = [i for i, track in enumerate(tracks) if track.smooth_feat is not None]
+            cols = [i for i, det in enumerate(detections) if det.curr_feat is not None]
+            emb_dists = np.ones_like(dists)
+            if rows and cols:
+                emb_dists[np.ix_(rows, cols)] = (
+                    matching.embedding_distance([tracks[i] for i in rows], [detections[i] for i in cols]) / 2.0
+                )
             emb_dists[emb_dists > self.appearance_thresh] = 1.0
             emb_dists[dists_mask] = 1.0
             dists = np.minimum(dists, emb_dists)
         return dists
 
+    def associate(self, tracks, detections, thresh, fuse=True):
+        """Match tracks to detections; score-fused matching uses ReID and proximity gating, so it always stays dense."""
+        if fuse:
+            return matching.linear_assignment(self.get_dists(tracks, detections), thresh=thresh)
+        return super().associate(tracks, detections, thresh, fuse)
+
     def multi_predict(self, tracks):
         """Predict and track multiple objects with YOLOv8 model."""
         BOTrack.multi_predict(tracks)
 
+    def multi_update(self, tracks, detections):
+        """Update matched tracks and their ReID features with one batched Kalman filter correction."""
+        BOTrack.multi_update(tracks, detections, self.frame_id)
+
+    def reidentify(self, detections):
+        """Restore lost or recently removed identities that new-track candidates match by appearance."""
+        if self.encoder is None or not detections:
+            return [], detections
+        # New tracks start with an appearance so they can be re-identified once lost
+        self.embed(detections)
+        candidates = [track for track in self.gallery.values() if track.state != TrackState.Tracked]
+        if not candidates:
+            return [], detections
+        cost = self.gallery_distance(candidates, detections)
+        matches, _, u_detection = matching.linear_assignment(cost, thresh=self.reid_thresh)
+        tracks = []
+        for icandidate, idet in matches:
+            track = candidates[icandidate]
+            track.re_identify(detections[idet], self.frame_id)
+            del self.gallery[track.track_id]
+            tracks.append(track)
+        return tracks, [detections[i] for i in u_detection]
+
+    @staticmethod
+    def gallery_distance(tracks, detections):
+        """Smallest cosine distance, halved like in get_dists, between each track's feature ring and each detection."""
+        from scipy.spatial.distance import cdist  # scope for faster 'import ultralytics'
+
+        det_features = np.asarray([det.curr_feat for det in detections], dtype=np.float32)
+        rings = [np.asarray(track.features, dtype=np.float32) for track in tracks]
+        starts = np.cumsum([0] + [len(ring) for ring in rings[:-1]])
+        dists = np.minimum.reduceat(cdist(np.concatenate(rings), det_features, "cosine"), starts, axis=0) / 2.0
+        dists = np.maximum(dists, 0.0)
+        track_cls = np.asarray([track.cls for track in tracks])
+        det_cls = np.asarray([det.cls for det in detections])
+        dists[track_cls[:, None] != det_cls[None]] = 1.0
+        return dists
+
+    def update_gallery(self):
+        """Add newly lost tracks to the gallery and drop identities that were found again, expired or overflowed."""
+        lost_tracks = self.registry.lost
+        for track_id, track in lost_tracks.items():
+            if track.smooth_feat is not None and track_id not in self.gallery:
+                self.gallery[track_id] = track
+        for track_id, track in list(self.gallery.items()):
+            lost = track.state == TrackState.Removed or track_id in lost_tracks
+            if not lost or self.frame_id - track.end_frame > self.gallery_ttl:
+                del self.gallery[track_id]
+        while len(self.gallery) > self.gallery_size:
+            self.gallery.popitem(last=False)
+
     def reset(self):
         """Reset tracker."""
         super().reset()
         self.gmc.reset_params()
+        self.gallery.clear()
@@ -2,7 +2,7 @@
 
 import numpy as np
 
-from .basetrack import BaseTrack, TrackState
+from .basetrack import BaseTrack, TrackIdCounter, TrackRegistry, TrackState
 from .utils import matching
 from .utils.kalman_filter import KalmanFilterXYAH
 
@@ -34,7 +34,8 @@ class STrack(BaseTrack):
         predict(): Predict the next state of the object using Kalman filter.
         multi_predict(stracks): Predict the next states for multiple tracks.
         multi_gmc(stracks, H): Update multiple track states using a homography matrix.
-        activate(kalman_filter, frame_id): Activate a new tracklet.
+        multi_update(stracks, detections, frame_id): Update multiple matched tracks with one Kalman filter correction.
+        activate(kalman_filter, frame_id, track_ids): Activate a new tracklet with an ID from `track_ids`.
         re_activate(new_track, frame_id, new_id): Reactivate a previously lost tracklet.
         update(new_track, frame_id): Update the state of a matched track.
         convert_coords(tlwh): Convert bounding box to x-y-angle-height format.
@@ -99,9 +100,38 @@ class STrack(BaseTrack):
                 stracks[i].mean = mean
                 stracks[i].covariance = cov
 
-    def activate(self, kalman_filter, frame_id):
-        """Start a new tracklet."""
+    @staticmethod
+    def multi_update(stracks, detections, frame_id):
+        """
+        Update matched tracks with their detections using one batched Kalman filter correction.
+
+        Tracks in the Tracked state are updated like `update`, the others are re-activated like `re_activate`.
+
+        Args:
+            stracks (list[STrack]): The matched tracks, all sharing the same Kalman filter.
+            detections (list[STrack]): The detection matched to each track.
+            frame_id (int): The ID of the current frame.
+        """
+        if len(stracks) <= 0:
+            return
+        multi_mean = np.asarray([st.mean for st in stracks])
+        multi_covariance = np.asarray([st.covariance for st in stracks])
+        measurement = np.asarray([st.convert_coords(det.tlwh) for st, det in zip(stracks, detections)])
+        multi_mean, multi_covariance = stracks[0].kalman_filter.multi_update(multi_mean, multi_covariance, measurement)
+        for st, det, mean, cov in zip(stracks, detections, multi_mean, multi_covariance):
+            st.mean, st.covariance = mean, cov
+            st.tracklet_len = st.tracklet_len + 1 if st.state == TrackState.Tracked else 0
+            st.state = TrackState.Tracked
+            st.is_activated = True
+            st.frame_id = frame_id
+            st.score = det.score
+            st.cls = det.cls
+            st.idx = det.idx
+
+    def activate(self, kalman_filter, frame_id, track_ids):
+        """Start a new tracklet, taking its ID from the tracker's `track_ids` counter."""
         self.kalman_filter = kalman_filter
+        self.track_ids = track_ids
         self.track_id = self.next_id()
         self.mean, self.covariance = self.kalman_filter.initiate(self.convert_coords(self._tlwh))
 
@@ -199,30 +229,39 @@ class STrack(BaseTrack):
         return f"OT_{self.track_id}_({self.start_frame}-{self.end_frame})"
 
 
-def adjust_box_within_bounds(max_width, max_height, x1, y1, x2, y2, height_expansion=0.3):
-    # 原始宽度和高度
-    width = x2 - x1
-    height = y2 - y1
-    
+def adjust_boxes_within_bounds(bboxes, max_width, max_height, height_expansion=0.3):
+    """
+    Expand all boxes downwards and to a 2:3 width/height ratio in one vectorized pass, clipped to the image.
+
+    Args:
+        bboxes (np.ndarray): Nx4 boxes in (x1, y1, x2, y2) format.
+        max_width (int): Image width.
+        max_height (int): Image height.
+        height_expansion (float, optional): Fraction of the box height added below the box. Defaults to 0.3.
+
+    Returns:
+        (np.ndarray): The adjusted Nx4 boxes with integer-valued coordinates, y1 is kept unchanged.
+    """
+    x1, y1, x2, y2 = bboxes[:, 0], bboxes[:, 1], bboxes[:, 2], bboxes[:, 3]
     # 高度按指定比例向下扩展
-    height_extension = height * height_expansion
-    new_height = height + height_extension
-    
-    # 根据2:3的高宽比计算新宽度
-    aspect_ratio = 2.0 / 3.0
-    new_width = new_height / aspect_ratio
-    
-    # 计算中心点，以便均匀扩展宽度
+    new_height = (y2 - y1) + (y2 - y1) * height_expansion
+    # 根据2:3的高宽比计算新宽度，以中心点均匀扩展宽度
+    new_width = new_height / (2.0 / 3.0)
     center_x = (x1 + x2) / 2
-    
-    # 计算新的x1和x2
-    x1_new = max(int(center_x - new_width / 2), 0)
-    x2_new = min(int(center_x + new_width / 2), max_width)
-    
-    # 计算新的y2（y1保持不变，向下扩展）
-    y2_new = min(int(y1 + new_height), max_height)
-    
-    return x1_new, y1, x2_new, y2_new
+
+    ret = np.empty_like(bboxes[:, :4])
+    ret[:, 0] = np.maximum(np.trunc(center_x - new_width / 2), 0)
+    ret[:, 1] = y1
+    ret[:, 2] = np.minimum(np.trunc(center_x + new_width / 2), max_width)
+    # y1保持不变，向下扩展
+    ret[:, 3] = np.minimum(np.trunc(y1 + new_height), max_height)
+    return ret
+
+
+def draw_tracks(img, tlbrs, color=(255, 255, 255), thickness=1):
+    """Draw track boxes onto `img` in place; used as the opt-in BYTETracker overlay hook for debug output."""
+    for x1, y1, x2, y2 in tlbrs.astype(int).tolist():
+        cv2.rectangle(img, (x1, y1), (x2, y2), color, thickness)
 
 
 class BYTETracker:
@@ -234,52 +273,53 @@ class BYTETracker:
     predicting the new object locations, and performs data association.
 
     Attributes:
-        tracked_stracks (list[STrack]): List of successfully activated tracks.
-        lost_stracks (list[STrack]): List of lost tracks.
-        removed_stracks (list[STrack]): List of removed tracks.
+        registry (TrackRegistry): ID-indexed tracked and lost tracks, their expiry and the removed track history.
+        tracked_stracks (list[STrack]): List of successfully activated tracks, read from `registry`.
+        lost_stracks (list[STrack]): List of lost tracks, read from `registry`.
+        removed_stracks (list[STrack]): List of the most recently removed tracks, read from `registry`.
         frame_id (int): The current frame ID.
         args (namespace): Command-line arguments.
         max_time_lost (int): The maximum frames for a track to be considered as 'lost'.
         kalman_filter (object): Kalman Filter object.
+        overlay (callable | None): Optional debug hook called as `overlay(img, tlbrs)` with the boxes of the predicted
+            track pool after each update, e.g. `draw_tracks`. Disabled by default so the input image is not modified.
+        track_ids (TrackIdCounter): Track ID counter of this tracker, so IDs are independent of other trackers.
 
     Methods:
         update(results, img=None): Updates object tracker with new detections.
         get_kalmanfilter(): Returns a Kalman filter object for tracking bounding boxes.
         init_track(dets, scores, cls, img=None): Initialize object tracking with detections.
         get_dists(tracks, detections): Calculates the distance between tracks and detections.
+        associate(tracks, detections, thresh, fuse): Matches tracks to detections with the dense or sparse backend.
         multi_predict(tracks): Predicts the location of tracks.
-        reset_id(): Resets the ID counter of STrack.
+        multi_update(tracks, detections): Updates matched tracks with their detections.
+        reidentify(detections): Restores lost identities from new-track candidates, a no-op without ReID.
+        reset_id(): Resets the track ID counter of this tracker.
         joint_stracks(tlista, tlistb): Combines two lists of stracks.
         sub_stracks(tlista, tlistb): Filters out the stracks present in the second list from the first list.
+        duplicate_stracks(stracksa, stracksb): Finds duplicate stracks among overlapping pairs based on IOU.
         remove_duplicate_stracks(stracksa, stracksb): Removes duplicate stracks based on IOU.
     """
 
     def __init__(self, args, frame_rate=30):
         """Initialize a YOLOv8 object to track objects with given arguments and frame rate."""
-        self.tracked_stracks = []  # type: list[STrack]
-        self.lost_stracks = []  # type: list[STrack]
-        self.removed_stracks = []  # type: list[STrack]
-
         self.frame_id = 0
         self.args = args
         self.max_time_lost = int(frame_rate / 30.0 * args.track_buffer)
+        self.registry = TrackRegistry(self.max_time_lost)
         self.kalman_filter = self.get_kalmanfilter()
-        self.reset_id()
+        self.overlay = None
+        self.track_ids = TrackIdCounter()
 
     def update(self, results, img=None):
         """Updates object tracker with new detections and returns tracked object bounding boxes."""
         self.frame_id += 1
+        registry = self.registry
         activated_stracks = []
         refind_stracks = []
-        lost_stracks = []
-        removed_stracks = []
 
         scores = results.conf
-        bboxes = results.xyxy.copy()
-        for bbox in bboxes:
-            bbox[0], bbox[1], bbox[2], bbox[3] = adjust_box_within_bounds(
-                img.shape[1], img.shape[0], bbox[0], bbox[1], bbox[2], bbox[3]
-            )
+        bboxes = adjust_boxes_within_bounds(results.xyxy, img.shape[1], img.shape[0])
         # Add index
         bboxes = np.concatenate([bboxes, np.arange(len(bboxes)).reshape(-1, 1)], axis=-1)
         cls = results.cls
@@ -300,13 +340,13 @@ class BYTETracker:
         # Add newly detected tracklets to tracked_stracks
         unconfirmed = []
         tracked_stracks = []  # type: list[STrack]
-        for track in self.tracked_stracks:
+        for track in registry.tracked.values():
             if not track.is_activated:
                 unconfirmed.append(track)
             else:
                 tracked_stracks.append(track)
         # Step 2: First association, with high score detection boxes
-        strack_pool = self.joint_stracks(tracked_stracks, self.lost_stracks)
+        strack_pool = tracked_stracks + list(registry.lost.values())  # disjoint by track ID
         # Predict the current location with KF
         self.multi_predict(strack_pool)
         if hasattr(self, "gmc") and img is not None:
@@ -314,86 +354,73 @@ class BYTETracker:
             STrack.multi_gmc(strack_pool, warp)
             STrack.multi_gmc(unconfirmed, warp)
 
-        dists = self.get_dists(strack_pool, detections)
-        matches, u_track, u_detection = matching.linear_assignment(dists, thresh=self.args.match_thresh)
+        matches, u_track, u_detection = self.associate(strack_pool, detections, self.args.match_thresh)
 
-        for itracked, idet in matches:
-            track = strack_pool[itracked]
-            det = detections[idet]
-            if track.state == TrackState.Tracked:
-                track.update(det, self.frame_id)
-                activated_stracks.append(track)
-            else:
-                track.re_activate(det, self.frame_id, new_id=False)
-                refind_stracks.append(track)
+        tracks = [strack_pool[itracked] for itracked, _ in matches]
+        activated_stracks.extend(track for track in tracks if track.state == TrackState.Tracked)
+        refind_stracks.extend(track for track in tracks if track.state != TrackState.Tracked)
+        self.multi_update(tracks, [detections[idet] for _, idet in matches])
         # Step 3: Second association, with low score detection boxes association the untrack to the low score detections
         detections_second = self.init_track(dets_second, scores_second, cls_second, img)
         r_tracked_stracks = [strack_pool[i] for i in u_track if strack_pool[i].state == TrackState.Tracked]
         # TODO
-        dists = matching.iou_distance(r_tracked_stracks, detections_second)
-        matches, u_track, u_detection_second = matching.linear_assignment(dists, thresh=0.5)
-        for itracked, idet in matches:
-            track = r_tracked_stracks[itracked]
-            det = detections_second[idet]
-            if track.state == TrackState.Tracked:
-                track.update(det, self.frame_id)
-                activated_stracks.append(track)
-            else:
-                track.re_activate(det, self.frame_id, new_id=False)
-                refind_stracks.append(track)
+        matches, u_track, u_detection_second = self.associate(r_tracked_stracks, detections_second, 0.5, fuse=False)
+        tracks = [r_tracked_stracks[itracked] for itracked, _ in matches]
+        activated_stracks.extend(track for track in tracks if track.state == TrackState.Tracked)
+        refind_stracks.extend(track for track in tracks if track.state != TrackState.Tracked)
+        self.multi_update(tracks, [detections_second[idet] for _, idet in matches])
 
         for it in u_track:
             track = r_tracked_stracks[it]
             if track.state != TrackState.Lost:
-                track.mark_lost()
-                lost_stracks.append(track)
+                registry.mark_lost(track, self.frame_id)
         # Deal with unconfirmed tracks, usually tracks with only one beginning frame
         detections = [detections[i] for i in u_detection]
-        dists = self.get_dists(unconfirmed, detections)
-        matches, u_unconfirmed, u_detection = matching.linear_assignment(dists, thresh=0.7)
-        for itracked, idet in matches:
-            unconfirmed[itracked].update(detections[idet], self.frame_id)
-            activated_stracks.append(unconfirmed[itracked])
+        matches, u_unconfirmed, u_detection = self.associate(unconfirmed, detections, 0.7)
+        tracks = [unconfirmed[itracked] for itracked, _ in matches]
+        activated_stracks.extend(tracks)
+        self.multi_update(tracks, [detections[idet] for _, idet in matches])
         for it in u_unconfirmed:
-            track = unconfirmed[it]
-            track.mark_removed()
-            removed_stracks.append(track)
-        # Step 4: Init new stracks
-        for inew in u_detection:
-            track = detections[inew]
-            if track.score < self.args.new_track_thresh:
-                continue
-            track.activate(self.kalman_filter, self.frame_id)
+            registry.mark_removed(unconfirmed[it])
+        # Step 4: Init new stracks, unless they re-identify a lost track
+        detections = [detections[i] for i in u_detection if detections[i].score >= self.args.new_track_thresh]
+        tracks, detections = self.reidentify(detections)
+        refind_stracks.extend(tracks)
+        for track in detections:
+            track.activate(self.kalman_filter, self.frame_id, self.track_ids)
             activated_stracks.append(track)
         # Step 5: Update state
-        for track in self.lost_stracks:
-            if self.frame_id - track.end_frame > self.max_time_lost:
-                track.mark_removed()
-                removed_stracks.append(track)
-
-        for track in strack_pool:
-            x1, y1, x2, y2 = track.tlbr
-            x1 = int(x1)
-            y1 = int(y1)
-            x2 = int(x2)
-            y2 = int(y2)
-            cv2.rectangle(img, (x1, y1), (x2, y2), (255, 255, 255), 1)
-
-        self.tracked_stracks = [t for t in self.tracked_stracks if t.state == TrackState.Tracked]
-        self.tracked_stracks = self.joint_stracks(self.tracked_stracks, activated_stracks)
-        self.tracked_stracks = self.joint_stracks(self.tracked_stracks, refind_stracks)
-        self.lost_stracks = self.sub_stracks(self.lost_stracks, self.tracked_stracks)
-        self.lost_stracks.extend(lost_stracks)
-        self.lost_stracks = self.sub_stracks(self.lost_stracks, self.removed_stracks)
-        self.tracked_stracks, self.lost_stracks = self.remove_duplicate_stracks(self.tracked_stracks, self.lost_stracks)
-        self.removed_stracks.extend(removed_stracks)
-        if len(self.removed_stracks) > 1000:
-            self.removed_stracks = self.removed_stracks[-999:]  # clip remove stracks to 1000 maximum
+        registry.expire(self.frame_id)
+
+        if self.overlay is not None and img is not None and strack_pool:
+            self.overlay(img, np.asarray([track.tlbr for track in strack_pool]))
+
+        for track in activated_stracks:
+            registry.add(track)
+        for track in refind_stracks:
+            registry.add(track)
+        for track in self.duplicate_stracks(self.tracked_stracks, self.lost_stracks):
+            registry.discard(track)
         return np.asarray(
             [x.tlbr.tolist() + [x.track_id, x.score, x.cls, x.idx] for x in self.tracked_stracks if x.is_activated],
             dtype=np.float32,
         )
 
+    @property
+    def tracked_stracks(self):
+        """Tracked tracks, including unconfirmed ones."""
+        return list(self.registry.tracked.values())
+
+    @property
+    def lost_stracks(self):
+        """Lost tracks."""
+        return list(self.registry.lost.values())
+
+    @property
+    def removed_stracks(self):
+        """The most recently removed tracks."""
+        return list(self.registry.removed)
+
     def get_kalmanfilter(self):
         """Returns a Kalman filter object for tracking bounding boxes."""
         return KalmanFilterXYAH()
@@ -410,20 +437,43 @@ class BYTETracker:
         dists = matching.fuse_score(dists, detections)
         return dists
 
+    def associate(self, tracks, detections, thresh, fuse=True):
+        """
+        Match tracks to detections by IoU distance, fused with detection scores if `fuse` is True.
+
+        With `sparse_association` enabled in the tracker config, only overlapping pairs are scored and each connected
+        component is solved separately (see `matching.sparse_iou_assignment`), which gives the same matches as the dense
+        cost matrix but scales to large scenes.
+        """
+        if getattr(self.args, "sparse_association", False):
+            return matching.sparse_iou_assignment(
+                np.asarray([track.tlbr for track in tracks]),
+                np.asarray([det.tlbr for det in detections]),
+                thresh,
+                np.array([det.score for det in detections]) if fuse else None,
+            )
+        dists = self.get_dists(tracks, detections) if fuse else matching.iou_distance(tracks, detections)
+        return matching.linear_assignment(dists, thresh=thresh)
+
     def multi_predict(self, tracks):
         """Returns the predicted tracks using the YOLOv8 network."""
         STrack.multi_predict(tracks)
 
-    @staticmethod
-    def reset_id():
-        """Resets the ID counter of STrack."""
-        STrack.reset_id()
+    def multi_update(self, tracks, detections):
+        """Updates matched tracks with their detections using one batched Kalman filter correction."""
+        STrack.multi_update(tracks, detections, self.frame_id)
+
+    def reidentify(self, detections):
+        """Returns lost tracks restored by new-track candidates and the remaining candidates; none without ReID."""
+        return [], detections
+
+    def reset_id(self):
+        """Resets the track ID counter of this tracker."""
+        self.track_ids.reset()
 
     def reset(self):
         """Reset tracker."""
-        self.tracked_stracks = []  # type: list[STrack]
-        self.lost_stracks = []  # type: list[STrack]
-        self.removed_stracks = []  # type: list[STrack]
+        self.registry = TrackRegistry(self.max_time_lost)
         self.frame_id = 0
         self.kalman_filter = self.get_kalmanfilter()
         self.reset_id()
@@ -457,18 +507,29 @@ class BYTETracker:
         return [t for t in tlista if t.track_id not in track_ids_b]
 
     @staticmethod
-    def remove_duplicate_stracks(stracksa, stracksb):
-        """Remove duplicate stracks with non-maximum IOU distance."""
-        pdist = matching.iou_distance(stracksa, stracksb)
-        pairs = np.where(pdist < 0.15)
-        dupa, dupb = [], []
-        for p, q in zip(*pairs):
+    def duplicate_stracks(stracksa, stracksb):
+        """
+        Find the stracks of either list that duplicate a longer-lived strack of the other one by IOU distance.
+
+        Only overlapping pairs are scored, with a spatial grid on large scenes (see `matching.iou_pairs`).
+        """
+        if not stracksa or not stracksb:
+            return []
+        p, q, pdist = matching.iou_pairs(
+            np.asarray([t.tlbr for t in stracksa]), np.asarray([t.tlbr for t in stracksb]), min_pairs=160000
+        )
+        dup = pdist < 0.15
+        duplicates = []
+        for p, q in zip(p[dup].tolist(), q[dup].tolist()):
             timep = stracksa[p].frame_id - stracksa[p].start_frame
             timeq = stracksb[q].frame_id - stracksb[q].start_frame
-            if timep > timeq:
-                dupb.append(q)
-            else:
-                dupa.append(p)
-        resa = [t for i, t in enumerate(stracksa) if i not in dupa]
-        resb = [t for i, t in enumerate(stracksb) if i not in dupb]
+            duplicates.append(stracksb[q] if timep > timeq else stracksa[p])
+        return duplicates
+
+    @staticmethod
+    def remove_duplicate_stracks(stracksa, stracksb):
+        """Remove duplicate stracks with non-maximum IOU distance."""
+        duplicates = {id(t) for t in BYTETracker.duplicate_stracks(stracksa, stracksb)}
+        resa = [t for t in stracksa if id(t) not in duplicates]
+        resb = [t for t in stracksb if id(t) not in duplicates]
         return resa, resb
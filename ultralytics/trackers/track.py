@@ -8,9 +8,10 @@ from ultralytics.utils.checks import check_yaml
 
 from .bot_sort import BOTSORT
 from .byte_tracker import BYTETracker
+from .vec_byte_tracker import VecBYTETracker
 
 # A mapping of tracker types to corresponding tracker classes
-TRACKER_MAP = {"bytetrack": BYTETracker, "botsort": BOTSORT}
+TRACKER_MAP = {"bytetrack": BYTETracker, "vecbytetrack": VecBYTETracker, "botsort": BOTSORT}
 
 
 def on_predict_start(predictor: object, persist: bool = False, frame_rate: int = 30) -> None:
@@ -22,7 +23,7 @@ def on_predict_start(predictor: object, persist: bool = False, frame_rate: int =
         persist (bool, optional): Whether to persist the trackers if they already exist. Defaults to False.
 
     Raises:
-        AssertionError: If the tracker_type is not 'bytetrack' or 'botsort'.
+        AssertionError: If the tracker_type is not 'bytetrack', 'vecbytetrack' or 'botsort'.
     """
     if predictor.args.task == "obb":
         raise NotImplementedError("ERROR ❌ OBB task does not support track mode!")
@@ -32,8 +33,10 @@ def on_predict_start(predictor: object, persist: bool = False, frame_rate: int =
     tracker = check_yaml(predictor.args.tracker)
     cfg = IterableSimpleNamespace(**yaml_load(tracker))
 
-    if cfg.tracker_type not in ["bytetrack", "botsort"]:
-        raise AssertionError(f"Only 'bytetrack' and 'botsort' are supported for now, but got '{cfg.tracker_type}'")
+    if cfg.tracker_type not in TRACKER_MAP:
+        raise AssertionError(
+            f"Only 'bytetrack', 'vecbytetrack' and 'botsort' are supported for now, but got '{cfg.tracker_type}'"
+        )
 
     trackers = []
     for _ in range(predictor.dataset.bs):
@@ -65,6 +68,7 @@ def on_predict_postprocess_end(predictor: object, persist: bool = False) -> None
             continue
         idx = tracks[:, -1].astype(int)
         predictor.results[i] = predictor.results[i][idx]
+        # as_tensor shares memory with the tracker output, so Boxes.table is a zero-copy view of it
         predictor.results[i].update(boxes=torch.as_tensor(tracks[:, :-1]))
 
 
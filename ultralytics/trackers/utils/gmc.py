@@ -16,8 +16,13 @@ class GMC:
     SIFT, ECC, and Sparse Optical Flow. It also supports downscaling of frames for computational efficiency.
 
     Attributes:
-        method (str): The method used for tracking. Options include 'orb', 'sift', 'ecc', 'sparseOptFlow', 'none'.
+        method (str): The method used for tracking. Options include 'orb', 'sift', 'ecc', 'sparseOptFlow',
+            'persistentOptFlow', 'none'.
         downscale (int): Factor by which to downscale the frames for processing.
+        roi (tuple | None): Region (x1, y1, x2, y2) of the raw frame used for keypoints, e.g. the static background.
+        static_thresh (float): Mean absolute gray level difference to the keyframe below which the camera is
+            considered static and estimation is skipped ('persistentOptFlow' only).
+        max_keypoints (int): Size of the persistent keypoint set ('persistentOptFlow' only).
         prevFrame (np.array): Stores the previous frame for tracking.
         prevKeyPoints (list): Stores the keypoints from the previous frame.
         prevDescriptors (np.array): Stores the descriptors from the previous frame.
@@ -31,20 +36,37 @@ class GMC:
         applyEcc(self, raw_frame, detections=None): Applies the ECC algorithm to a raw frame.
         applyFeatures(self, raw_frame, detections=None): Applies feature-based methods like ORB or SIFT to a raw frame.
         applySparseOptFlow(self, raw_frame, detections=None): Applies the Sparse Optical Flow method to a raw frame.
+        applyPersistentOptFlow(self, raw_frame, detections=None): Applies Sparse Optical Flow with a persistent
+                                                                  keypoint set and a static camera test.
     """
 
-    def __init__(self, method: str = "sparseOptFlow", downscale: int = 2) -> None:
+    def __init__(
+        self,
+        method: str = "sparseOptFlow",
+        downscale: int = 2,
+        roi: tuple = None,
+        static_thresh: float = 1.0,
+        max_keypoints: int = 300,
+    ) -> None:
         """
         Initialize a video tracker with specified parameters.
 
         Args:
-            method (str): The method used for tracking. Options include 'orb', 'sift', 'ecc', 'sparseOptFlow', 'none'.
+            method (str): The method used for tracking. Options include 'orb', 'sift', 'ecc', 'sparseOptFlow',
+                'persistentOptFlow', 'none'.
             downscale (int): Downscale factor for processing frames.
+            roi (tuple, optional): Region (x1, y1, x2, y2) of the raw frame used for keypoints. Defaults to the full
+                frame.
+            static_thresh (float): Gray level difference below which a frame is considered static.
+            max_keypoints (int): Size of the persistent keypoint set.
         """
         super().__init__()
 
         self.method = method
         self.downscale = max(1, int(downscale))
+        self.roi = roi
+        self.static_thresh = static_thresh
+        self.max_keypoints = max_keypoints
 
         if self.method == "orb":
             self.detector = cv2.FastFeatureDetector_create(20)
@@ -67,6 +89,10 @@ class GMC:
                 maxCorners=1000, qualityLevel=0.01, minDistance=1, blockSize=3, useHarrisDetector=False, k=0.04
             )
 
+        elif self.method == "persistentOptFlow":
+            self.feature_params = dict(qualityLevel=0.01, minDistance=8, blockSize=3, useHarrisDetector=False, k=0.04)
+            self.lk_params = dict(winSize=(21, 21), maxLevel=3)
+
         elif self.method in ["none", "None", None]:
             self.method = None
         else:
@@ -75,6 +101,8 @@ class GMC:
         self.prevFrame = None
         self.prevKeyPoints = None
         self.prevDescriptors = None
+        self.prevThumb = None
+        self.prevMask = None
         self.initializedFirstFrame = False
 
     def apply(self, raw_frame: np.array, detections: list = None) -> np.array:
@@ -100,6 +128,8 @@ class GMC:
             return self.applyEcc(raw_frame, detections)
         elif self.method == "sparseOptFlow":
             return self.applySparseOptFlow(raw_frame, detections)
+        elif self.method == "persistentOptFlow":
+            return self.applyPersistentOptFlow(raw_frame, detections)
         else:
             return np.eye(2, 3)
 
@@ -357,9 +387,117 @@ class GMC:
 
         return H
 
+    def applyPersistentOptFlow(self, raw_frame: np.array, detections: list = None) -> np.array:
+        """
+        Apply Sparse Optical Flow with a persistent keypoint set, intended for fixed or slowly moving cameras.
+
+        Keypoints are detected once inside `roi` with detection boxes masked out, then tracked with LK from the last
+        keyframe and only topped up when fewer than half of them survive. Each frame is first compared with the
+        keyframe on a small thumbnail of the background; if the mean difference is below `static_thresh` the camera is
+        considered static and the identity is returned without running LK. The keyframe is kept in that case, so slow
+        drift accumulates until it is detected and the whole motion since the keyframe is returned at once.
+
+        Args:
+            raw_frame (np.array): The raw frame to be processed.
+            detections (list): List of detections to be masked out of the background.
+
+        Returns:
+            (np.array): Processed frame.
+
+        Examples:
+            >>> gmc = GMC(method='persistentOptFlow')
+            >>> gmc.applyPersistentOptFlow(np.zeros((64, 64, 3), dtype=np.uint8))
+            array([[1., 0., 0.],
+                   [0., 1., 0.]])
+        """
+        height, width, _ = raw_frame.shape
+        H = np.eye(2, 3)
+
+        # Static camera test on a thumbnail of the background
+        thumb_scale = self.downscale * 4
+        thumb = cv2.cvtColor(
+            cv2.resize(raw_frame, (width // thumb_scale, height // thumb_scale), interpolation=cv2.INTER_AREA),
+            cv2.COLOR_BGR2GRAY,
+        )
+        thumb_mask = self._background_mask(thumb.shape, thumb_scale, detections)
+        if self.initializedFirstFrame and self.prevThumb.shape == thumb.shape:
+            mask = cv2.bitwise_and(thumb_mask, self.prevMask)
+            if cv2.mean(cv2.absdiff(thumb, self.prevThumb), mask)[0] < self.static_thresh:
+                return H
+
+        frame = raw_frame
+        if self.downscale > 1.0:
+            frame = cv2.resize(raw_frame, (width // self.downscale, height // self.downscale))
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        mask = self._background_mask(frame.shape, self.downscale, detections)
+
+        keypoints = None
+        if self.initializedFirstFrame and self.prevKeyPoints is not None and self.prevFrame.shape == frame.shape:
+            # Track the persistent keypoints from the keyframe
+            matchedKeypoints, status, _ = cv2.calcOpticalFlowPyrLK(
+                self.prevFrame, frame, self.prevKeyPoints, None, **self.lk_params
+            )
+            status = status.ravel().astype(bool)
+            prevPoints, currPoints = self.prevKeyPoints[status], matchedKeypoints[status]
+
+            if len(prevPoints) > 4:
+                H, inliers = cv2.estimateAffinePartial2D(prevPoints, currPoints, cv2.RANSAC)
+                if H is None:
+                    H = np.eye(2, 3)
+                else:
+                    # Keep inliers that are still on the background
+                    keypoints = currPoints[inliers.ravel().astype(bool)]
+                    x, y = keypoints[:, 0, 0].astype(np.int_), keypoints[:, 0, 1].astype(np.int_)
+                    inside = (x >= 0) & (y >= 0) & (x < frame.shape[1]) & (y < frame.shape[0])
+                    keypoints = keypoints[inside]
+                    keypoints = keypoints[mask[y[inside], x[inside]] > 0]
+                    if self.downscale > 1.0:
+                        H[0, 2] *= self.downscale
+                        H[1, 2] *= self.downscale
+            else:
+                LOGGER.warning("WARNING: not enough matching points")
+
+        # Top up the keypoint set when coverage drops
+        if keypoints is None or len(keypoints) < self.max_keypoints // 2:
+            if keypoints is None:
+                keypoints = np.empty((0, 1, 2), dtype=np.float32)
+            detect_mask = mask.copy()
+            for x, y in keypoints[:, 0].astype(np.int_):
+                cv2.circle(detect_mask, (int(x), int(y)), self.feature_params["minDistance"], 0, -1)
+            new = cv2.goodFeaturesToTrack(
+                frame, maxCorners=self.max_keypoints - len(keypoints), mask=detect_mask, **self.feature_params
+            )
+            if new is not None:
+                keypoints = np.concatenate([keypoints, new.astype(np.float32)])
+
+        self.prevFrame = frame
+        self.prevKeyPoints = keypoints if len(keypoints) else None
+        self.prevThumb = thumb
+        self.prevMask = thumb_mask
+        self.initializedFirstFrame = True
+
+        return H
+
+    def _background_mask(self, shape: tuple, scale: int, detections: list = None) -> np.array:
+        """Return a uint8 mask of the `roi` at 1/`scale` of the raw frame size with detection boxes set to 0."""
+        height, width = shape
+        mask = np.zeros(shape, dtype=np.uint8)
+        if self.roi is None:
+            mask[int(0.02 * height) : int(0.98 * height), int(0.02 * width) : int(0.98 * width)] = 255
+        else:
+            x1, y1, x2, y2 = (np.asarray(self.roi[:4]) / scale).astype(np.int_)
+            mask[max(y1, 0) : y2, max(x1, 0) : x2] = 255
+        if detections is not None:
+            for det in detections:
+                tlbr = (np.asarray(det[:4]) / scale).astype(np.int_)
+                mask[max(tlbr[1], 0) : tlbr[3] + 1, max(tlbr[0], 0) : tlbr[2] + 1] = 0
+        return mask
+
     def reset_params(self) -> None:
         """Reset parameters."""
         self.prevFrame = None
         self.prevKeyPoints = None
         self.prevDescriptors = None
+        self.prevThumb = None
+        self.prevMask = None
         self.initializedFirstFrame = False
@@ -4,6 +4,22 @@ import numpy as np
 import scipy.linalg
 
 
+def batch_diag(values: np.ndarray) -> np.ndarray:
+    """
+    Build a stack of diagonal matrices without a Python loop over the batch.
+
+    Args:
+        values (ndarray): The NxK matrix of diagonal entries.
+
+    Returns:
+        (np.ndarray): The NxKxK stack of diagonal matrices, with the same dtype as `values`.
+    """
+    n, k = values.shape
+    out = np.zeros((n, k, k), dtype=values.dtype)
+    out[:, range(k), range(k)] = values
+    return out
+
+
 class KalmanFilterXYAH:
     """
     For bytetrack. A simple Kalman filter for tracking bounding boxes in image space.
@@ -143,8 +159,7 @@ class KalmanFilterXYAH:
         ]
         sqr = np.square(np.r_[std_pos, std_vel]).T
 
-        motion_cov = [np.diag(sqr[i]) for i in range(len(mean))]
-        motion_cov = np.asarray(motion_cov)
+        motion_cov = batch_diag(sqr)
 
         mean = np.dot(mean, self._motion_mat.T)
         left = np.dot(self._motion_mat, covariance).transpose((1, 0, 2))
@@ -152,6 +167,77 @@ class KalmanFilterXYAH:
 
         return mean, covariance
 
+    def multi_initiate(self, measurement: np.ndarray) -> tuple:
+        """
+        Create tracks from unassociated measurements (Vectorized version).
+
+        Args:
+            measurement (ndarray): The Nx4 dimensional measurement matrix, each row in format (x, y, a, h).
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx8 mean matrix and Nx8x8 covariance matrix of the new tracks.
+        """
+        mean = np.concatenate([measurement, np.zeros_like(measurement)], axis=1).astype(float)
+        h = measurement[:, 3]
+        std = [
+            2 * self._std_weight_position * h,
+            2 * self._std_weight_position * h,
+            1e-2 * np.ones_like(h),
+            2 * self._std_weight_position * h,
+            10 * self._std_weight_velocity * h,
+            10 * self._std_weight_velocity * h,
+            1e-5 * np.ones_like(h),
+            10 * self._std_weight_velocity * h,
+        ]
+        covariance = batch_diag(np.square(std).T)
+        return mean, covariance
+
+    def multi_project(self, mean: np.ndarray, covariance: np.ndarray) -> tuple:
+        """
+        Project state distributions to measurement space (Vectorized version).
+
+        Args:
+            mean (ndarray): The Nx8 dimensional mean matrix of the object states.
+            covariance (ndarray): The Nx8x8 covariance matrix of the object states.
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx4 projected mean and Nx4x4 projected covariance matrices.
+        """
+        std = [
+            self._std_weight_position * mean[:, 3],
+            self._std_weight_position * mean[:, 3],
+            1e-1 * np.ones_like(mean[:, 3]),
+            self._std_weight_position * mean[:, 3],
+        ]
+        innovation_cov = batch_diag(np.square(std).T)
+
+        mean = np.dot(mean, self._update_mat.T)
+        covariance = np.matmul(np.matmul(self._update_mat, covariance), self._update_mat.T)
+        return mean, covariance + innovation_cov
+
+    def multi_update(self, mean: np.ndarray, covariance: np.ndarray, measurement: np.ndarray) -> tuple:
+        """
+        Run Kalman filter correction step (Vectorized version).
+
+        Args:
+            mean (ndarray): The Nx8 dimensional predicted mean matrix.
+            covariance (ndarray): The Nx8x8 covariance matrix.
+            measurement (ndarray): The Nx4 dimensional measurement matrix, one row per state.
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the measurement-corrected state distributions.
+        """
+        projected_mean, projected_cov = self.multi_project(mean, covariance)
+
+        # Solve S @ K.T = (P @ H.T).T for all states at once instead of one cho_factor/cho_solve per state
+        kalman_gain = np.linalg.solve(projected_cov, np.matmul(covariance, self._update_mat.T).transpose((0, 2, 1)))
+        kalman_gain = kalman_gain.transpose((0, 2, 1))
+        innovation = measurement - projected_mean
+
+        new_mean = mean + np.einsum("ni,nji->nj", innovation, kalman_gain)
+        new_covariance = covariance - np.matmul(np.matmul(kalman_gain, projected_cov), kalman_gain.transpose((0, 2, 1)))
+        return new_mean, new_covariance
+
     def update(self, mean: np.ndarray, covariance: np.ndarray, measurement: np.ndarray) -> tuple:
         """
         Run Kalman filter correction step.
@@ -219,6 +305,47 @@ class KalmanFilterXYAH:
         else:
             raise ValueError("Invalid distance metric")
 
+    def multi_gating_distance(
+        self,
+        mean: np.ndarray,
+        covariance: np.ndarray,
+        measurements: np.ndarray,
+        only_position: bool = False,
+        metric: str = "maha",
+    ) -> np.ndarray:
+        """
+        Compute gating distances between N state distributions and M measurements (Vectorized version).
+
+        Args:
+            mean (ndarray): The Nx8 dimensional mean matrix of the state distributions.
+            covariance (ndarray): The Nx8x8 covariance matrix of the state distributions.
+            measurements (ndarray): An Mx4 matrix of M measurements in the same format as `gating_distance`.
+            only_position (bool, optional): If True, distance computation is done with respect to the bounding box
+                center position only. Defaults to False.
+            metric (str, optional): 'gaussian' for the squared Euclidean distance and 'maha' for the squared
+                Mahalanobis distance. Defaults to 'maha'.
+
+        Returns:
+            (np.ndarray): Returns an NxM matrix, where element (i, j) is the squared distance between the i-th state
+                distribution and `measurements[j]`.
+        """
+        mean, covariance = self.multi_project(mean, covariance)
+        if only_position:
+            mean, covariance = mean[:, :2], covariance[:, :2, :2]
+            measurements = measurements[:, :2]
+
+        d = measurements[None] - mean[:, None]  # NxMxD
+        if metric == "gaussian":
+            return np.sum(d * d, axis=2)
+        elif metric == "maha":
+            # One batched Cholesky factorization for all N distributions; inverting the small triangular factors once
+            # and applying them with matmul is much cheaper than solving against all M measurements per distribution
+            cholesky_factor = np.linalg.cholesky(covariance)
+            z = np.matmul(d, np.linalg.inv(cholesky_factor).transpose((0, 2, 1)))
+            return np.sum(z * z, axis=2)  # square maha
+        else:
+            raise ValueError("Invalid distance metric")
+
 
 class KalmanFilterXYWH(KalmanFilterXYAH):
     """
@@ -339,8 +466,7 @@ class KalmanFilterXYWH(KalmanFilterXYAH):
         ]
         sqr = np.square(np.r_[std_pos, std_vel]).T
 
-        motion_cov = [np.diag(sqr[i]) for i in range(len(mean))]
-        motion_cov = np.asarray(motion_cov)
+        motion_cov = batch_diag(sqr)
 
         mean = np.dot(mean, self._motion_mat.T)
         left = np.dot(self._motion_mat, covariance).transpose((1, 0, 2))
@@ -348,6 +474,54 @@ class KalmanFilterXYWH(KalmanFilterXYAH):
 
         return mean, covariance
 
+    def multi_initiate(self, measurement) -> tuple:
+        """
+        Create tracks from unassociated measurements (Vectorized version).
+
+        Args:
+            measurement (ndarray): The Nx4 dimensional measurement matrix, each row in format (x, y, w, h).
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx8 mean matrix and Nx8x8 covariance matrix of the new tracks.
+        """
+        mean = np.concatenate([measurement, np.zeros_like(measurement)], axis=1).astype(float)
+        w, h = measurement[:, 2], measurement[:, 3]
+        std = [
+            2 * self._std_weight_position * w,
+            2 * self._std_weight_position * h,
+            2 * self._std_weight_position * w,
+            2 * self._std_weight_position * h,
+            10 * self._std_weight_velocity * w,
+            10 * self._std_weight_velocity * h,
+            10 * self._std_weight_velocity * w,
+            10 * self._std_weight_velocity * h,
+        ]
+        covariance = batch_diag(np.square(std).T)
+        return mean, covariance
+
+    def multi_project(self, mean, covariance) -> tuple:
+        """
+        Project state distributions to measurement space (Vectorized version).
+
+        Args:
+            mean (ndarray): The Nx8 dimensional mean matrix of the object states.
+            covariance (ndarray): The Nx8x8 covariance matrix of the object states.
+
+        Returns:
+            (tuple[ndarray, ndarray]): Returns the Nx4 projected mean and Nx4x4 projected covariance matrices.
+        """
+        std = [
+            self._std_weight_position * mean[:, 2],
+            self._std_weight_position * mean[:, 3],
+            self._std_weight_position * mean[:, 2],
+            self._std_weight_position * mean[:, 3],
+        ]
+        innovation_cov = batch_diag(np.square(std).T)
+
+        mean = np.dot(mean, self._update_mat.T)
+        covariance = np.matmul(np.matmul(self._update_mat, covariance), self._update_mat.T)
+        return mean, covariance + innovation_cov
+
     def update(self, mean, covariance, measurement) -> tuple:
         """
         Run Kalman filter correction step.
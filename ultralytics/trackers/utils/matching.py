@@ -2,7 +2,8 @@
 
 import numpy as np
 import scipy
-from scipy.spatial.distance import cdist
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 
 from ultralytics.utils.metrics import bbox_ioa
 
@@ -87,6 +88,180 @@ def iou_distance(atracks: list, btracks: list) -> np.ndarray:
     return 1 - ious  # cost matrix
 
 
+def iou_candidates(atlbrs: np.ndarray, btlbrs: np.ndarray) -> tuple:
+    """
+    Find the pairs of boxes that overlap, using a uniform grid instead of comparing every pair.
+
+    Each box is bucketed into every grid cell it covers, and only boxes sharing a cell are tested for intersection.
+
+    Args:
+        atlbrs (np.ndarray): Nx4 boxes 'a' in (x1, y1, x2, y2) format.
+        btlbrs (np.ndarray): Mx4 boxes 'b' in (x1, y1, x2, y2) format.
+
+    Returns:
+        (tuple[np.ndarray, np.ndarray]): Sorted, unique indices (ia, ib) of the pairs with a non-empty intersection.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if len(atlbrs) == 0 or len(btlbrs) == 0:
+        return empty, empty
+    boxes = np.concatenate([atlbrs, btlbrs])
+    sides = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+    cell = max(float(np.median(sides[np.isfinite(sides)])) if np.isfinite(sides).any() else 0.0, 1.0)
+
+    def bucket(tlbrs):
+        """Return (cell key, box index) for every grid cell covered by each box, sorted by key."""
+        lo = np.floor(np.nan_to_num(tlbrs[:, :2]) / cell).astype(np.int64)
+        hi = np.floor(np.nan_to_num(tlbrs[:, 2:]) / cell).astype(np.int64)
+        hi = np.maximum(hi, lo)
+        nx, ny = hi[:, 0] - lo[:, 0] + 1, hi[:, 1] - lo[:, 1] + 1
+        counts = nx * ny
+        index = np.repeat(np.arange(len(tlbrs)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cx = lo[index, 0] + offset % nx[index]
+        cy = lo[index, 1] + offset // nx[index]
+        key = cx * 2654435761 + cy  # unique for any realistic image size
+        order = np.argsort(key, kind="stable")
+        return key[order], index[order]
+
+    akey, aindex = bucket(atlbrs)
+    bkey, bindex = bucket(btlbrs)
+    # Join the two bucket lists on cell key
+    start = np.searchsorted(bkey, akey, side="left")
+    counts = np.searchsorted(bkey, akey, side="right") - start
+    ia = np.repeat(aindex, counts)
+    ib = bindex[np.repeat(start - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+    if len(ia) == 0:
+        return empty, empty
+    pair = np.unique(ia * len(btlbrs) + ib)
+    ia, ib = pair // len(btlbrs), pair % len(btlbrs)
+
+    a, b = atlbrs[ia], btlbrs[ib]
+    overlap = (np.minimum(a[:, 2], b[:, 2]) > np.maximum(a[:, 0], b[:, 0])) & (
+        np.minimum(a[:, 3], b[:, 3]) > np.maximum(a[:, 1], b[:, 1])
+    )
+    return ia[overlap], ib[overlap]
+
+
+def iou_pairs(atlbrs: np.ndarray, btlbrs: np.ndarray, min_pairs: int = 0) -> tuple:
+    """
+    Compute the IoU distance of the intersecting pairs of two box sets only, see `iou_candidates`.
+
+    Uses the same float32 arithmetic as `iou_distance`, so every returned distance equals the corresponding dense entry
+    and all pairs that are not returned have distance 1.
+
+    Args:
+        atlbrs (np.ndarray): Nx4 boxes 'a' in (x1, y1, x2, y2) format.
+        btlbrs (np.ndarray): Mx4 boxes 'b' in (x1, y1, x2, y2) format.
+        min_pairs (int, optional): Below N*M pairs the dense `iou_distance` is computed instead of the grid, as it is
+            faster on small scenes.
+
+    Returns:
+        (tuple[np.ndarray, np.ndarray, np.ndarray]): Indices (ia, ib) of the intersecting pairs and their IoU distance.
+    """
+    atlbrs = np.ascontiguousarray(atlbrs, dtype=np.float32).reshape(-1, 4)
+    btlbrs = np.ascontiguousarray(btlbrs, dtype=np.float32).reshape(-1, 4)
+    if len(atlbrs) * len(btlbrs) < min_pairs:
+        dists = iou_distance(atlbrs, btlbrs)
+        ia, ib = np.nonzero(dists < 1)
+        return ia, ib, dists[ia, ib]
+    ia, ib = iou_candidates(atlbrs, btlbrs)
+    a, b = atlbrs[ia].T, btlbrs[ib].T
+    inter_area = (np.minimum(a[2], b[2]) - np.maximum(a[0], b[0])).clip(0) * (
+        np.minimum(a[3], b[3]) - np.maximum(a[1], b[1])
+    ).clip(0)
+    area = (b[2] - b[0]) * (b[3] - b[1]) + (a[2] - a[0]) * (a[3] - a[1]) - inter_area
+    return ia, ib, 1 - inter_area / (area + 1e-7)
+
+
+def sparse_iou_assignment(
+    atlbrs: np.ndarray, btlbrs: np.ndarray, thresh: float, scores: np.ndarray = None, min_pairs: int = 160000
+) -> tuple:
+    """
+    Solve the IoU (optionally score-fused) assignment on overlapping pairs only, one connected component at a time.
+
+    Pairs that do not overlap have cost 1 in the dense matrix and can never be matched below `thresh` < 1, so the
+    problem splits into independent components of tracks and detections linked by pairs with cost <= `thresh`. Each
+    component is solved with lap.lapjv on its own small matrix, which gives the same result as `linear_assignment` on
+    the dense `iou_distance` (and `fuse_score`) matrix.
+
+    Args:
+        atlbrs (np.ndarray): Nx4 track boxes in (x1, y1, x2, y2) format.
+        btlbrs (np.ndarray): Mx4 detection boxes in (x1, y1, x2, y2) format.
+        thresh (float): Threshold for considering an assignment valid.
+        scores (np.ndarray, optional): Detection scores to fuse into the cost like `fuse_score`. Defaults to None.
+        min_pairs (int, optional): Below N*M pairs the dense path is used, as it is faster on small scenes.
+
+    Returns:
+        Tuple with:
+            - matched indices, Kx2 array sorted by track index
+            - unmatched indices from 'a'
+            - unmatched indices from 'b'
+    """
+    atlbrs = np.ascontiguousarray(atlbrs, dtype=np.float32).reshape(-1, 4)
+    btlbrs = np.ascontiguousarray(btlbrs, dtype=np.float32).reshape(-1, 4)
+    na, nb = len(atlbrs), len(btlbrs)
+    if na * nb < min_pairs or thresh >= 1:
+        dists = iou_distance(atlbrs, btlbrs)
+        if scores is not None and dists.size:
+            dists = 1 - (1 - dists) * np.asarray(scores, dtype=np.float32)[None]
+        matches, unmatched_a, unmatched_b = linear_assignment(dists, thresh=thresh)
+        return (
+            np.asarray(matches, dtype=np.int64).reshape(-1, 2),
+            np.asarray(unmatched_a, dtype=np.int64),
+            np.asarray(unmatched_b, dtype=np.int64),
+        )
+
+    # Same float32 arithmetic as iou_distance and fuse_score, evaluated on candidate pairs only
+    ia, ib, cost = iou_pairs(atlbrs, btlbrs)
+    if scores is not None:
+        cost = 1 - (1 - cost) * np.asarray(scores, dtype=np.float32)[ib]
+
+    edge = cost <= thresh
+    matches = [np.empty((0, 2), dtype=np.int64)]
+    if edge.any():
+        graph = coo_matrix((np.ones(edge.sum(), dtype=np.int8), (ia[edge], na + ib[edge])), shape=(na + nb,) * 2)
+        n, labels = connected_components(graph, directed=False)
+        alabels, blabels = labels[:na], labels[na:]
+        acount, bcount = np.bincount(alabels, minlength=n), np.bincount(blabels, minlength=n)
+        label = alabels[ia]
+        inner = np.nonzero(label == blabels[ib])[0]
+        inner = inner[np.lexsort((cost[inner], label[inner]))]  # grouped by component, cheapest pair first
+        components, first, pcount = np.unique(label[inner], return_index=True, return_counts=True)
+        solved = np.zeros(n, dtype=bool)
+
+        # A component with a single track or a single detection is solved by its cheapest pair, unless it is tied
+        best = inner[first]
+        tied = (pcount > 1) & (cost[inner[np.minimum(first + 1, len(inner) - 1)]] == cost[best])
+        star = ((acount[components] == 1) | (bcount[components] == 1)) & ~tied & (cost[best] < thresh)
+        matches.append(np.stack([ia[best[star]], ib[best[star]]], axis=1))
+        solved[components[star]] = True
+        solved[np.setdiff1d(np.arange(n), label[edge])] = True
+
+        # Remaining components: solve each small matrix with lap.lapjv
+        remaining = np.nonzero(~solved)[0]
+        if len(remaining):
+            arows, bcols = np.argsort(alabels, kind="stable"), np.argsort(blabels, kind="stable")
+            astart, bstart = np.cumsum(acount) - acount, np.cumsum(bcount) - bcount
+            pstart = np.zeros(n, dtype=np.int64)
+            pstart[components] = first
+            pcount = np.bincount(label[inner], minlength=n)
+            for c in remaining.tolist():
+                rows = arows[astart[c] : astart[c] + acount[c]]
+                cols = bcols[bstart[c] : bstart[c] + bcount[c]]
+                pairs = inner[pstart[c] : pstart[c] + pcount[c]]
+                sub = np.ones((len(rows), len(cols)), dtype=np.float32)
+                sub[np.searchsorted(rows, ia[pairs]), np.searchsorted(cols, ib[pairs])] = cost[pairs]
+                _, x, _ = lap.lapjv(sub, extend_cost=True, cost_limit=thresh)
+                matched = x >= 0
+                matches.append(np.stack([rows[matched], cols[x[matched]]], axis=1))
+
+    matches = np.concatenate(matches)
+    matches = matches[np.argsort(matches[:, 0])]
+    unmatched_a = np.setdiff1d(np.arange(na), matches[:, 0])
+    unmatched_b = np.setdiff1d(np.arange(nb), matches[:, 1])
+    return matches, unmatched_a, unmatched_b
+
+
 def embedding_distance(tracks: list, detections: list, metric: str = "cosine") -> np.ndarray:
     """
     Compute distance between tracks and detections based on embeddings.
@@ -99,6 +274,7 @@ def embedding_distance(tracks: list, detections: list, metric: str = "cosine") -
     Returns:
         (np.ndarray): Cost matrix computed based on embeddings.
     """
+    from scipy.spatial.distance import cdist  # scope for faster 'import ultralytics'
 
     cost_matrix = np.zeros((len(tracks), len(detections)), dtype=np.float32)
     if cost_matrix.size == 0:
@@ -0,0 +1,132 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import cv2
+import numpy as np
+import torch
+
+from ultralytics.utils import LOGGER
+
+
+class ReID:
+    """
+    Appearance embedding extractor for BOTSORT re-identification.
+
+    Detection boxes are cropped from the frame and resized into one preallocated uint8 batch, then embedded either by a
+    model loaded with AutoBackend (any of its formats, e.g. ONNX, OpenVINO or TorchScript) or, with `model='hist'`, by
+    weight-free color histograms that take tens of microseconds per crop on CPU. Embeddings are L2-normalized.
+
+    Attributes:
+        model (str): Path of the embedding model, or 'hist' for color histograms.
+        imgsz (tuple): Crop size (height, width) fed to the embedding model.
+        batch (int): Maximum number of crops per inference call.
+        backend (AutoBackend | None): The embedding model, None for color histograms.
+        crops (np.ndarray): Reusable uint8 crop batch of shape (batch, height, width, 3).
+
+    Methods:
+        __call__(img, tlbrs): Returns the embeddings of the given boxes in `img`.
+        crop(img, tlbrs): Crops and resizes boxes into the reusable batch.
+        embed(crops): Embeds a batch of crops with the AutoBackend model.
+        histograms(crops): Embeds a batch of crops as hue/saturation histograms of horizontal stripes.
+    """
+
+    mean = np.array([0.485, 0.456, 0.406], dtype=np.float32)  # ImageNet RGB mean
+    std = np.array([0.229, 0.224, 0.225], dtype=np.float32)  # ImageNet RGB std
+
+    def __init__(self, model="hist", imgsz=(256, 128), batch=32, stripes=4, bins=(8, 4)):
+        """
+        Initialize the embedding extractor.
+
+        Args:
+            model (str): Embedding model weights in any AutoBackend format, or 'hist' for color histograms.
+            imgsz (tuple): Crop size (height, width) fed to the embedding model.
+            batch (int): Maximum number of crops per inference call, overridden by a static model batch size.
+            stripes (int): Number of horizontal stripes of the histogram embedding.
+            bins (tuple): Number of (hue, saturation) bins per stripe of the histogram embedding.
+        """
+        self.model = str(model)
+        self.stripes = stripes
+        self.bins = bins
+        self.backend = None
+        if self.model == "hist":
+            imgsz = (stripes * 16, 32)  # small crops are enough for histograms
+        else:
+            from ultralytics.nn.autobackend import AutoBackend
+
+            self.backend = AutoBackend(self.model, verbose=False)
+            static = self._static_batch(self.backend)
+            if static:
+                batch = static
+            LOGGER.info(f"ReID: loaded {self.model} with batch {batch} and crop size {tuple(imgsz)}")
+        self.imgsz = tuple(int(x) for x in imgsz)
+        self.batch = max(1, int(batch))
+        self.crops = np.empty((self.batch,) + self.imgsz + (3,), dtype=np.uint8)
+
+    @staticmethod
+    def _static_batch(backend):
+        """Return the fixed batch size of an ONNX or OpenVINO model, or None if the batch dimension is dynamic."""
+        if backend.onnx:
+            size = backend.session.get_inputs()[0].shape[0]
+            return size if isinstance(size, int) else None
+        if backend.xml:
+            return getattr(backend, "batch_size", None)
+        return None
+
+    def __call__(self, img, tlbrs):
+        """
+        Compute embeddings of boxes in a frame.
+
+        Args:
+            img (np.ndarray): BGR frame of shape (H, W, 3).
+            tlbrs (np.ndarray): Nx4 boxes in (x1, y1, x2, y2) format.
+
+        Returns:
+            (np.ndarray): NxD float32 L2-normalized embeddings.
+        """
+        tlbrs = np.asarray(tlbrs, dtype=np.float32).reshape(-1, 4)
+        features = []
+        for i in range(0, len(tlbrs), self.batch):
+            crops = self.crop(img, tlbrs[i : i + self.batch])
+            features.append(self.histograms(crops) if self.backend is None else self.embed(crops))
+        if not features:
+            return np.empty((0, 0), dtype=np.float32)
+        features = np.concatenate(features).astype(np.float32, copy=False)
+        return features / np.maximum(np.linalg.norm(features, axis=1, keepdims=True), 1e-12)
+
+    def crop(self, img, tlbrs):
+        """Crop boxes from `img` and resize them into the reusable batch, returning a view of the filled part."""
+        height, width = img.shape[:2]
+        boxes = np.round(tlbrs).astype(np.int_)
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+        boxes[:, 2:] = np.maximum(boxes[:, 2:], boxes[:, :2] + 1)  # at least one pixel
+        crops = self.crops[: len(boxes)]
+        for (x1, y1, x2, y2), dst in zip(boxes.tolist(), crops):
+            patch = img[min(y1, height - 1) : y2, min(x1, width - 1) : x2]
+            cv2.resize(patch, self.imgsz[::-1], dst=dst, interpolation=cv2.INTER_LINEAR)
+        return crops
+
+    def embed(self, crops):
+        """Run the AutoBackend model on a batch of BGR crops, padding the batch if the model batch size is static."""
+        n = len(crops)
+        x = crops[..., ::-1].astype(np.float32) / 255.0
+        x = ((x - self.mean) / self.std).transpose(0, 3, 1, 2)
+        if self._static_batch(self.backend) and n < self.batch:
+            x = np.concatenate([x, np.zeros((self.batch - n,) + x.shape[1:], dtype=np.float32)])
+        im = torch.from_numpy(np.ascontiguousarray(x)).to(self.backend.device)
+        with torch.inference_mode():
+            y = self.backend(im)
+        if isinstance(y, (list, tuple)):
+            y = y[0]
+        y = y.cpu().numpy() if isinstance(y, torch.Tensor) else np.asarray(y)
+        return y[:n].reshape(n, -1)
+
+    def histograms(self, crops):
+        """Embed crops as square-rooted hue/saturation histograms of `stripes` horizontal stripes."""
+        n, h, w = crops.shape[:3]
+        hsv = cv2.cvtColor(crops.reshape(n * h, w, 3), cv2.COLOR_BGR2HSV).reshape(n, h, w, 3)
+        hbins, sbins = self.bins
+        bins = (hsv[..., 0].astype(np.int_) * hbins // 180) * sbins + hsv[..., 1].astype(np.int_) * sbins // 256
+        stripe = np.arange(h) * self.stripes // h
+        index = (np.arange(n)[:, None, None] * self.stripes + stripe[None, :, None]) * (hbins * sbins) + bins
+        hist = np.bincount(index.ravel(), minlength=n * self.stripes * hbins * sbins).astype(np.float32)
+        return np.sqrt(hist.reshape(n, -1))
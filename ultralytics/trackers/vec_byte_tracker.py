@@ -0,0 +1,387 @@
+# Ultralytics YOLO 🚀, AGPL-3.0 license
+
+import numpy as np
+
+from .basetrack import TrackIdCounter, TrackState
+from .byte_tracker import STrack, adjust_boxes_within_bounds
+from .utils import matching
+from .utils.kalman_filter import KalmanFilterXYAH
+
+
+class TrackPool:
+    """
+    Struct-of-arrays storage for ByteTrack track state.
+
+    Every track occupies one slot and all of its attributes live in contiguous NumPy arrays indexed by slot, so that
+    prediction, correction, camera motion compensation and output formatting operate on all tracks at once.
+
+    Attributes:
+        mean (np.ndarray): Nx8 Kalman filter mean of each slot.
+        covariance (np.ndarray): Nx8x8 Kalman filter covariance of each slot.
+        track_id (np.ndarray): Track ID of each slot.
+        score (np.ndarray): Confidence score of the last associated detection.
+        cls (np.ndarray): Class label of the last associated detection.
+        idx (np.ndarray): Index of the last associated detection in the input results.
+        state (np.ndarray): TrackState of each slot.
+        is_activated (np.ndarray): Whether each track has been confirmed.
+        frame_id (np.ndarray): Last frame ID each track was updated in.
+        start_frame (np.ndarray): Frame ID each track was started in.
+        tracklet_len (np.ndarray): Number of consecutive updates of each track.
+        free (list[int]): Free slots, the last element is allocated first.
+    """
+
+    columns = (
+        "mean",
+        "covariance",
+        "track_id",
+        "score",
+        "cls",
+        "idx",
+        "state",
+        "is_activated",
+        "frame_id",
+        "start_frame",
+        "tracklet_len",
+    )
+
+    def __init__(self, capacity=64):
+        """Preallocate storage for `capacity` tracks."""
+        self.mean = np.zeros((capacity, 8))
+        self.covariance = np.zeros((capacity, 8, 8))
+        self.track_id = np.zeros(capacity, dtype=np.int64)
+        self.score = np.zeros(capacity, dtype=np.float32)
+        self.cls = np.zeros(capacity, dtype=np.float32)
+        self.idx = np.zeros(capacity, dtype=np.float32)
+        self.state = np.full(capacity, TrackState.New, dtype=np.int8)
+        self.is_activated = np.zeros(capacity, dtype=bool)
+        self.frame_id = np.zeros(capacity, dtype=np.int64)
+        self.start_frame = np.zeros(capacity, dtype=np.int64)
+        self.tracklet_len = np.zeros(capacity, dtype=np.int64)
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        """Return the number of allocated slots."""
+        return len(self.track_id) - len(self.free)
+
+    def grow(self, n):
+        """Double the capacity until at least `n` slots are free."""
+        while len(self.free) < n:
+            capacity = len(self.track_id)
+            for name in self.columns:
+                column = getattr(self, name)
+                setattr(self, name, np.concatenate([column, np.zeros_like(column)]))
+            self.free[:0] = range(2 * capacity - 1, capacity - 1, -1)
+
+    def alloc(self, n):
+        """Allocate `n` slots and return their indices."""
+        self.grow(n)
+        slots = np.array(self.free[len(self.free) - n :][::-1], dtype=np.int64)
+        del self.free[len(self.free) - n :]
+        return slots
+
+    def release(self, slots):
+        """Return slots to the free list."""
+        self.free.extend(slots.tolist())
+
+    def tlbr(self, slots):
+        """Return the (min x, min y, max x, max y) boxes of the given slots as an Nx4 array."""
+        ret = self.mean[slots, :4].copy()
+        ret[:, 2] *= ret[:, 3]
+        ret[:, :2] -= ret[:, 2:] / 2
+        ret[:, 2:] += ret[:, :2]
+        return ret
+
+
+class VecBYTETracker:
+    """
+    BYTETracker variant that keeps all track state in a struct-of-arrays TrackPool.
+
+    Associations follow BYTETracker.update step by step, but tracks are referred to by slot index arrays instead of
+    STrack lists. Kalman prediction and correction, camera motion compensation and the output array are each computed
+    with one batched operation, and STrack objects are only built when `tracked_stracks` or `lost_stracks` is accessed.
+
+    Attributes:
+        pool (TrackPool): Storage of all live tracks.
+        tracked (np.ndarray): Slots of tracked tracks, in BYTETracker.tracked_stracks order.
+        lost (np.ndarray): Slots of lost tracks, in BYTETracker.lost_stracks order.
+        removed_ids (np.ndarray): Track IDs of the most recently removed tracks, at most 1000 like
+            BYTETracker.removed_stracks.
+        frame_id (int): The current frame ID.
+        args (namespace): Command-line arguments.
+        max_time_lost (int): The maximum frames for a track to be considered as 'lost'.
+        kalman_filter (KalmanFilterXYAH): Kalman Filter object.
+        overlay (callable | None): Optional debug hook called as `overlay(img, tlbrs)`, see BYTETracker.
+        track_ids (TrackIdCounter): Track ID counter of this tracker.
+
+    Methods:
+        update(results, img=None): Updates object tracker with new detections.
+        multi_predict(slots): Predicts the location of tracks.
+        multi_gmc(slots, H): Applies camera motion compensation to tracks.
+        reset(): Resets the tracker.
+    """
+
+    def __init__(self, args, frame_rate=30):
+        """Initialize a YOLOv8 object to track objects with given arguments and frame rate."""
+        self.frame_id = 0
+        self.args = args
+        self.max_time_lost = int(frame_rate / 30.0 * args.track_buffer)
+        self.overlay = None
+        self.track_ids = TrackIdCounter()
+        self.reset()
+
+    def update(self, results, img=None):
+        """Updates object tracker with new detections and returns tracked object bounding boxes."""
+        self.frame_id += 1
+        pool = self.pool
+
+        scores = results.conf
+        bboxes = adjust_boxes_within_bounds(results.xyxy, img.shape[1], img.shape[0])
+        # Add index
+        bboxes = np.concatenate([bboxes, np.arange(len(bboxes)).reshape(-1, 1)], axis=-1)
+        cls = results.cls
+
+        remain_inds = scores > self.args.track_high_thresh
+        inds_low = scores > self.args.track_low_thresh
+        inds_high = scores < self.args.track_high_thresh
+
+        inds_second = np.logical_and(inds_low, inds_high)
+        dets = self.init_track(bboxes[remain_inds], scores[remain_inds], cls[remain_inds])
+        dets_second = self.init_track(bboxes[inds_second], scores[inds_second], cls[inds_second])
+
+        activated = self.tracked[pool.is_activated[self.tracked]]
+        unconfirmed = self.tracked[~pool.is_activated[self.tracked]]
+        # Step 2: First association, with high score detection boxes
+        strack_pool = np.concatenate([activated, self.lost])
+        # Predict the current location with KF
+        self.multi_predict(strack_pool)
+        if hasattr(self, "gmc") and img is not None:
+            warp = self.gmc.apply(img, dets["tlbr"])
+            self.multi_gmc(strack_pool, warp)
+            self.multi_gmc(unconfirmed, warp)
+
+        matches, u_track, u_detection = self.associate(strack_pool, dets, self.args.match_thresh)
+        slots = strack_pool[matches[:, 0]]
+        refind = pool.state[slots] != TrackState.Tracked
+        self.apply(slots, dets, matches[:, 1], refind)
+        activated_stracks = [slots[~refind]]
+        refind_stracks = [slots[refind]]
+
+        # Step 3: Second association, with low score detection boxes association the untrack to the low score detections
+        r_tracked = strack_pool[u_track]
+        r_tracked = r_tracked[pool.state[r_tracked] == TrackState.Tracked]
+        matches, u_track, _ = self.associate(r_tracked, dets_second, 0.5, fuse=False)
+        slots = r_tracked[matches[:, 0]]
+        refind = pool.state[slots] != TrackState.Tracked
+        self.apply(slots, dets_second, matches[:, 1], refind)
+        activated_stracks.append(slots[~refind])
+        refind_stracks.append(slots[refind])
+
+        lost_stracks = r_tracked[u_track]
+        lost_stracks = lost_stracks[pool.state[lost_stracks] != TrackState.Lost]
+        pool.state[lost_stracks] = TrackState.Lost
+
+        # Deal with unconfirmed tracks, usually tracks with only one beginning frame
+        dets = {k: v[u_detection] for k, v in dets.items()}
+        matches, u_unconfirmed, u_detection = self.associate(unconfirmed, dets, 0.7)
+        slots = unconfirmed[matches[:, 0]]
+        self.apply(slots, dets, matches[:, 1], np.zeros(len(slots), dtype=bool))
+        activated_stracks.append(slots)
+        removed_stracks = [unconfirmed[u_unconfirmed]]
+        pool.state[removed_stracks[0]] = TrackState.Removed
+
+        # Step 4: Init new stracks
+        u_detection = u_detection[dets["score"][u_detection] >= self.args.new_track_thresh]
+        activated_stracks.append(self.activate(dets, u_detection))
+
+        # Step 5: Update state
+        expired = self.lost[self.frame_id - pool.frame_id[self.lost] > self.max_time_lost]
+        pool.state[expired] = TrackState.Removed
+        removed_stracks.append(expired)
+        if self.overlay is not None and img is not None and len(strack_pool):
+            self.overlay(img, pool.tlbr(strack_pool))
+        activated_stracks = np.concatenate(activated_stracks)
+        refind_stracks = np.concatenate(refind_stracks)
+        removed_stracks = np.concatenate(removed_stracks)
+
+        live = np.concatenate([self.tracked, self.lost, activated_stracks])
+        tracked = self.tracked[pool.state[self.tracked] == TrackState.Tracked]
+        tracked = self.joint_stracks(tracked, activated_stracks)
+        tracked = self.joint_stracks(tracked, refind_stracks)
+        lost = self.sub_stracks(self.lost, pool.track_id[tracked])
+        lost = np.concatenate([lost, lost_stracks])
+        lost = lost[pool.state[lost] != TrackState.Removed]  # expired tracks leave the lost tracks right away
+        self.tracked, self.lost = self.remove_duplicate_stracks(tracked, lost)
+        self.removed_ids = np.concatenate([self.removed_ids, pool.track_id[removed_stracks]])[-1000:]
+        # Slots that are neither tracked nor lost anymore go back to the pool
+        pool.release(np.setdiff1d(live, np.concatenate([self.tracked, self.lost])))
+
+        output = self.tracked[pool.is_activated[self.tracked]]
+        return np.concatenate(
+            [
+                pool.tlbr(output),
+                pool.track_id[output, None],
+                pool.score[output, None],
+                pool.cls[output, None],
+                pool.idx[output, None],
+            ],
+            axis=1,
+            dtype=np.float32,
+        )
+
+    def get_kalmanfilter(self):
+        """Returns a Kalman filter object for tracking bounding boxes."""
+        return KalmanFilterXYAH()
+
+    @staticmethod
+    def init_track(bboxes, scores, cls):
+        """Convert xyxy+index detections to the column arrays used for association and track initialization."""
+        tlwh = bboxes[:, :4].copy()
+        tlwh[:, 2:] -= tlwh[:, :2]
+        tlwh = tlwh.astype(np.float32)
+        tlbr = tlwh.copy()
+        tlbr[:, 2:] += tlbr[:, :2]
+        xyah = tlwh.copy()
+        xyah[:, :2] += xyah[:, 2:] / 2
+        xyah[:, 2] /= xyah[:, 3]
+        return {"tlbr": tlbr, "xyah": xyah, "score": scores, "cls": cls, "idx": bboxes[:, -1]}
+
+    def associate(self, slots, dets, thresh, fuse=True):
+        """
+        Match tracks to detections by IoU distance, fused with detection scores if `fuse` is True.
+
+        Returns matches and unmatched indices as integer arrays, using the sparse backend when `sparse_association` is
+        enabled in the tracker config.
+        """
+        scores = dets["score"] if fuse else None
+        if getattr(self.args, "sparse_association", False):
+            return matching.sparse_iou_assignment(self.pool.tlbr(slots), dets["tlbr"], thresh, scores)
+        dists = matching.iou_distance(self.pool.tlbr(slots), dets["tlbr"])
+        if fuse and dists.size:
+            dists = 1 - (1 - dists) * scores[None]
+        matches, u_a, u_b = matching.linear_assignment(dists, thresh=thresh)
+        return (
+            np.asarray(matches, dtype=np.int64).reshape(-1, 2),
+            np.asarray(u_a, dtype=np.int64),
+            np.asarray(u_b, dtype=np.int64),
+        )
+
+    def apply(self, slots, dets, det_inds, refind):
+        """Update matched tracks with their detections, re-activating the ones flagged in `refind`."""
+        if len(slots) == 0:
+            return
+        pool = self.pool
+        pool.mean[slots], pool.covariance[slots] = self.kalman_filter.multi_update(
+            pool.mean[slots], pool.covariance[slots], dets["xyah"][det_inds]
+        )
+        pool.tracklet_len[slots] = np.where(refind, 0, pool.tracklet_len[slots] + 1)
+        pool.state[slots] = TrackState.Tracked
+        pool.is_activated[slots] = True
+        pool.frame_id[slots] = self.frame_id
+        pool.score[slots] = dets["score"][det_inds]
+        pool.cls[slots] = dets["cls"][det_inds]
+        pool.idx[slots] = dets["idx"][det_inds]
+
+    def activate(self, dets, det_inds):
+        """Start new tracklets from the given detections and return their slots."""
+        pool = self.pool
+        slots = pool.alloc(len(det_inds))
+        if len(slots) == 0:
+            return slots
+        pool.track_id[slots] = self.track_ids.next(len(slots)) + np.arange(len(slots))
+        pool.mean[slots], pool.covariance[slots] = self.kalman_filter.multi_initiate(dets["xyah"][det_inds])
+        pool.tracklet_len[slots] = 0
+        pool.state[slots] = TrackState.Tracked
+        pool.is_activated[slots] = self.frame_id == 1
+        pool.frame_id[slots] = self.frame_id
+        pool.start_frame[slots] = self.frame_id
+        pool.score[slots] = dets["score"][det_inds]
+        pool.cls[slots] = dets["cls"][det_inds]
+        pool.idx[slots] = dets["idx"][det_inds]
+        return slots
+
+    def multi_predict(self, slots):
+        """Predict the next states of the given tracks with one batched Kalman filter step."""
+        if len(slots) == 0:
+            return
+        pool = self.pool
+        mean = pool.mean[slots]
+        mean[pool.state[slots] != TrackState.Tracked, 7] = 0
+        pool.mean[slots], pool.covariance[slots] = self.kalman_filter.multi_predict(mean, pool.covariance[slots])
+
+    def multi_gmc(self, slots, H=np.eye(2, 3)):
+        """Update track positions and covariances of the given slots using a homography matrix."""
+        if len(slots) == 0:
+            return
+        pool = self.pool
+        R8x8 = np.kron(np.eye(4, dtype=float), H[:2, :2])
+        mean = np.dot(pool.mean[slots], R8x8.T)
+        mean[:, :2] += H[:2, 2]
+        pool.mean[slots] = mean
+        pool.covariance[slots] = np.matmul(np.matmul(R8x8, pool.covariance[slots]), R8x8.T)
+
+    def joint_stracks(self, slots_a, slots_b):
+        """Append the slots of `slots_b` whose track IDs are not in `slots_a`, keeping the first occurrence."""
+        ids_b = self.pool.track_id[slots_b]
+        _, first = np.unique(ids_b, return_index=True)
+        keep = np.zeros(len(slots_b), dtype=bool)
+        keep[first] = True
+        keep &= ~np.isin(ids_b, self.pool.track_id[slots_a])
+        return np.concatenate([slots_a, slots_b[keep]])
+
+    def sub_stracks(self, slots, track_ids):
+        """Filter out the slots whose track IDs are in `track_ids`."""
+        return slots[~np.isin(self.pool.track_id[slots], track_ids)]
+
+    def remove_duplicate_stracks(self, slots_a, slots_b):
+        """Remove duplicate tracks with non-maximum IOU distance, keeping the longer-lived one."""
+        pool = self.pool
+        p, q, pdist = matching.iou_pairs(pool.tlbr(slots_a), pool.tlbr(slots_b), min_pairs=160000)
+        p, q = p[pdist < 0.15], q[pdist < 0.15]
+        timep = pool.frame_id[slots_a[p]] - pool.start_frame[slots_a[p]]
+        timeq = pool.frame_id[slots_b[q]] - pool.start_frame[slots_b[q]]
+        keep_a = np.ones(len(slots_a), dtype=bool)
+        keep_b = np.ones(len(slots_b), dtype=bool)
+        keep_a[p[timep <= timeq]] = False
+        keep_b[q[timep > timeq]] = False
+        return slots_a[keep_a], slots_b[keep_b]
+
+    def to_stracks(self, slots):
+        """Build STrack objects for the given slots."""
+        pool = self.pool
+        stracks = []
+        for slot, tlbr in zip(slots.tolist(), pool.tlbr(slots)):
+            track = STrack(np.r_[tlbr, pool.idx[slot]], pool.score[slot], pool.cls[slot])
+            track.kalman_filter = self.kalman_filter
+            track.mean, track.covariance = pool.mean[slot].copy(), pool.covariance[slot].copy()
+            track.track_id = int(pool.track_id[slot])
+            track.state = int(pool.state[slot])
+            track.is_activated = bool(pool.is_activated[slot])
+            track.frame_id = int(pool.frame_id[slot])
+            track.start_frame = int(pool.start_frame[slot])
+            track.tracklet_len = int(pool.tracklet_len[slot])
+            stracks.append(track)
+        return stracks
+
+    @property
+    def tracked_stracks(self):
+        """Tracked tracks as STrack objects, built on demand."""
+        return self.to_stracks(self.tracked)
+
+    @property
+    def lost_stracks(self):
+        """Lost tracks as STrack objects, built on demand."""
+        return self.to_stracks(self.lost)
+
+    def reset_id(self):
+        """Resets the track ID counter of this tracker."""
+        self.track_ids.reset()
+
+    def reset(self):
+        """Reset tracker."""
+        self.pool = TrackPool()
+        self.tracked = np.empty(0, dtype=np.int64)
+        self.lost = np.empty(0, dtype=np.int64)
+        self.removed_ids = np.empty(0, dtype=np.int64)
+        self.frame_id = 0
+        self.kalman_filter = self.get_kalmanfilter()
+        self.reset_id()
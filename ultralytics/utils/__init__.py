@@ -16,7 +16,6 @@ from types import SimpleNamespace
 from typing import Union
 
 import cv2
-import matplotlib.pyplot as plt
 import numpy as np
 import torch
 import yaml
@@ -207,6 +206,8 @@ def plt_settings(rcparams=None, backend="Agg"):
 
         def wrapper(*args, **kwargs):
             """Sets rc parameters and backend, calls the original function, and restores the settings."""
+            import matplotlib.pyplot as plt  # scope for faster 'import ultralytics'
+
             original_backend = plt.get_backend()
             if backend != original_backend:
                 plt.close("all")  # auto-close()ing of figures upon backend switching is deprecated since 3.8
@@ -433,6 +434,8 @@ def is_jupyter():
     Returns:
         (bool): True if running inside a Jupyter Notebook, False otherwise.
     """
+    if "IPython" not in sys.modules:  # notebooks always import IPython first, skip importing it in plain scripts
+        return False
     with contextlib.suppress(Exception):
         from IPython import get_ipython
 
@@ -19,7 +19,6 @@ import cv2
 import numpy as np
 import requests
 import torch
-from matplotlib import font_manager
 
 from ultralytics.utils import (
     ASSETS,
@@ -308,6 +307,8 @@ def check_font(font="Arial.ttf"):
         return file
 
     # Check system fonts
+    from matplotlib import font_manager  # scope for faster 'import ultralytics'
+
     matches = [s for s in font_manager.findSystemFonts() if font in s]
     if any(matches):
         return matches[0]
@@ -4,12 +4,12 @@ import contextlib
 import math
 import re
 import time
+from functools import lru_cache
 
 import cv2
 import numpy as np
 import torch
 import torch.nn.functional as F
-import torchvision
 
 from ultralytics.utils import LOGGER
 from ultralytics.utils.metrics import batch_probiou
@@ -175,10 +175,15 @@ def non_max_suppression(
     max_nms=30000,
     max_wh=7680,
     rotated=False,
+    fast_classes=True,
 ):
     """
     Perform non-maximum suppression (NMS) on a set of boxes, with support for masks and multiple labels per box.
 
+    When `classes` is given for single-label, axis-aligned NMS, a class-filtered fast path thresholds the logits of
+    the requested classes first and converts, scores and suppresses only the surviving anchors. It returns the same
+    boxes as the generic path.
+
     Args:
         prediction (torch.Tensor): A tensor of shape (batch_size, num_classes + 4 + num_masks, num_boxes)
             containing the predicted boxes, classes, and masks. The tensor should be in the format
@@ -199,12 +204,15 @@ def non_max_suppression(
         max_time_img (float): The maximum time (seconds) for processing one image.
         max_nms (int): The maximum number of boxes into torchvision.ops.nms().
         max_wh (int): The maximum box width and height in pixels
+        rotated (bool): If True, the boxes are rotated boxes in xywhr format.
+        fast_classes (bool): If True, use the class-filtered fast path when `classes` is given.
 
     Returns:
         (List[torch.Tensor]): A list of length batch_size, where each element is a tensor of
             shape (num_boxes, 6 + num_masks) containing the kept boxes, with columns
             (x1, y1, x2, y2, confidence, class, mask1, mask2, ...).
     """
+    import torchvision  # scope for faster 'import ultralytics'
 
     # Checks
     assert 0 <= conf_thres <= 1, f"Invalid Confidence threshold {conf_thres}, valid values are between 0.0 and 1.0"
@@ -216,13 +224,20 @@ def non_max_suppression(
     nc = nc or (prediction.shape[1] - 4)  # number of classes
     nm = prediction.shape[1] - nc - 4
     mi = 4 + nc  # mask start index
-    xc = prediction[:, 4:mi].amax(1) > conf_thres  # candidates
 
     # Settings
     # min_wh = 2  # (pixels) minimum box width and height
     time_limit = 0.5 + max_time_img * bs  # seconds to quit after
     multi_label &= nc > 1  # multiple labels per box (adds 0.5ms/img)
 
+    if classes is not None and fast_classes and not (multi_label or rotated or labels):
+        classes = tuple(classes) if isinstance(classes, (list, tuple)) else (int(classes),)
+        if all(0 <= c < nc for c in classes):
+            return _nms_classes(prediction, conf_thres, iou_thres, classes, agnostic, max_det, nc, max_nms, max_wh,
+                                time_limit)
+
+    xc = prediction[:, 4:mi].amax(1) > conf_thres  # candidates
+
     prediction = prediction.transpose(-1, -2)  # shape(1,84,6300) to shape(1,6300,84)
     if not rotated:
         prediction[..., :4] = xywh2xyxy(prediction[..., :4])  # xywh to xyxy
@@ -298,6 +313,75 @@ def non_max_suppression(
     return output
 
 
+@lru_cache(maxsize=8)
+def _class_tensor(classes, device):
+    """Return a cached tensor of the class indices `classes` on `device`."""
+    return torch.tensor(classes, device=device)
+
+
+def _nms_classes(prediction, conf_thres, iou_thres, classes, agnostic, max_det, nc, max_nms, max_wh, time_limit):
+    """
+    Class-filtered NMS fast path of `non_max_suppression()` for single-label, axis-aligned boxes.
+
+    Anchors are thresholded on the scores of `classes` before the prediction is transposed or any box is converted, so
+    on crowded frames at a low confidence threshold only the survivors are gathered, converted to xyxy and checked
+    against the best score over all classes. The kept boxes are the same as those of the generic path.
+
+    Args:
+        prediction (torch.Tensor): A tensor of shape (batch_size, 4 + num_classes + num_masks, num_boxes).
+        conf_thres (float): The confidence threshold.
+        iou_thres (float): The IoU threshold for NMS.
+        classes (tuple): Class indices to keep, all smaller than `nc`.
+        agnostic (bool): If True, suppress boxes across classes.
+        max_det (int): The maximum number of boxes to keep after NMS.
+        nc (int): The number of classes output by the model.
+        max_nms (int): The maximum number of boxes into torchvision.ops.nms().
+        max_wh (int): The maximum box width and height in pixels.
+        time_limit (float): Seconds after which the remaining images are skipped.
+
+    Returns:
+        (List[torch.Tensor]): A list of length batch_size of (num_boxes, 6 + num_masks) tensors with columns
+            (x1, y1, x2, y2, confidence, class, mask1, mask2, ...).
+    """
+    import torchvision  # scope for faster 'import ultralytics'
+
+    bs = prediction.shape[0]
+    nm = prediction.shape[1] - nc - 4
+    cls_index = _class_tensor(classes, prediction.device)
+    if len(classes) == 1:
+        scores = prediction[:, 4 + classes[0]]  # view, no copy
+    else:
+        scores = prediction.index_select(1, cls_index + 4).amax(1)
+    xc = scores > conf_thres  # candidates
+
+    t = time.time()
+    output = [torch.zeros((0, 6 + nm), device=prediction.device)] * bs
+    for xi in range(bs):
+        i = xc[xi].nonzero().squeeze(1)
+        if not len(i):
+            continue
+        x = prediction[xi].index_select(1, i).T  # gather survivors only, shape (n, 4 + nc + nm)
+        box, cls, mask = x.split((4, nc, nm), 1)
+        conf, j = cls.max(1, keepdim=True)  # the best class over all classes must be a requested one
+        keep = (j == cls_index).any(1)
+        x = torch.cat((xywh2xyxy(box), conf, j.float(), mask), 1)[keep]
+
+        n = x.shape[0]  # number of boxes
+        if not n:
+            continue
+        if n > max_nms:  # excess boxes
+            x = x[x[:, 4].argsort(descending=True)[:max_nms]]
+
+        c = x[:, 5:6] * (0 if agnostic else max_wh)  # classes
+        i = torchvision.ops.nms(x[:, :4] + c, x[:, 4], iou_thres)[:max_det]
+        output[xi] = x[i]
+        if (time.time() - t) > time_limit:
+            LOGGER.warning(f"WARNING ⚠️ NMS time limit {time_limit:.3f}s exceeded")
+            break  # time limit exceeded
+
+    return output
+
+
 def clip_boxes(boxes, shape):
     """
     Takes a list of bounding boxes and a shape (height, width) and clips the bounding boxes to the shape.
@@ -7,6 +7,8 @@ import random
 import time
 from contextlib import contextmanager
 from copy import deepcopy
+from functools import lru_cache
+from importlib import metadata
 from pathlib import Path
 from typing import Union
 
@@ -15,7 +17,6 @@ import torch
 import torch.distributed as dist
 import torch.nn as nn
 import torch.nn.functional as F
-import torchvision
 
 from ultralytics.utils import DEFAULT_CFG_DICT, DEFAULT_CFG_KEYS, LOGGER, __version__
 from ultralytics.utils.checks import check_version
@@ -27,9 +28,15 @@ except ImportError:
 
 TORCH_1_9 = check_version(torch.__version__, "1.9.0")
 TORCH_2_0 = check_version(torch.__version__, "2.0.0")
-TORCHVISION_0_10 = check_version(torchvision.__version__, "0.10.0")
-TORCHVISION_0_11 = check_version(torchvision.__version__, "0.11.0")
-TORCHVISION_0_13 = check_version(torchvision.__version__, "0.13.0")
+try:  # read the version without importing torchvision, which is slow to import and only needed by NMS and transforms
+    TORCHVISION_VERSION = metadata.version("torchvision")
+except metadata.PackageNotFoundError:
+    import torchvision
+
+    TORCHVISION_VERSION = torchvision.__version__
+TORCHVISION_0_10 = check_version(TORCHVISION_VERSION, "0.10.0")
+TORCHVISION_0_11 = check_version(TORCHVISION_VERSION, "0.11.0")
+TORCHVISION_0_13 = check_version(TORCHVISION_VERSION, "0.13.0")
 
 
 @contextmanager
@@ -56,8 +63,9 @@ def smart_inference_mode():
     return decorate
 
 
+@lru_cache(maxsize=1)
 def get_cpu_info():
-    """Return a string with system CPU information, i.e. 'Apple M2'."""
+    """Return a string with system CPU information, i.e. 'Apple M2', queried once per process as it spawns subprocesses."""
     import cpuinfo  # pip install py-cpuinfo
 
     k = "brand_raw", "hardware_raw", "arch_string_raw"  # info keys sorted by preference (not all keys always available)
@@ -149,10 +157,10 @@ def select_device(device="", batch=0, newline=False, verbose=True):
         arg = "cuda:0"
     elif mps and TORCH_2_0 and torch.backends.mps.is_available():
         # Prefer MPS if available
-        s += f"MPS ({get_cpu_info()})\n"
+        s += f"MPS ({get_cpu_info()})\n" if verbose else ""  # CPU name only needed for logging
         arg = "mps"
     else:  # revert to CPU
-        s += f"CPU ({get_cpu_info()})\n"
+        s += f"CPU ({get_cpu_info()})\n" if verbose else ""
         arg = "cpu"
 
     if verbose:
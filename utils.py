@@ -55,6 +55,50 @@ def intersection_angle(prev_center, current_center, line_start, line_end):
     L = np.array([line_start, line_end], dtype=np.float32)
     return lines_angle(V, L), intersects(V, L)
 
+def polyline_segments(lines, offset=.0001):
+    # 将绊线折线[x1, y1, x2, y2, x3, y3, ...]展开为(M, 4)线段表
+    # 与逐段计算时相同，端点加上一个很小的偏移量，避免轨迹点与绊线重合情况下可能连续两次碰撞
+    points = np.asarray(lines, dtype=np.float64).reshape(-1, 2)
+    segments = np.concatenate([points[:-1], points[1:]], axis=1) + offset
+    return segments.astype(np.float32)
+
+def crossing_directions(prev_centers, current_centers, segments):
+    # 一次计算N条移动轨迹与M段绊线的相交情况，语义与intersection_angle逐对计算一致
+    # 返回(N, M)相交掩码和方向：1表示夹角小于180度，-1表示夹角大于等于180度，0表示未相交
+    P = np.asarray(prev_centers, dtype=np.float32).reshape(-1, 1, 2)
+    Q = np.asarray(current_centers, dtype=np.float32).reshape(-1, 1, 2)
+    A = segments[None, :, 0:2]
+    B = segments[None, :, 2:4]
+
+    def orientation(p, q, r):
+        val = ((q[..., 1] - p[..., 1]) * (r[..., 0] - q[..., 0])) - ((q[..., 0] - p[..., 0]) * (r[..., 1] - q[..., 1]))
+        return np.sign(val)
+
+    def on_segment(p, q, r):
+        return ((r[..., 0] <= np.maximum(p[..., 0], q[..., 0])) & (r[..., 0] >= np.minimum(p[..., 0], q[..., 0])) &
+                (r[..., 1] <= np.maximum(p[..., 1], q[..., 1])) & (r[..., 1] >= np.minimum(p[..., 1], q[..., 1])))
+
+    o1 = orientation(P, Q, A)
+    o2 = orientation(P, Q, B)
+    o3 = orientation(A, B, P)
+    o4 = orientation(A, B, Q)
+    crossed = (o1 != o2) & (o3 != o4)
+    crossed |= (o1 == 0) & on_segment(P, Q, A)
+    crossed |= (o2 == 0) & on_segment(P, Q, B)
+    crossed |= (o3 == 0) & on_segment(A, B, P)
+    crossed |= (o4 == 0) & on_segment(A, B, Q)
+
+    # 移动向量与绊线向量的夹角方向，等价于lines_angle(...) < 180
+    V = (Q - P) / np.linalg.norm(Q - P, axis=-1, keepdims=True)
+    L = (B - A) / np.linalg.norm(B - A, axis=-1, keepdims=True)
+    determinant = V[..., 0] * L[..., 1] - V[..., 1] * L[..., 0]
+    dot_product = V[..., 0] * L[..., 0] + V[..., 1] * L[..., 1]
+    angle = np.degrees(np.arctan2(determinant, dot_product))
+    angle = np.where(angle < 0, 360 + angle, angle)
+    direction = np.where(angle < 180, 1, -1).astype(np.int8)
+    direction[~crossed] = 0
+    return crossed, direction
+
 def adjust_box_within_bounds(max_width, max_height, x1, y1, x2, y2, width_expansion=0.5, height_expansion=0.2):
     # 原始宽度和高度
     width = x2 - x1